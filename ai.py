@@ -1,68 +1,94 @@
-import random
+import logging
 from colorama import Fore, Style
+from combat_solver import solve_attack
 from combat import declare_attackers, ai_declare_blockers, resolve_combat_phase, cleanup_phase, declare_blockers
+from log import get_logger
+
+log = get_logger('ai')
 
 def ai_upkeep(game):
     game.opponent.energy += 1
     game.opponent.draw_card()
-    game.log_action(f"AI Upkeep: Energy increased to {game.opponent.energy}. Drew a card.", Fore.YELLOW)
-    print(f"DEBUG: AI Upkeep - Energy: {game.opponent.energy}, Hand: {[card.name for card in game.opponent.hand]}")
+    game.log_action("AI Upkeep: Energy increased to %s. Drew a card.", game.opponent.energy, color=Fore.YELLOW)
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("AI Upkeep - Energy: %s, Hand: %s", game.opponent.energy, [card.name for card in game.opponent.hand])
 
-def ai_main_phase(game):
-    ai_player = game.opponent
-    playable_cards = [card for card in ai_player.hand if ai_can_play_card(game, card)]
+def ai_main_phase(game, ai_player=None):
+    ai_player = ai_player or game.opponent
+    playable_cards = [card for card in ai_player.hand if ai_can_play_card(game, card, ai_player)]
     
     if playable_cards:
-        card_to_play = random.choice(playable_cards)
-        game.log_action(f"AI attempts to play {card_to_play.name}", Fore.YELLOW)
-        if ai_player.play_card(card_to_play):  # Changed from game.player to ai_player
-            game.log_action(f"AI successfully played {card_to_play.name}", Fore.GREEN)
+        card_to_play = ai_player.controller.choose_card_to_play(game, ai_player, playable_cards)
+        if card_to_play is None:
+            game.log_action("AI passes its main phase", color=Fore.YELLOW)
         else:
-            game.log_action(f"AI failed to play {card_to_play.name}", Fore.RED)
+            game.log_action("AI attempts to play %s", card_to_play.name, color=Fore.YELLOW)
+            if ai_player.play_card(card_to_play):  # Changed from game.player to ai_player
+                game.log_action("AI successfully played %s", card_to_play.name, color=Fore.GREEN)
+            else:
+                game.log_action("AI failed to play %s", card_to_play.name, color=Fore.RED)
     else:
-        game.log_action("AI has no playable cards", Fore.YELLOW)
+        game.log_action("AI has no playable cards", color=Fore.YELLOW)
     
     # Add a prompt for the player to acknowledge the AI's action
-    input("Press Enter to continue...")
+    game.pause("Press Enter to continue...")
 
-def ai_combat_phase(game):
-    game.log_action("AI Combat Phase", Fore.YELLOW)
+def ai_combat_phase(game, ai_player=None):
+    ai_player = ai_player or game.opponent
+    defending_player = game.opponent_of(ai_player)
+    game.log_action("AI Combat Phase", color=Fore.YELLOW)
     
     # Declare attackers
-    available_attackers = [creature for creature in game.opponent.battlezone if not creature.tapped and not creature.summoning_sickness]
-    attackers = declare_attackers(game, game.opponent)
+    attackers = declare_attackers(game, ai_player)
     
     if attackers:
-        game.log_action(f"AI declares {len(attackers)} attacker(s)", Fore.RED)
+        game.log_action("AI declares %s attacker(s)", len(attackers), color=Fore.RED)
         for attacker in attackers:
-            game.log_action(f"AI attacks with {attacker.name}", Fore.RED)
+            game.log_action("AI attacks with %s", attacker.name, color=Fore.RED)
         
-        # Allow player to declare blockers
-        game.update_display()
-        blockers = declare_blockers(game, game.player, attackers)
+        # Allow the defending side to declare blockers
+        game.state_changed()
+        blockers = declare_blockers(game, defending_player, attackers)
         
         # Resolve combat
         resolve_combat_phase(game, attackers, blockers)
     else:
-        game.log_action("AI doesn't declare any attackers", Fore.YELLOW)
+        game.log_action("AI doesn't declare any attackers", color=Fore.YELLOW)
     
     # Cleanup phase
-    cleanup_phase(game, game.opponent, game.player)
+    cleanup_phase(game, ai_player, defending_player)
     
-    game.update_display()
-    input("Press Enter to continue...")
+    game.state_changed()
+    game.pause("Press Enter to continue...")
+
+def ai_choose_attackers(game, ai_player, available_attackers):
+    # Best attack against the defender's best blocks
+    defender = game.opponent_of(ai_player)
+    potential_blockers = [creature for creature in defender.battlezone if not creature.tapped]
+    return solve_attack(available_attackers, potential_blockers, defender.life)
+
+def ai_select_target(game, ai_player, valid_targets, friendly=False):
+    # Harmful effects go to the other side, friendly ones to our own; prefer the biggest creature
+    side = ai_player if friendly else game.opponent_of(ai_player)
+    candidates = [target for target in valid_targets if target is side or getattr(target, 'owner', None) is side]
+    cards = [target for target in candidates if target is not side]
+    if cards:
+        return max(cards, key=lambda card: card.attack)
+    return side if side in candidates else None
 
-def ai_end_phase(game):
-    game.log_action("AI End Phase", Fore.YELLOW)
-    while len(game.opponent.hand) > 7:
-        card_to_discard = random.choice(game.opponent.hand)
-        game.opponent.hand.remove(card_to_discard)
-        game.opponent.graveyard.append(card_to_discard)
-        game.log_action(f"AI discarded {card_to_discard.name} due to hand size limit.", Fore.YELLOW)
-        print(f"DEBUG: AI discarded {card_to_discard.name} due to hand size limit.")
+def ai_end_phase(game, ai_player=None):
+    ai_player = ai_player or game.opponent
+    game.log_action("AI End Phase", color=Fore.YELLOW)
+    while len(ai_player.hand) > 7:
+        card_to_discard = game.rng.choice(ai_player.hand)
+        ai_player.hand.remove(card_to_discard)
+        ai_player.graveyard.append(card_to_discard)
+        game.log_action("AI discarded %s due to hand size limit.", card_to_discard.name, color=Fore.YELLOW)
+        log.debug("AI discarded %s due to hand size limit.", card_to_discard.name)
 
-def ai_can_play_card(game, card):
-    can_play = game.opponent.energy >= card.cost and len(game.opponent.battlezone) < 5  # Assuming max 5 creatures
+def ai_can_play_card(game, card, ai_player=None):
+    ai_player = ai_player or game.opponent
+    can_play = ai_player.energy >= card.cost and len(ai_player.battlezone) < 5  # Assuming max 5 creatures
     #print(f"DEBUG: Can AI play {card.name}? {'Yes' if can_play else 'No'}")
     return can_play
 
@@ -71,4 +97,4 @@ def ai_make_decisions(game):
     # For now, it will just call the main phase and combat phase
     ai_main_phase(game)
     ai_combat_phase(game)
-    ai_main_phase(game)  # Second main phase
\ No newline at end of file
+    ai_main_phase(game)  # Second main phase
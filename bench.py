@@ -0,0 +1,269 @@
+# card_game/bench.py
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from combat import resolve_combat_phase
+from game import Game
+from gamelog import OFF as LOG_OFF
+from log import configure
+from simulate import SETS_DIR, load_card_pools, play_game
+from turns import upkeep_phase
+
+# Every benchmark plays with this set and fixed seeds, so runs are comparable
+BENCH_SET = os.path.join(SETS_DIR, 'technobros.json')
+SEED = 1234
+
+# Baselines are per machine, so they live outside version control
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'bench_baseline.json')
+
+# Seconds of timed work per run, so short benchmarks aren't swamped by timer noise
+MIN_TIME = 0.05
+
+# A benchmark more than this much slower (in ops/sec) than its baseline is a regression
+DEFAULT_THRESHOLD = 0.25
+
+_card_pool = None
+
+
+def card_pool():
+    global _card_pool
+    if _card_pool is None:
+        _card_pool = load_card_pools([BENCH_SET])[BENCH_SET]
+    return _card_pool
+
+
+def new_game(seed=SEED, deck_size=30):
+    """Headless game with both decks built, nothing drawn, and energy to play anything."""
+    game = Game.from_sets(card_pool(), card_pool(), seed=seed, deck_size=deck_size, game_log=LOG_OFF)
+    game.board.reset(game.card_pool, game.opponent_card_pool, deck_size)
+    game.player.energy = game.opponent.energy = 10 ** 6
+    return game
+
+
+def definitions_of(card_type=None):
+    return [definition for definition in card_pool() if card_type is None or definition.card_type == card_type]
+
+
+def add_permanents(game, player, count, card_type=None):
+    """Put `count` cards in play for `player`, cycling through the set's permanents (or one card type)."""
+    definitions = [definition for definition in definitions_of(card_type) if definition.card_type != "spell"]
+    cards = []
+    for i in range(count):
+        card = game.create_card(definitions[i % len(definitions)], player)
+        (player.battlezone if card.card_type == "creature" else player.environs).append(card)
+        cards.append(card)
+    return cards
+
+
+# Each benchmark is a setup function: given a seed, it builds its fixture (not timed) and returns
+# (run, ops), where run() performs `ops` operations on the fixture and is what gets timed.
+
+def bench_build_deck(seed):
+    game = new_game(seed)
+
+    def run():
+        for _ in range(200):
+            game.player.deck.clear()
+            game.board.build_deck(game.card_pool, 30)
+    return run, 200
+
+
+def bench_draw_card(seed):
+    game = new_game(seed, deck_size=1000)
+
+    def run():
+        for _ in range(1000):
+            game.player.draw_card()
+    return run, 1000
+
+
+def play_card_bench(card_type):
+    def setup(seed):
+        game = new_game(seed, deck_size=200)
+        for player in (game.player, game.opponent):
+            add_permanents(game, player, 5, "creature")
+        definitions = definitions_of(card_type)
+        cards = [game.create_card(definitions[i % len(definitions)], game.player) for i in range(100)]
+        game.player.hand.extend(cards)
+
+        def run():
+            for card in cards:
+                game.player.play_card(card)
+        return run, len(cards)
+    return setup
+
+
+def upkeep_bench(permanents):
+    def setup(seed):
+        game = new_game(seed, deck_size=200)
+        add_permanents(game, game.player, permanents)
+        add_permanents(game, game.opponent, 5, "creature")
+        rounds = max(20, 2000 // permanents)
+
+        def run():
+            for _ in range(rounds):
+                upkeep_phase(game.board, player=True)
+        return run, rounds
+    return setup
+
+
+def bench_resolve_combat(seed):
+    game = new_game(seed)
+    combats = []
+    for _ in range(50):
+        # Five attackers, two of them unblocked
+        attackers = add_permanents(game, game.player, 5, "creature")
+        blockers = add_permanents(game, game.opponent, 3, "creature") + [None, None]
+        combats.append((attackers, blockers))
+
+    def run():
+        for attackers, blockers in combats:
+            resolve_combat_phase(game, attackers, blockers)
+    return run, len(combats)
+
+
+def bench_get_valid_targets(seed):
+    game = new_game(seed)
+    for player in (game.player, game.opponent):
+        add_permanents(game, player, 50)
+    card_types = ("creature_or_player", "creature", "enchantment", "equipment")
+
+    def run():
+        for _ in range(250):
+            for card_type in card_types:
+                game.get_valid_targets(card_type)
+    return run, 250 * len(card_types)
+
+
+def bench_headless_game(seed):
+    card_pools = {BENCH_SET: card_pool()}
+
+    def run():
+        for i in range(20):
+            play_game(BENCH_SET, BENCH_SET, seed=seed + i, card_pools=card_pools, ai="random")
+    return run, 20
+
+
+BENCHMARKS = {
+    "board.build_deck": bench_build_deck,
+    "player.draw_card": bench_draw_card,
+    "player.play_card:creature": play_card_bench("creature"),
+    "player.play_card:spell": play_card_bench("spell"),
+    "player.play_card:enchantment": play_card_bench("enchantment"),
+    "player.play_card:equipment": play_card_bench("equipment"),
+    "turns.upkeep_phase:5": upkeep_bench(5),
+    "turns.upkeep_phase:50": upkeep_bench(50),
+    "turns.upkeep_phase:500": upkeep_bench(500),
+    "combat.resolve_combat_phase": bench_resolve_combat,
+    "game.get_valid_targets": bench_get_valid_targets,
+    "game.headless_random": bench_headless_game,
+}
+
+
+def measure(setup, repeat=5, min_time=MIN_TIME):
+    """Best ops/sec over `repeat` runs, and peak traced memory growth per op (bytes) of one more.
+
+    Fixtures are used up by their run, so each timed run sets up and runs fresh fixtures (same
+    seed) until it has spent `min_time` seconds inside run().
+    """
+    best = 0.0
+    for i in range(repeat):
+        elapsed = 0.0
+        done = 0
+        while elapsed < min_time:
+            run, ops = setup(SEED + i)
+            gc.collect()
+            gc.disable()  # Like timeit: collections would land on whichever run happens to trigger them
+            try:
+                start = time.perf_counter()
+                run()
+                elapsed += time.perf_counter() - start
+            finally:
+                gc.enable()
+            done += ops
+        best = max(best, done / elapsed)
+
+    run, ops = setup(SEED)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"ops_per_sec": best, "bytes_per_op": (peak - before) / ops}
+
+
+def run_benchmarks(names, repeat=5):
+    return {name: measure(BENCHMARKS[name], repeat) for name in names}
+
+
+def regressions(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Names of benchmarks whose ops/sec fell more than `threshold` below the baseline."""
+    return [name for name, result in results.items()
+            if name in baseline and result["ops_per_sec"] < baseline[name]["ops_per_sec"] * (1 - threshold)]
+
+
+def print_report(results, baseline=None):
+    print(f"{'Benchmark':<32} {'ops/sec':>12} {'us/op':>10} {'mem B/op':>10} {'baseline':>12} {'change':>8}")
+    print("-" * 89)
+    for name, result in results.items():
+        ops_per_sec = result["ops_per_sec"]
+        line = f"{name:<32} {ops_per_sec:>12.0f} {1e6 / ops_per_sec:>10.2f} {result['bytes_per_op']:>10.0f}"
+        if baseline and name in baseline:
+            previous = baseline[name]["ops_per_sec"]
+            line += f" {previous:>12.0f} {100 * (ops_per_sec / previous - 1):>+7.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the engine's hot paths on fixed fixtures and compare with a baseline.")
+    parser.add_argument("benchmarks", nargs="*", help=f"names or name prefixes to run (default: all of "
+                                                      f"{', '.join(BENCHMARKS)})")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark; the fastest counts")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline file (default: bench_baseline.json)")
+    parser.add_argument("--save", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--check", action="store_true",
+                        help="exit with status 1 if a benchmark regressed beyond --threshold")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction of baseline ops/sec (default: 0.25)")
+    args = parser.parse_args()
+    configure()
+
+    names = []
+    for wanted in args.benchmarks or [""]:
+        # An exact name picks that benchmark alone, anything else is a prefix
+        names += [name for name in BENCHMARKS
+                  if (name == wanted if wanted in BENCHMARKS else name.startswith(wanted)) and name not in names]
+    if not names:
+        parser.error("no benchmarks match " + ", ".join(args.benchmarks))
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    elif args.check:
+        parser.error(f"no baseline at {args.baseline}; run with --save first")
+
+    results = run_benchmarks(names, args.repeat)
+    print_report(results, baseline)
+
+    if args.save:
+        # Keep baselines of benchmarks that weren't run this time
+        with open(args.baseline, 'w') as file:
+            json.dump({**(baseline or {}), **results}, file, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+    if args.check:
+        regressed = regressions(results, baseline, args.threshold)
+        if regressed:
+            print(f"\nRegressed by more than {100 * args.threshold:.0f}%: {', '.join(regressed)}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {100 * args.threshold:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
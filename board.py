@@ -1,8 +1,6 @@
 # card_game/board.py
-import random
 from colorama import Fore, Back, Style, init
-from card import Card
-from effects import Effect
+from zone import move
 
 init(autoreset=True)
 
@@ -25,6 +23,8 @@ class Board:
         self.opponent.environs.clear()
         self.opponent.deck.clear()
 
+        self.game.registry.clear()
+
         self.player.life = 20
         self.opponent.life = 20
         self.player.energy = 2
@@ -32,33 +32,22 @@ class Board:
 
         self.build_deck(player_card_pool, deck_size, player=True)
         self.build_deck(opponent_card_pool, deck_size, player=False)
-        print(Fore.GREEN + "Game reset!")
+        if not self.game.headless:
+            print(Fore.GREEN + "Game reset!")
 
     def build_deck(self, card_pool, deck_size=30, player=True):
+        owner = self.player if player else self.opponent
+        # Two copies of a card at most, or as many as it takes to fill a deck bigger than that
+        max_copies = max(2, -(-deck_size // len(card_pool)))
         deck = []
         card_counts = {}
         while len(deck) < deck_size:
-            card_data = random.choice(card_pool)
-            card_name = card_data['name']
-            if card_counts.get(card_name, 0) < 2:
-                card = Card(
-                    name=card_data['name'],
-                    card_type=card_data['card_type'],
-                    cost=card_data['cost'],
-                    attack=card_data['attack'],
-                    defense=card_data['defense'],
-                    description=card_data['description'],
-                    effects=card_data.get('effects', []),
-                    flavor_text=card_data.get('flavor_text', ''),
-                    owner=self.player if player else self.opponent
-                )
-                deck.append(card)
-                card_counts[card_name] = card_counts.get(card_name, 0) + 1
-
-        if player:
-            self.player.deck = deck
-        else:
-            self.opponent.deck = deck
+            definition = self.game.rng.choice(card_pool)
+            if card_counts.get(definition.name, 0) < max_copies:
+                deck.append(definition)
+                card_counts[definition.name] = card_counts.get(definition.name, 0) + 1
+
+        owner.deck.extend(deck)
 
     def display_board(self):
         print(Fore.CYAN + "\nOpponent's Battlezone:")
@@ -85,19 +74,13 @@ class Board:
 
     def move_card_to_graveyard(self, card, player):
         target_player = self.player if player else self.opponent
-        if card in target_player.hand:
-            target_player.hand.remove(card)
-        elif card in target_player.battlezone:
-            target_player.battlezone.remove(card)
+        if card.zone is target_player.battlezone:
             # Remove constant effects when a creature leaves the battlefield
             for effect in card.effects:
                 if effect['trigger'] == 'constant':
-                    effect_instance = Effect(effect['type'], -effect['value'], effect['trigger'], card.id)
-                    effect_instance.apply(self.game, target_player)
-        elif card in target_player.environs:
-            target_player.environs.remove(card)
-        card.owner.graveyard.append(card)  # Always move to the owner's graveyard
-        self.game.log_action(f"{card.name} moved to {card.owner.name}'s graveyard.")
+                    effect.apply(self.game, target_player, card.id, value=-effect['value'])
+        move(card, card.owner.graveyard)  # Always move to the owner's graveyard
+        self.game.log_action("%s moved to %s's graveyard.", card.name, card.owner.name)
 
     def __repr__(self):
         return (f"Opponent's Board:\n"
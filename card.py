@@ -1,26 +1,156 @@
-import uuid
+from typing import NamedTuple
 from colorama import Fore, Style
 from utils import check_and_destroy
-from effects import Effect, create_effect, Trigger
-from player import Player
+from effects import KNOWN_TRIGGERS, compile_effect
+from zone import move
+from log import get_logger
+
+log = get_logger('card')
+
+CARD_TYPES = ("creature", "spell", "enchantment", "equipment")
+
+# Required fields of a card in a set file and their types
+CARD_FIELDS = (("name", str), ("attack", int), ("defense", int), ("cost", int), ("description", str),
+               ("card_type", str))
+
+
+class CardDefinition(NamedTuple):
+    """The parts of a card that never change, loaded once per set and shared by every copy."""
+    name: str
+    attack: int
+    defense: int
+    cost: int
+    description: str
+    card_type: str
+    effects: tuple = ()
+    flavor_text: str = ""
+
+    @classmethod
+    def from_data(cls, card_data):
+        """Definition for a card dict from a set file; raises ValueError if it doesn't fit the set schema."""
+        if not isinstance(card_data, dict):
+            raise ValueError(f"card {card_data!r} is not an object")
+        for field, kind in CARD_FIELDS:
+            value = card_data.get(field)
+            if not isinstance(value, kind) or isinstance(value, bool):
+                raise ValueError(f"{field} must be {kind.__name__}, got {value!r}")
+        if card_data['card_type'] not in CARD_TYPES:
+            raise ValueError(f"unknown card type {card_data['card_type']!r} (choose from {', '.join(CARD_TYPES)})")
+        effects = card_data.get('effects', [])
+        if not isinstance(effects, list) or not all(isinstance(effect, dict) for effect in effects):
+            raise ValueError(f"effects must be a list of objects, got {effects!r}")
+        return cls(
+            name=card_data['name'],
+            attack=card_data['attack'],
+            defense=card_data['defense'],
+            cost=card_data['cost'],
+            description=card_data['description'],
+            card_type=card_data['card_type'],
+            effects=tuple(compile_effect(effect) for effect in effects),
+            flavor_text=card_data.get('flavor_text', '')
+        )
+
+
+def load_definitions(card_pool, warnings=None):
+    """Set data (dicts from a set file) as CardDefinitions; definitions pass through unchanged.
+
+    Cards are validated and their effects compiled on the way in: a malformed card or effect raises
+    ValueError, and an effect type or trigger the engine doesn't implement is logged as a warning
+    (and its message appended to `warnings`, if given, so a compiled set can repeat it).
+    """
+    definitions = []
+    for card_data in card_pool:
+        if not isinstance(card_data, CardDefinition):
+            try:
+                card_data = CardDefinition.from_data(card_data)
+            except ValueError as e:
+                raise ValueError(f"{card_data.get('name', 'unnamed card')}: {e}") from None
+            for effect in card_data.effects:
+                if not effect.known:
+                    message = f"{card_data.name}: unknown effect type {effect.type!r} will do nothing"
+                elif effect.trigger not in KNOWN_TRIGGERS:
+                    message = f"{card_data.name}: {effect.type} effect has trigger {effect.trigger!r}, which never fires"
+                else:
+                    continue
+                log.warning("%s", message)
+                if warnings is not None:
+                    warnings.append(message)
+        definitions.append(card_data)
+    return definitions
+
 
 class Card:
-    def __init__(self, name, attack, defense, cost, description, card_type, effects=None, flavor_text="", owner=None):
-        self.name = name
-        self.attack = attack
-        self.defense = defense
-        self.cost = cost
-        self.description = description
-        self.card_type = card_type
-        self.effects = effects if effects is not None else []
-        self.id = str(uuid.uuid4())[:8]  # Generate a new UUID and take first 8 characters
+    # Only per-copy state lives on the instance; everything else is read from the definition
+    __slots__ = ('definition', 'uid', 'id', 'owner', 'zone', 'attack', 'defense', '_tapped', '_summoning_sickness',
+                 'equipped_to', 'equipment', 'effect_processed', '_effects',
+                 'equipment_damage', 'equipment_damage_source')
+
+    def __init__(self, definition, owner=None):
+        self.definition = definition
+        self.attack = definition.attack
+        self.defense = definition.defense
+        self._effects = None  # This copy's own effect list once equipment rewrites it
+        self.uid = None  # Integer ID and its hex form, assigned by the game's CardRegistry
+        self.id = None
         self._summoning_sickness = True
         self._tapped = False
-        self.flavor_text = flavor_text
         self.owner = owner
+        self.zone = None  # The Zone holding this card, kept up to date by zone.move
         self.equipped_to = None  # Track which creature this equipment is attached to
         self.equipment = None  # Track what equipment is attached to this creature
         self.effect_processed = False  # Track if the effect has been processed
+        self.equipment_damage = 0  # Upkeep damage granted by attached equipment
+        self.equipment_damage_source = None
+
+    def clone(self):
+        # Copy of the per-copy state; owner and equipment links are remapped by Game.clone
+        copy = Card.__new__(Card)
+        copy.definition = self.definition
+        copy.uid = self.uid
+        copy.id = self.id
+        copy.owner = self.owner
+        copy.zone = None  # Set when the copy is placed in a copied zone
+        copy.attack = self.attack
+        copy.defense = self.defense
+        copy._tapped = self._tapped
+        copy._summoning_sickness = self._summoning_sickness
+        copy.equipped_to = self.equipped_to
+        copy.equipment = self.equipment
+        copy.effect_processed = self.effect_processed
+        copy._effects = None if self._effects is None else list(self._effects)
+        copy.equipment_damage = self.equipment_damage
+        copy.equipment_damage_source = self.equipment_damage_source
+        return copy
+
+    @property
+    def name(self):
+        return self.definition.name
+
+    @property
+    def cost(self):
+        return self.definition.cost
+
+    @property
+    def description(self):
+        return self.definition.description
+
+    @property
+    def card_type(self):
+        return self.definition.card_type
+
+    @property
+    def flavor_text(self):
+        return self.definition.flavor_text
+
+    @property
+    def effects(self):
+        return self.definition.effects if self._effects is None else self._effects
+
+    @effects.setter
+    def effects(self, value):
+        self._effects = [compile_effect(effect) for effect in value]
+        if self.zone is not None and self.zone.events is not None:
+            self.zone.events.subscribe(self)  # Its triggers may have changed
 
     def reset_effect_processed(self):
         self.effect_processed = False
@@ -71,50 +201,46 @@ class Card:
 
 
     def destroy(self, game):
-        print(f"DEBUG: Destroying {self.name} (ID: {self.id})")
+        log.debug("Destroying %s (ID: %s)", self.name, self.id)
         if self.card_type == "creature" and self.equipment:
             for equip in self.equipment:
                 equip.unequip(game)
-        if self in self.owner.battlezone:
-            self.owner.battlezone.remove(self)
-        elif self in self.owner.environs:
-            self.owner.environs.remove(self)
-        self.owner.graveyard.append(self)
-        game.log_action(f"{self.name} was destroyed and moved to {self.owner.name}'s graveyard.")
+        move(self, self.owner.graveyard)
+        game.log_action("%s was destroyed and moved to %s's graveyard.", self.name, self.owner.name)
 
     def fight(self, other):
         self.defense -= other.attack
         other.defense -= self.attack
-        print(f"DEBUG: {self.name} (ID: {self.id}) fought {other.name} (ID: {other.id})")
+        log.debug("%s (ID: %s) fought %s (ID: %s)", self.name, self.id, other.name, other.id)
 
 
     def receive_damage(self, amount):
         self.defense -= amount
-        print(f"DEBUG: {self.name} (ID: {self.id}) received {amount} damage. New defense: {self.defense}")
+        log.debug("%s (ID: %s) received %s damage. New defense: %s", self.name, self.id, amount, self.defense)
         if self.defense <= 0:
-            print(f"DEBUG: {self.name} (ID: {self.id}) was destroyed")
+            log.debug("%s (ID: %s) was destroyed", self.name, self.id)
             return True  # Indicate that the card was destroyed
         return False
 
     def apply_effects(self, game, player):
         if self.effect_processed:
-            print(f"DEBUG: Skipping already processed effects for {self.name} (ID: {self.id})")
+            log.debug("Skipping already processed effects for %s (ID: %s)", self.name, self.id)
             return
         self.effect_processed = True  # Set the flag to indicate that the effect has been processed
         processed_effects = set()  # Add this line at the beginning of the function
         for effect in self.effects:
             effect_key = (self.id, effect['type'], effect.get('source_id'))
             if effect_key in processed_effects:
-                print(f"DEBUG: Skipping already processed effect: {effect}")
+                log.debug("Skipping already processed effect: %s", effect)
                 continue
             processed_effects.add(effect_key)
-            print(f"DEBUG: Processing effect for {self.name} (ID: {self.id}): {effect}")
+            log.debug("Processing effect for %s (ID: %s): %s", self.name, self.id, effect)
             if 'trigger' in effect:
                 if effect['trigger'] == 'constant':
                     if effect['type'] == 'equipment_cost_reduction':
                         value = effect.get('value', 0)
                         player.update_effect_modifier('equipment_cost_reduction', value)
-                        print(f"DEBUG: Applied equipment_cost_reduction of {value} for {self.name}")
+                        log.debug("Applied equipment_cost_reduction of %s for %s", value, self.name)
                     # Add other constant effects here
                 elif effect['trigger'] == 'upkeep':
                     if self.card_type == "equipment" and not self.equipped_to:
@@ -122,46 +248,35 @@ class Card:
                     if self.card_type == "equipment" and effect['type'] == 'deal_damage':
                         continue  # Skip this, it's handled in game.py now
                     if effect['type'] == 'deal_damage':
-                        print(f"DEBUG: Triggering upkeep deal_damage effect for {self.name} (ID: {self.id})")
+                        log.debug("Triggering upkeep deal_damage effect for %s (ID: %s)", self.name, self.id)
                         target = game.select_target(card_type="creature", effect_description=f"{self.name} can deal {effect['value']} damage to any target creature:", player=player)
                         if target:
-                            target.receive_damage(effect['value'])
-                            game.log_action(f"{self.name} dealt {effect['value']} damage to {target.name} (ID: {target.id})")
+                            effect.apply(game, player, self.id, target=target, source_name=self.name)
                     # Add other upkeep effects here
                 elif effect['trigger'] == 'on_cast':
                     if self.card_type == "equipment" and not self.equipped_to:
                         continue  # Skip effects if the equipment is not equipped
                     if effect['type'] == 'draw_cards':
-                        print(f"Attempting to create effect: {effect}")
-                        effect_obj = create_effect(effect['type'], effect['value'], effect['trigger'], self.id)
-                        print(f"Effect object created: {effect_obj}")
-                        effect_obj.apply(game, player)
+                        effect.apply(game, player, self.id)
                     elif effect['type'] == 'destroy_equipment':
                         effect_value = effect.get('value', 0)  # Provide a default value of 0 if 'value' key is missing
                         target = game.select_target(card_type="equipment", effect_description=f"{self.name} can destroy {effect_value} equipment:", player=player)
                         if target:
-                            target.destroy(game)
-                            game.log_action(f"{self.name} destroyed {target.name} (ID: {target.id})")
+                            effect.apply(game, player, self.id, target=target, source_name=self.name)
                     elif effect['type'] == 'destroy_enchantment':
                         effect_value = effect.get('value', 0)  # Provide a default value of 0 if 'value' key is missing
                         target = game.select_target(card_type="enchantment", effect_description=f"{self.name} can destroy {effect_value} enchantment:", player=player)
                         if target:
-                            target.destroy(game)
-                            game.log_action(f"{self.name} destroyed {target.name} (ID: {target.id})")
+                            effect.apply(game, player, self.id, target=target, source_name=self.name)
                     elif effect['type'] == 'deal_damage':
-                        print(f"DEBUG: Triggering on_cast deal_damage effect for {self.name} (ID: {self.id})")
+                        log.debug("Triggering on_cast deal_damage effect for %s (ID: %s)", self.name, self.id)
                         target = game.select_target(card_type="creature_or_player", effect_description=f"{self.name} can deal {effect['value']} damage to any target:", player=player)
                         if target:
-                            if isinstance(target, Player):
-                                target.take_damage(effect['value'])
-                                game.log_action(f"{self.name} dealt {effect['value']} damage to {target.name}")
-                            else:
-                                target.receive_damage(effect['value'])
-                                game.log_action(f"{self.name} dealt {effect['value']} damage to {target.name} (ID: {target.id})")
+                            effect.apply(game, player, self.id, target=target, source_name=self.name)
                         else:
-                            print(f"DEBUG: No target selected for deal_damage effect")
+                            log.debug("No target selected for deal_damage effect")
             else:
-                print(f"DEBUG: Effect has no trigger: {effect}")
+                log.debug("Effect has no trigger: %s", effect)
 
     def remove_effects(self, game, player):
         for effect in self.effects:
@@ -169,7 +284,7 @@ class Card:
                 if effect['type'] == 'equipment_cost_reduction':
                     value = effect.get('value', 0)
                     player.update_effect_modifier('equipment_cost_reduction', -value)
-                    print(f"DEBUG: Removed equipment_cost_reduction of {value} for {self.name}")
+                    log.debug("Removed equipment_cost_reduction of %s for %s", value, self.name)
                 # Add other constant effects here
 
     def get_adjusted_cost(self, player):
@@ -202,16 +317,15 @@ class Card:
             elif effect['type'] == 'gain_defense':
                 target.defense += effect['value']
             elif effect['type'] == 'deal_damage' and effect['trigger'] == 'upkeep':
-                # Remove any existing upkeep damage effects from the target
-                target.effects = [e for e in target.effects if e.get('source_id') != self.id]
-                # Add the new effect to the target
-                target.effects.append({
+                # Replace any existing upkeep damage effects from this equipment with the new one
+                # (assigned in one go so the target's trigger subscriptions see the result)
+                target.effects = [e for e in target.effects if e.get('source_id') != self.id] + [{
                     "type": "deal_damage",
                     "value": effect['value'],
                     "trigger": "upkeep",
                     "source_id": self.id,
                     "source_name": self.name
-                })
+                }]
         
         # Remove upkeep effects from the equipment itself
         self.effects = [e for e in self.effects if e.get('trigger') != 'upkeep']
@@ -220,13 +334,13 @@ class Card:
 
     def unequip(self):
         if self.equipped_to:
-            print(f"DEBUG: Unequipping {self.name} from {self.equipped_to.name}")
+            log.debug("Unequipping %s from %s", self.name, self.equipped_to.name)
             self.remove_equipment_effects(self.equipped_to)
             self.equipped_to.equipment = None
             self.equipped_to = None
             if self not in self.owner.environs:
                 self.owner.environs.append(self)
-            self.owner.game.log_action(f"{self.name} was unequipped and moved to {self.owner.name}'s environs.")
+            self.owner.game.log_action("%s was unequipped and moved to %s's environs.", self.name, self.owner.name)
 
     def apply_equipment_effects(self, target):
         for effect in self.effects:
@@ -244,14 +358,14 @@ class Card:
         for effect in self.effects:
             if effect['type'] == 'gain_attack':
                 target.attack -= effect['value']
-                print(f"DEBUG: {target.name}'s attack decreased by {effect['value']} to {target.attack}")
+                log.debug("%s's attack decreased by %s to %s", target.name, effect['value'], target.attack)
             elif effect['type'] == 'gain_defense':
                 target.defense -= effect['value']
-                print(f"DEBUG: {target.name}'s defense decreased by {effect['value']} to {target.defense}")
+                log.debug("%s's defense decreased by %s to %s", target.name, effect['value'], target.defense)
             elif effect['type'] == 'deal_damage' and effect['trigger'] == 'upkeep':
                 target.effects = [
                     e for e in target.effects
                     if e.get("source_id") != self.id
                 ]
-                print(f"DEBUG: {target.name} lost upkeep effect to deal {effect['value']} damage")
+                log.debug("%s lost upkeep effect to deal %s damage", target.name, effect['value'])
 
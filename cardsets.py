@@ -0,0 +1,138 @@
+# card_game/cardsets.py
+import argparse
+import glob
+import hashlib
+import json
+import os
+import pickle
+import sys
+from card import load_definitions
+from log import configure, get_logger
+
+log = get_logger('card')
+
+SETS_DIR = os.path.join(os.path.dirname(__file__), 'sets')
+
+# Bump when CardDefinition, CompiledEffect or the compiled file change shape, so old compiled sets are rebuilt
+FORMAT_VERSION = 2
+
+# Compiled sets are written next to their source, like Python's own bytecode cache
+CACHE_DIR = '__pycache__'
+CACHE_SUFFIX = '.cardset'
+
+# Set path -> (mtime_ns, size, definitions) for every set this process has loaded
+_loaded = {}
+
+
+def compile_set(set_path):
+    """Parse and validate a set file; raises ValueError naming the set and card on bad data.
+
+    Returns the definitions, the warnings logged about them and the source's sha256.
+    """
+    with open(set_path, 'rb') as file:
+        source = file.read()
+    try:
+        cards = json.loads(source)
+        if not isinstance(cards, list):
+            raise ValueError("a set must be a list of cards")
+        warnings = []
+        definitions = tuple(load_definitions(cards, warnings))
+        return definitions, tuple(warnings), hashlib.sha256(source).hexdigest()
+    except ValueError as e:
+        raise ValueError(f"{set_path}: {e}") from None
+
+
+def cache_path(set_path):
+    directory, name = os.path.split(os.path.abspath(set_path))
+    return os.path.join(directory, CACHE_DIR, os.path.splitext(name)[0] + CACHE_SUFFIX)
+
+
+def _read_cache(set_path, stat):
+    """(definitions, warnings) from the compiled set if it is still current, else None.
+
+    The header (format, source mtime and size, source hash) is its own pickle ahead of the cards,
+    so a stale cache is rejected without unpickling them. A source whose mtime changed but whose
+    contents hash the same (a touch, a fresh checkout) still uses the cache.
+    """
+    try:
+        with open(cache_path(set_path), 'rb') as file:
+            header = pickle.load(file)
+            if header.get('version') != FORMAT_VERSION:
+                return None
+            if (header.get('mtime_ns'), header.get('size')) != (stat.st_mtime_ns, stat.st_size):
+                with open(set_path, 'rb') as source:
+                    if hashlib.sha256(source.read()).hexdigest() != header.get('sha256'):
+                        return None
+            return pickle.load(file)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError) as e:
+        if not isinstance(e, FileNotFoundError):
+            log.debug("Ignoring compiled set for %s: %s", set_path, e)
+        return None
+
+
+def _write_cache(set_path, stat, definitions, warnings, digest):
+    path = cache_path(set_path)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    header = {'version': FORMAT_VERSION, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': digest}
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temporary, 'wb') as file:
+            pickle.dump(header, file, pickle.HIGHEST_PROTOCOL)
+            pickle.dump((definitions, warnings), file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)  # Atomic, so a concurrent reader never sees half a file
+    except OSError as e:
+        log.debug("Could not write compiled set for %s: %s", set_path, e)
+
+
+def load_set(set_path, recompile=False):
+    """CardDefinitions of a set file, as a new list.
+
+    Each set is parsed once per process and once per change on disk: repeat loads come from memory
+    while the file's mtime and size are unchanged, and a first load in a new process reads the
+    compiled set from __pycache__ when it is current. Definitions are immutable, so every game
+    shares them. Validation problems are found when the set is compiled (see load_definitions);
+    the compiled set keeps its warnings and logs them again on every process's first load.
+    `recompile` parses the source again and rewrites the compiled set.
+    """
+    key = os.path.abspath(set_path)
+    stat = os.stat(key)
+    loaded = _loaded.get(key)
+    if not recompile and loaded is not None and loaded[:2] == (stat.st_mtime_ns, stat.st_size):
+        return list(loaded[2])
+    cached = None if recompile else _read_cache(key, stat)
+    if cached is None:
+        definitions, warnings, digest = compile_set(key)
+        _write_cache(key, stat, definitions, warnings, digest)
+    else:
+        definitions, warnings = cached
+        for message in warnings:
+            log.warning("%s", message)
+    _loaded[key] = (stat.st_mtime_ns, stat.st_size, definitions)
+    return list(definitions)
+
+
+def clear_cache():
+    """Forget the sets loaded in this process (the compiled files on disk are kept)."""
+    _loaded.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate card sets and write their compiled form.")
+    parser.add_argument("sets", nargs="*", help="set files to compile (default: sets/*.json)")
+    args = parser.parse_args()
+    configure()
+
+    failed = False
+    for set_path in args.sets or sorted(glob.glob(os.path.join(SETS_DIR, '*.json'))):
+        try:
+            definitions = load_set(set_path, recompile=True)
+        except (OSError, ValueError) as e:
+            print(f"error: {e}", file=sys.stderr)
+            failed = True
+            continue
+        print(f"{set_path}: {len(definitions)} cards -> {cache_path(set_path)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
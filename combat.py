@@ -1,11 +1,17 @@
 from display import display_game_state, display_graveyard, display_card_info, display_cards_in_play
 from colorama import Fore, Back, Style
 from utils import check_and_destroy
+from combat_solver import solve_blocks
+from log import get_logger
+from timing import timed
 
+log = get_logger('combat')
 
 
+
+@timed("combat.combat_phase")
 def combat_phase(game):
-    game.log_action(f"{game.current_player.name}'s Combat Phase")
+    game.log_action("%s's Combat Phase", game.current_player.name)
     available_attackers = [card for card in game.current_player.battlezone if not card.tapped and not card.summoning_sickness]
     
     if not available_attackers:
@@ -26,11 +32,8 @@ def combat_phase(game):
             display_cards_in_play(game.current_player, card_type="creature")
             attackers = declare_attackers(game, game.current_player)
             if attackers:
-                defending_player = game.player if game.current_player == game.opponent else game.opponent
-                if game.current_player == game.player:
-                    blockers = declare_blockers(game, defending_player, attackers)
-                else:
-                    blockers = ai_declare_blockers(game, defending_player, attackers)
+                defending_player = game.opponent_of(game.current_player)
+                blockers = declare_blockers(game, defending_player, attackers)
                 resolve_combat_phase(game, attackers, blockers)
             break
         elif choice == '2':
@@ -50,85 +53,36 @@ def combat_phase(game):
 def declare_attackers(game, attacking_player):
     available_attackers = [creature for creature in attacking_player.battlezone if creature.can_attack()]
     if not available_attackers:
-        print("No available attackers.")
+        if attacking_player.controller.is_human:
+            print("No available attackers.")
+        else:
+            log.debug("%s has no available attackers", attacking_player.name)
         return []
 
-    print("Available attackers:")
-    for i, creature in enumerate(available_attackers, 1):
-        print(f"{i}. {creature.name} (ATK: {creature.attack}, DEF: {creature.defense})")
-
-    while True:
-        attacker_input = input("Enter the indices of attacking creatures (comma-separated) or 'pass': ").strip().lower()
-        if attacker_input == 'pass':
-            return []
-        try:
-            attacker_indices = [int(i) - 1 for i in attacker_input.split(',')]
-            attackers = [available_attackers[i] for i in attacker_indices if 0 <= i < len(available_attackers)]
-            for attacker in attackers:
-                attacker.tap()
-                game.log_action(f"{attacker.name} is tapped and attacking.")
-            return attackers
-        except ValueError:
-            print("Invalid input. Please enter comma-separated numbers or 'pass'.")
+    attackers = attacking_player.controller.declare_attackers(game, attacking_player, available_attackers)
+    for attacker in attackers:
+        attacker.tap()
+        game.log_action("%s is tapped and attacking.", attacker.name)
+    return attackers
 
 def declare_blockers(game, defending_player, attackers):
     available_blockers = [creature for creature in defending_player.battlezone if not creature.tapped]
     if not available_blockers:
         return [None] * len(attackers)
 
-    print("Attacking creatures:")
-    for i, creature in enumerate(attackers, 1):
-        print(f"{i}. {creature.name} (ATK: {creature.attack}, DEF: {creature.defense})")
-
-    print("\nAvailable blockers:")
-    for i, creature in enumerate(available_blockers, 1):
-        print(f"{i}. {creature.name} (ATK: {creature.attack}, DEF: {creature.defense})")
-
-    blockers = [None] * len(attackers)
-    while True:
-        blocker_input = input("Enter the indices of blocking creatures (comma-separated, use 'x' for no blocker) or 'pass': ").strip().lower()
-        if blocker_input == 'pass':
-            return blockers
-        try:
-            blocker_indices = blocker_input.split(',')
-            for i, index in enumerate(blocker_indices):
-                if index == 'x':
-                    blockers[i] = None
-                else:
-                    blocker_index = int(index) - 1
-                    if 0 <= blocker_index < len(available_blockers):
-                        blockers[i] = available_blockers[blocker_index]
-                    else:
-                        print(f"Invalid blocker index: {index}. Ignoring this blocker.")
-            
-            for i, (attacker, blocker) in enumerate(zip(attackers, blockers)):
-                if blocker:
-                    game.log_action(f"{blocker.name} blocks {attacker.name}")
-                else:
-                    game.log_action(f"{attacker.name} is unblocked")
-            
-            return blockers
-        except ValueError:
-            print("Invalid input. Please enter comma-separated numbers, 'x', or 'pass'.")
-
-    return blockers
-
-def ai_declare_blockers(game, defending_player, attackers):
-    available_blockers = [creature for creature in defending_player.battlezone if not creature.tapped]
-    blockers = [None] * len(attackers)
-    
-    for i, attacker in enumerate(attackers):
-        potential_blockers = [b for b in available_blockers if b.defense >= attacker.attack]
-        if potential_blockers:
-            blocker = max(potential_blockers, key=lambda x: x.attack)
-            blockers[i] = blocker
-            available_blockers.remove(blocker)
-            game.log_action(f"{blocker.name} blocks {attacker.name}")
+    blockers = defending_player.controller.declare_blockers(game, defending_player, attackers, available_blockers)
+    for attacker, blocker in zip(attackers, blockers):
+        if blocker:
+            game.log_action("%s blocks %s", blocker.name, attacker.name)
         else:
-            game.log_action(f"{attacker.name} is unblocked")
-    
+            game.log_action("%s is unblocked", attacker.name)
     return blockers
 
+def ai_declare_blockers(game, defending_player, attackers, available_blockers=None):
+    if available_blockers is None:
+        available_blockers = [creature for creature in defending_player.battlezone if not creature.tapped]
+    return solve_blocks(attackers, available_blockers, defending_player.life)
+
 
 def assign_blockers(game, blockers, attackers):
     assignments = {}
@@ -137,6 +91,7 @@ def assign_blockers(game, blockers, attackers):
             assignments[attacker] = blocker
     return assignments
 
+@timed("combat.resolve_combat_phase")
 def resolve_combat_phase(game, attackers, blockers):
     for attacker, blocker in zip(attackers, blockers):
         resolve_combat(game, attacker, blocker)
@@ -152,15 +107,19 @@ def resolve_combat(game, attacker, defender):
         attacker.defense -= defender_damage
         defender.defense -= attacker_damage
         
-        game.log_action(f"{attacker.name} deals {attacker_damage} damage to {defender.name}.")
-        game.log_action(f"{defender.name} deals {defender_damage} damage to {attacker.name}.")
+        game.log_action("%s deals %s damage to %s.", attacker.name, attacker_damage, defender.name)
+        game.log_action("%s deals %s damage to %s.", defender.name, defender_damage, attacker.name)
+        game.metrics.combat_exchange(blocked=True)
+        game.metrics.damage("combat", "creature", attacker_damage + defender_damage)
         
         check_and_destroy(game.board, attacker)
         check_and_destroy(game.board, defender)
     else:
-        game.log_action(f"{attacker.name} attacks directly.")
+        game.log_action("%s attacks directly.", attacker.name)
         defending_player.life -= attacker_damage
-        game.log_action(f"{defending_player.name} takes {attacker_damage} damage.")
+        game.log_action("%s takes %s damage.", defending_player.name, attacker_damage)
+        game.metrics.combat_exchange(blocked=False)
+        game.metrics.damage("combat", "player", attacker_damage)
 
     return attacker.defense <= 0, defender.defense <= 0 if defender else False
 
@@ -172,10 +131,10 @@ def cleanup_phase(game, attacking_player, defending_player):
 
     if defending_player.life <= 0:
         game.game_over = True
-        game.log_action(f"{defending_player.name}'s life reached 0. {attacking_player.name} wins!")
+        game.log_action("%s's life reached 0. %s wins!", defending_player.name, attacking_player.name)
 
 def display_game_log(game):
     print("\n=== Game Log ===")
-    for log_entry in game.log[-20:]:  # Display the last 20 log entries
-        print(log_entry)
+    for log_entry in game.game_log.recent(20):  # Display the last 20 log entries
+        print(log_entry.text)
     print("================\n")
\ No newline at end of file
@@ -0,0 +1,150 @@
+# card_game/combat_solver.py
+from functools import lru_cache
+
+# Losing the game outweighs any board position
+LETHAL = 1000
+
+# Past these sizes blocks are assigned greedily and only "strongest k" attacks are considered
+EXHAUSTIVE_ATTACKERS = 6
+EXHAUSTIVE_BLOCKERS = 6
+
+
+def _exchange(attack, defense, blocker):
+    """Board value the defender gains when (attack, defense) is blocked by `blocker`.
+
+    Damage sticks in this engine (defense is lowered for good), so each side loses the damage it
+    took, or the creature's whole attack + defense if it dies.
+    """
+    blocker_attack, blocker_defense = blocker
+    attacker_loss = attack + defense if blocker_attack >= defense else blocker_attack
+    blocker_loss = blocker_attack + blocker_defense if attack >= blocker_defense else attack
+    return attacker_loss - blocker_loss
+
+
+@lru_cache(maxsize=65536)
+def _defend(attackers, blockers, life):
+    """Exact best (value, blocks) for the defender.
+
+    `attackers` and `blockers` are tuples of (attack, defense), blockers sorted. `blocks` has one
+    entry per attacker: the blocker's stats or None. Callers cap `life` at total attack + 1, so
+    boards that cannot be lethal share cache entries whatever the real life total.
+    """
+    if not attackers:
+        return 0, ()
+    attack, defense = attackers[0]
+    rest = attackers[1:]
+    rest_total = 0
+    for stats in rest:
+        rest_total += stats[0]
+    safe = life > attack + rest_total  # No way to die this combat
+
+    if attack >= life:
+        best_value, best_blocks = -LETHAL, (None,) * len(attackers)
+    else:
+        value, blocks = _defend(rest, blockers, life - attack)
+        best_value, best_blocks = value - attack, (None,) + blocks
+
+    rest_life = min(life, rest_total + 1)
+    previous = None
+    for i, blocker in enumerate(blockers):
+        if blocker == previous:
+            continue  # Same stats as the previous blocker
+        previous = blocker
+        exchange = _exchange(attack, defense, blocker)
+        # When the damage can't be lethal, a block worse than taking the hit only wastes the blocker
+        if safe and exchange <= -attack:
+            continue
+        value, blocks = _defend(rest, blockers[:i] + blockers[i + 1:], rest_life)
+        value += exchange
+        if value > best_value:
+            best_value, best_blocks = value, (blocker,) + blocks
+    return best_value, best_blocks
+
+
+def _greedy_defend(attackers, blockers, life):
+    """Each attacker in turn takes the best remaining blocker, if that beats taking the hit."""
+    free = list(blockers)
+    value = damage = 0
+    blocks = []
+    for attack, defense in attackers:
+        best, best_value = None, -attack
+        for i, blocker in enumerate(free):
+            exchange = _exchange(attack, defense, blocker)
+            if exchange > best_value:
+                best, best_value = i, exchange
+        if best is None:
+            damage += attack
+            blocks.append(None)
+        else:
+            blocks.append(free.pop(best))
+        value += best_value
+    return (-LETHAL if damage >= life else value), tuple(blocks)
+
+
+def _defense(attackers, blockers, life):
+    life = min(life, sum(stats[0] for stats in attackers) + 1)
+    if len(attackers) <= EXHAUSTIVE_ATTACKERS and len(blockers) <= EXHAUSTIVE_BLOCKERS:
+        return _defend(attackers, blockers, life)
+    return _greedy_defend(attackers, blockers, life)
+
+
+def _stats(card):
+    return (card.attack, card.defense)
+
+
+def solve_blocks(attackers, available_blockers, defender_life):
+    """Blocker (or None) for each attacker, maximizing the defender's board value minus damage taken."""
+    order = sorted(range(len(attackers)), key=lambda i: _stats(attackers[i]), reverse=True)
+    attacker_stats = tuple(_stats(attackers[i]) for i in order)
+    blocker_stats = tuple(sorted(_stats(card) for card in available_blockers))
+    _, blocks = _defense(attacker_stats, blocker_stats, defender_life)
+
+    by_stats = {}
+    for card in available_blockers:
+        by_stats.setdefault(_stats(card), []).append(card)
+    blockers = [None] * len(attackers)
+    for i, block in zip(order, blocks):
+        if block is not None:
+            blockers[i] = by_stats[block].pop()
+    return blockers
+
+
+def solve_attack(available_attackers, potential_blockers, defender_life):
+    """Attackers to send, assuming the defender answers with its best blocks.
+
+    An attacker that no blocker can profitably stop always attacks. The other ("contested")
+    attackers are searched: every subset for small boards, the n+1 "strongest k" subsets otherwise.
+    Subsets are tried best greedy-bound first and the search stops once the bound can no longer
+    beat the best exact answer. Ties go to the smaller attack.
+    """
+    blocker_stats = tuple(sorted(_stats(card) for card in potential_blockers))
+    free, contested = [], []
+    for card in sorted(available_attackers, key=_stats, reverse=True):
+        attack, defense = _stats(card)
+        if any(_exchange(attack, defense, blocker) > -attack for blocker in blocker_stats):
+            contested.append(card)
+        else:
+            free.append(card)
+
+    if len(contested) <= EXHAUSTIVE_ATTACKERS:
+        subsets = [[card for bit, card in enumerate(contested) if mask >> bit & 1] for mask in range(1 << len(contested))]
+    else:
+        subsets = [contested[:k] for k in range(len(contested) + 1)]
+
+    candidates = []
+    for subset in subsets:
+        attackers = sorted(free + subset, key=_stats, reverse=True)
+        attacker_stats = tuple(_stats(card) for card in attackers)
+        # Any defense is a lower bound on the best defense, so greedy bounds the attacker's value
+        bound = -_greedy_defend(attacker_stats, blocker_stats, defender_life)[0]
+        candidates.append((bound, attackers, attacker_stats))
+    candidates.sort(key=lambda candidate: (-candidate[0], len(candidate[1])))
+
+    best_value, best_attackers = None, []
+    for bound, attackers, attacker_stats in candidates:
+        if best_value is not None and bound < best_value:
+            break
+        value = -_defense(attacker_stats, blocker_stats, defender_life)[0]
+        if best_value is None or value > best_value or (value == best_value and len(attackers) < len(best_attackers)):
+            best_value, best_attackers = value, attackers
+    return best_attackers
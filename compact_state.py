@@ -0,0 +1,361 @@
+# card_game/compact_state.py
+import numpy as np
+from card import CardDefinition
+
+# Columns of every zone slot
+DEFINITION, ATTACK, DEFENSE, TAPPED, SICK, EQUIPMENT = range(6)
+FIELDS = 6
+EMPTY = -1  # DEFINITION of an unused slot, EQUIPMENT of a creature with nothing attached
+
+PLAYER, OPPONENT = 0, 1
+NO_WINNER, DRAW = -1, 2
+
+MAX_BATTLEZONE = 5  # Same cap as ai_can_play_card
+MAX_HAND = 7  # end_phase discards down to this
+
+
+class CardTable:
+    """Card definitions by index, with the cost/type columns the vectorized rules read."""
+
+    def __init__(self, card_pools=()):
+        self.definitions = []
+        self.index = {}
+        self._columns = None
+        for card_pool in card_pools:
+            for card_data in card_pool:
+                self.add(card_data)
+
+    def add(self, definition):
+        if not isinstance(definition, CardDefinition):
+            definition = CardDefinition.from_data(definition)
+        if definition.name not in self.index:
+            self.index[definition.name] = len(self.definitions)
+            self.definitions.append(definition)
+            self._columns = None
+        return self.index[definition.name]
+
+    def index_of(self, card):
+        index = self.index.get(card.name)
+        return self.add(card.definition) if index is None else index
+
+    def index_of_definition(self, definition):
+        index = self.index.get(definition.name)
+        return self.add(definition) if index is None else index
+
+    @property
+    def cost(self):
+        return self.columns()[0]
+
+    @property
+    def is_creature(self):
+        return self.columns()[1]
+
+    def columns(self):
+        if self._columns is None:
+            cost = np.array([definition.cost for definition in self.definitions], dtype=np.int32)
+            is_creature = np.array([definition.card_type == 'creature' for definition in self.definitions], dtype=bool)
+            self._columns = (cost, is_creature)
+        return self._columns
+
+
+class CompactState:
+    """Many games side by side as fixed-width NumPy arrays.
+
+    `battlezone`, `hand` and `deck` have shape (games, 2, slots, FIELDS): side 0 is the game's
+    player, side 1 its opponent, and each slot holds a card's definition index (EMPTY when unused),
+    attack, defense, tapped, summoning sickness and the definition index of attached equipment.
+    Decks are drawn from slot 0 up; `deck_next` is the next slot to draw. `current` is the side to
+    move next, `turn` the number of turns played and `winner` a side, DRAW or NO_WINNER.
+
+    Environs and graveyards are not represented; conversions happen between turns.
+    """
+
+    def __init__(self, games, table, battlezone_slots=8, hand_slots=16, deck_slots=64):
+        self.table = table
+        self.battlezone = self._zone(games, battlezone_slots)
+        self.hand = self._zone(games, hand_slots)
+        self.deck = self._zone(games, deck_slots)
+        self.deck_next = np.zeros((games, 2), dtype=np.int32)
+        self.life = np.full((games, 2), 20, dtype=np.int32)
+        self.energy = np.zeros((games, 2), dtype=np.int32)
+        self.current = np.zeros(games, dtype=np.int8)
+        self.turn = np.zeros(games, dtype=np.int32)
+        self.winner = np.full(games, NO_WINNER, dtype=np.int8)
+
+    @staticmethod
+    def _zone(games, slots):
+        zone = np.zeros((games, 2, slots, FIELDS), dtype=np.int16)
+        zone[..., DEFINITION] = EMPTY
+        zone[..., EQUIPMENT] = EMPTY
+        return zone
+
+    def __len__(self):
+        return len(self.winner)
+
+    @classmethod
+    def from_games(cls, games, table=None, **slots):
+        """Pack object games (between turns) into one state, game i in row i."""
+        if table is None:
+            table = CardTable([pool for game in games for pool in (game.card_pool, game.opponent_card_pool)])
+        state = cls(len(games), table, **slots)
+        for row, game in enumerate(games):
+            for side, player in enumerate((game.player, game.opponent)):
+                state._pack_zone(state.battlezone, row, side, player.battlezone, "battlezone")
+                state._pack_zone(state.hand, row, side, player.hand, "hand")
+                state._pack_deck(row, side, player.deck)
+                state.life[row, side] = player.life
+                state.energy[row, side] = player.energy
+            state.current[row] = PLAYER if game.current_player is game.player else OPPONENT
+            state.turn[row] = game.turn_counter
+            if game.game_over:
+                if game.winner is None:
+                    state.winner[row] = DRAW
+                else:
+                    state.winner[row] = PLAYER if game.winner is game.player else OPPONENT
+        return state
+
+    def _pack_zone(self, zone, row, side, cards, zone_name):
+        if len(cards) > zone.shape[2]:
+            raise ValueError(f"{zone_name} holds {len(cards)} cards but only {zone.shape[2]} slots are available; "
+                             f"raise {zone_name}_slots")
+        for slot, card in enumerate(cards):
+            equipment = card.equipment
+            zone[row, side, slot] = (
+                self.table.index_of(card), card.attack, card.defense, card.tapped, card.summoning_sickness,
+                self.table.index_of(equipment) if equipment is not None else EMPTY,
+            )
+
+    def _pack_deck(self, row, side, deck):
+        if len(deck) > self.deck.shape[2]:
+            raise ValueError(f"deck holds {len(deck)} cards but only {self.deck.shape[2]} slots are available; "
+                             f"raise deck_slots")
+        for slot, definition in enumerate(deck):
+            self.deck[row, side, slot] = (
+                self.table.index_of_definition(definition), definition.attack, definition.defense, 0, 1, EMPTY)
+
+    def to_game(self, row, template):
+        """Object game for row `row`, built on a clone of `template` (the game it came from).
+
+        Battlezone, hand, deck, life, energy, turn and result come from the arrays as new cards;
+        the template's environs and graveyards are kept, minus equipment, which is rebuilt from
+        the equipment slots.
+        """
+        game = template.clone()
+        players = (game.player, game.opponent)
+        for side, player in enumerate(players):
+            for card in [card for card in player.environs if card.card_type == "equipment"]:
+                player.environs.remove(card)
+            player.battlezone.clear()
+            for values in self.battlezone[row, side]:
+                if values[DEFINITION] == EMPTY:
+                    continue
+                card = self._unpack_card(game, player, values)
+                if values[EQUIPMENT] != EMPTY:
+                    equipment = game.create_card(self.table.definitions[values[EQUIPMENT]], player)
+                    equipment.equip(card)
+                    player.environs.append(equipment)
+                    card.attack, card.defense = int(values[ATTACK]), int(values[DEFENSE])  # Bonus already counted
+                player.battlezone.append(card)
+            player.hand.clear()
+            player.hand.extend(self._unpack_card(game, player, values)
+                               for values in self.hand[row, side] if values[DEFINITION] != EMPTY)
+            player.deck.clear()
+            player.deck.extend(self.table.definitions[values[DEFINITION]]
+                               for values in self.deck[row, side, self.deck_next[row, side]:] if values[DEFINITION] != EMPTY)
+            player.life = int(self.life[row, side])
+            player.energy = int(self.energy[row, side])
+        game.current_player = players[self.current[row]]
+        game.player_turn = game.current_player is game.player
+        game.turn_counter = int(self.turn[row])
+        game.last_played_card = None
+        winner = self.winner[row]
+        game.game_over = winner != NO_WINNER
+        game.winner = players[winner] if winner in (PLAYER, OPPONENT) else None
+        return game
+
+    def _unpack_card(self, game, player, values):
+        card = game.create_card(self.table.definitions[values[DEFINITION]], player)
+        card.attack, card.defense = int(values[ATTACK]), int(values[DEFENSE])
+        card.tapped = bool(values[TAPPED])
+        card.summoning_sickness = bool(values[SICK])
+        return card
+
+    def repeat(self, count):
+        """State with every row repeated `count` times (rows 0..count-1 copy game 0, and so on)."""
+        copy = CompactState.__new__(CompactState)
+        copy.table = self.table
+        for name in ('battlezone', 'hand', 'deck', 'deck_next', 'life', 'energy', 'current', 'turn', 'winner'):
+            setattr(copy, name, np.repeat(getattr(self, name), count, axis=0))
+        return copy
+
+
+def playout(state, rng, max_turns=200):
+    """Play every unfinished game in `state` to the end, all in lock-step. Returns `state.winner`.
+
+    Turns use a simplified policy of their own: upkeep (gain 1 energy, untap, draw), one random
+    affordable creature per main phase, attack with everything, block each attacker with the
+    strongest untapped creature that survives the hit, random discards down to 7. It is not the
+    built-in AI, which attacks and blocks through combat_solver. Only vanilla creature stats are
+    modelled: spells, environs and card effects are skipped, so this is for fast statistical
+    rollouts rather than exact replays.
+    `rng` is a numpy Generator.
+    """
+    while True:
+        active = np.flatnonzero(state.winner == NO_WINNER)
+        if not len(active):
+            break
+        sides = state.current[active].astype(np.intp)
+        state.turn[active] += 1
+        _upkeep(state, active, sides)
+        _main_phase(state, active, sides, rng)
+        _combat(state, active, sides)
+        _main_phase(state, active, sides, rng)
+        _end_phase(state, active, sides, rng)
+
+        dead = state.life[active] <= 0
+        player_dead, opponent_dead = dead[:, PLAYER], dead[:, OPPONENT]
+        winner = np.where(player_dead & opponent_dead, DRAW,
+                          np.where(player_dead, OPPONENT, np.where(opponent_dead, PLAYER, NO_WINNER)))
+        winner[(winner == NO_WINNER) & (state.turn[active] >= max_turns)] = DRAW
+        state.winner[active] = winner
+        state.current[active] = 1 - sides
+    return state.winner
+
+
+def _first_empty(zone):
+    """Index of the first unused slot per row, or -1 when the zone is full."""
+    empty = zone[..., DEFINITION] == EMPTY
+    return np.where(empty.any(axis=1), empty.argmax(axis=1), -1)
+
+
+def _upkeep(state, games, sides):
+    state.energy[games, sides] += 1
+    battlezone = state.battlezone[games, sides]
+    battlezone[..., TAPPED] = 0
+    battlezone[..., SICK] = 0
+    state.battlezone[games, sides] = battlezone
+
+    # Draw; with a full hand the card is lost
+    next_slot = state.deck_next[games, sides]
+    has_card = next_slot < state.deck.shape[2]
+    drawing, draw_sides, draw_slots = games[has_card], sides[has_card], next_slot[has_card]
+    cards = state.deck[drawing, draw_sides, draw_slots]
+    has_card[has_card] = cards[:, DEFINITION] != EMPTY
+    state.deck_next[games, sides] += has_card
+    keep = cards[:, DEFINITION] != EMPTY
+    drawing, draw_sides, cards = drawing[keep], draw_sides[keep], cards[keep]
+    hand_slots = _first_empty(state.hand[drawing, draw_sides])
+    room = hand_slots >= 0
+    state.hand[drawing[room], draw_sides[room], hand_slots[room]] = cards[room]
+
+
+def _main_phase(state, games, sides, rng):
+    hand = state.hand[games, sides]
+    definitions = hand[..., DEFINITION].astype(np.intp)
+    occupied = definitions != EMPTY
+    cost = np.where(occupied, state.table.cost[definitions], 0)
+    playable = (occupied & state.table.is_creature[definitions]
+                & (cost <= state.energy[games, sides][:, None]))
+    in_play = (state.battlezone[games, sides][..., DEFINITION] != EMPTY).sum(axis=1)
+    playable &= (in_play < MAX_BATTLEZONE)[:, None]
+
+    keys = np.where(playable, rng.random(playable.shape), -1.0)
+    chosen = keys.argmax(axis=1)
+    playing = playable.any(axis=1)
+    games, sides, chosen = games[playing], sides[playing], chosen[playing]
+    slots = _first_empty(state.battlezone[games, sides])
+    room = slots >= 0
+    games, sides, chosen, slots = games[room], sides[room], chosen[room], slots[room]
+
+    cards = state.hand[games, sides, chosen]
+    cards[:, TAPPED] = 1
+    cards[:, SICK] = 1
+    state.battlezone[games, sides, slots] = cards
+    state.energy[games, sides] -= state.table.cost[cards[:, DEFINITION].astype(np.intp)]
+    state.hand[games, sides, chosen, DEFINITION] = EMPTY
+
+
+def resolve_combat_batch(state, games, sides, attacker_slots, blocker_slots):
+    """Resolve attacker/blocker pairs from any number of games at once.
+
+    Pair i is the creature in battlezone slot `attacker_slots[i]` of side `sides[i]` in game
+    `games[i]`, blocked by slot `blocker_slots[i]` of the other side (-1 when unblocked). Same rules
+    as combat.resolve_combat followed by check_and_destroy: blocked pairs deal their attack to each
+    other, unblocked attackers deal theirs to the defending player, and every creature left at
+    defense <= 0 is destroyed (its equipment with it; environs are not modelled). A blocker named in
+    several pairs takes and deals damage in each, as it does in the object engine.
+
+    Returns (attacker_destroyed, blocker_destroyed) per pair.
+    """
+    games = np.asarray(games, dtype=np.intp)
+    sides = np.asarray(sides, dtype=np.intp)
+    attacker_slots = np.asarray(attacker_slots, dtype=np.intp)
+    blocker_slots = np.asarray(blocker_slots, dtype=np.intp)
+    defending = 1 - sides
+    blocked = blocker_slots >= 0
+    unblocked = ~blocked
+
+    defense = state.battlezone[..., DEFENSE]
+    attack = state.battlezone[games, sides, attacker_slots, ATTACK]
+    attacker_index = (games[blocked], sides[blocked], attacker_slots[blocked])
+    blocker_index = (games[blocked], defending[blocked], blocker_slots[blocked])
+    blocker_attack = state.battlezone[blocker_index + (ATTACK,)]
+    np.subtract.at(defense, attacker_index, blocker_attack)
+    np.subtract.at(defense, blocker_index, attack[blocked])
+    np.subtract.at(state.life, (games[unblocked], defending[unblocked]), attack[unblocked])
+
+    attacker_destroyed = defense[games, sides, attacker_slots] <= 0
+    blocker_destroyed = np.zeros(len(games), dtype=bool)
+    blocker_destroyed[blocked] = defense[blocker_index] <= 0
+
+    touched = np.unique(games)
+    battlezone = state.battlezone[touched]
+    destroyed = (battlezone[..., DEFINITION] != EMPTY) & (battlezone[..., DEFENSE] <= 0)
+    battlezone[..., DEFINITION][destroyed] = EMPTY
+    battlezone[..., EQUIPMENT][destroyed] = EMPTY
+    state.battlezone[touched] = battlezone
+    return attacker_destroyed, blocker_destroyed
+
+
+def _combat(state, games, sides):
+    attackers = state.battlezone[games, sides]
+    defenders = state.battlezone[games, 1 - sides]
+    attacking = (attackers[..., DEFINITION] != EMPTY) & (attackers[..., TAPPED] == 0) & (attackers[..., SICK] == 0)
+    attackers[..., TAPPED] |= attacking
+    state.battlezone[games, sides] = attackers
+    can_block = (defenders[..., DEFINITION] != EMPTY) & (defenders[..., TAPPED] == 0)
+
+    rows = np.arange(len(games))
+    pair_rows, pair_attackers, pair_blockers = [], [], []
+    for slot in range(attackers.shape[1]):
+        attack = attackers[:, slot, ATTACK]
+        # A blocker must survive the hit; the strongest such blocker takes it
+        survives = can_block & (defenders[..., DEFENSE] > attack[:, None])
+        strength = np.where(survives, defenders[..., ATTACK], np.iinfo(np.int16).min)
+        blocked = attacking[:, slot] & survives.any(axis=1)
+        blocker = np.where(blocked, strength.argmax(axis=1), -1)
+        can_block[rows[blocked], blocker[blocked]] = False
+
+        declared = attacking[:, slot]
+        pair_rows.append(rows[declared])
+        pair_attackers.append(np.full(declared.sum(), slot))
+        pair_blockers.append(blocker[declared])
+
+    pair_rows = np.concatenate(pair_rows)
+    if len(pair_rows):
+        resolve_combat_batch(state, games[pair_rows], sides[pair_rows],
+                             np.concatenate(pair_attackers), np.concatenate(pair_blockers))
+
+
+def _end_phase(state, games, sides, rng):
+    hand = state.hand[games, sides]
+    occupied = hand[..., DEFINITION] != EMPTY
+    over = occupied.sum(axis=1) > MAX_HAND
+    if not over.any():
+        return
+    games, sides, hand, occupied = games[over], sides[over], hand[over], occupied[over]
+    # Keep MAX_HAND cards picked at random, discard the rest
+    keys = np.where(occupied, rng.random(occupied.shape), -1.0)
+    ranks = (-keys).argsort(axis=1).argsort(axis=1)
+    hand[..., DEFINITION][occupied & (ranks >= MAX_HAND)] = EMPTY
+    state.hand[games, sides] = hand
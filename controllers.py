@@ -0,0 +1,310 @@
+# card_game/controllers.py
+from ai import ai_main_phase, ai_combat_phase, ai_choose_attackers, ai_select_target
+from combat import ai_declare_blockers
+from combat_solver import solve_attack, solve_blocks
+
+
+class Controller:
+    """Makes every decision for one player. Subclasses override the decision points they care about."""
+    is_human = False
+
+    def choose_set(self, available_sets):
+        return 0
+
+    def main_phase(self, game, player):
+        pass
+
+    def combat_phase(self, game, player):
+        pass
+
+    def choose_card_to_play(self, game, player, playable_cards):
+        return None
+
+    def declare_attackers(self, game, player, available_attackers):
+        return []
+
+    def declare_blockers(self, game, player, attackers, available_blockers):
+        return [None] * len(attackers)
+
+    def select_target(self, game, player, valid_targets, card_type=None, effect_description=None, friendly=False):
+        return None
+
+    def choose_discard(self, game, player):
+        return len(player.hand) - 1
+
+    def acknowledge(self, message):
+        pass
+
+    def ponder(self, game, player, situation, attackers=None):
+        """Called while the opponent, a human, decides: "turn" (main or combat phase), "attack" or "block".
+
+        A controller may think ahead in the background (see MCTSController.ponder). It must not
+        touch `game`, which the human's decision is about to change, after returning.
+        """
+        pass
+
+
+class HumanController(Controller):
+    """Terminal controller: every decision is read from input()."""
+    is_human = True
+
+    def choose_set(self, available_sets):
+        print("Available sets:")
+        for i, set_file in enumerate(available_sets, 1):
+            print(f"{i}. {set_file}")
+        return int(input("Select a set for your deck: ")) - 1
+
+    def main_phase(self, game, player):
+        while True:
+            game.refresh_views()
+            game.human_deciding(player, "turn")
+            options = [
+                "1. Play card", "2. Pass", "3. Game log",
+                "4. Graveyard", "5. Card info"
+            ]
+
+            # Add equip and unequip options if there are valid targets
+            if game.has_equipment_to_equip(player):
+                options.append("6. Equip")
+            if game.has_equipment_to_unequip(player):
+                options.append("7. Unequip")
+
+            print("\nMain Phase Options:")
+            print(" | ".join(options))
+
+            choice = input("Enter your choice (1-7): ")
+            if choice == "1":
+                game.play_card_from_hand()
+            elif choice == "2":
+                break  # Pass and end the main phase
+            elif choice == "3":
+                game.display_gamelog()
+            elif choice == "4":
+                game.display_graveyard()
+            elif choice == "5":
+                game.show_card_info()
+            elif choice == "6" and "6. Equip" in options:
+                game.equip_card()
+            elif choice == "7" and "7. Unequip" in options:
+                game.unequip_card()
+            else:
+                print("Invalid choice. Please try again.")
+
+    def combat_phase(self, game, player):
+        while True:
+            game.refresh_views()
+            game.human_deciding(player, "turn")
+            options = [
+                "1. Attack", "2. Pass", "3. Game log",
+                "4. Graveyard", "5. Card info"
+            ]
+            print("\nCombat Phase Options:")
+            print(" | ".join(options))
+
+            choice = input("Enter your choice (1-5): ")
+            if choice == "1":
+                game.execute_combat_phase()
+            elif choice == "2":
+                break
+            elif choice == "3":
+                game.display_gamelog()
+            elif choice == "4":
+                game.display_graveyard()
+            elif choice == "5":
+                game.show_card_info()
+            else:
+                print("Invalid choice. Please try again.")
+
+    def declare_attackers(self, game, player, available_attackers):
+        game.refresh_views()
+        game.human_deciding(player, "attack")
+        print("Available attackers:")
+        for i, creature in enumerate(available_attackers, 1):
+            print(f"{i}. {creature.name} (ATK: {creature.attack}, DEF: {creature.defense})")
+
+        while True:
+            attacker_input = input("Enter the indices of attacking creatures (comma-separated), 'hint' or 'pass': ").strip().lower()
+            if attacker_input == 'pass':
+                return []
+            if attacker_input == 'hint':
+                defender = game.opponent_of(player)
+                suggested = solve_attack(available_attackers, [c for c in defender.battlezone if not c.tapped], defender.life)
+                indices = [str(available_attackers.index(creature) + 1) for creature in suggested]
+                print(f"Suggested attack: {', '.join(indices) if indices else 'pass'}")
+                continue
+            try:
+                attacker_indices = [int(i) - 1 for i in attacker_input.split(',')]
+                return [available_attackers[i] for i in attacker_indices if 0 <= i < len(available_attackers)]
+            except ValueError:
+                print("Invalid input. Please enter comma-separated numbers or 'pass'.")
+
+    def declare_blockers(self, game, player, attackers, available_blockers):
+        game.refresh_views()
+        game.human_deciding(player, "block", attackers)
+        print("Attacking creatures:")
+        for i, creature in enumerate(attackers, 1):
+            print(f"{i}. {creature.name} (ATK: {creature.attack}, DEF: {creature.defense})")
+
+        print("\nAvailable blockers:")
+        for i, creature in enumerate(available_blockers, 1):
+            print(f"{i}. {creature.name} (ATK: {creature.attack}, DEF: {creature.defense})")
+
+        blockers = [None] * len(attackers)
+        while True:
+            blocker_input = input("Enter the indices of blocking creatures (comma-separated, use 'x' for no blocker), 'hint' or 'pass': ").strip().lower()
+            if blocker_input == 'pass':
+                return blockers
+            if blocker_input == 'hint':
+                suggested = solve_blocks(attackers, available_blockers, player.life)
+                indices = [str(available_blockers.index(blocker) + 1) if blocker else 'x' for blocker in suggested]
+                print(f"Suggested blocks: {','.join(indices)}")
+                continue
+            try:
+                blocker_indices = blocker_input.split(',')
+                for i, index in enumerate(blocker_indices[:len(attackers)]):
+                    if index == 'x':
+                        blockers[i] = None
+                    else:
+                        blocker_index = int(index) - 1
+                        if 0 <= blocker_index < len(available_blockers):
+                            blockers[i] = available_blockers[blocker_index]
+                        else:
+                            print(f"Invalid blocker index: {index}. Ignoring this blocker.")
+                return blockers
+            except ValueError:
+                print("Invalid input. Please enter comma-separated numbers, 'x', or 'pass'.")
+
+    def select_target(self, game, player, valid_targets, card_type=None, effect_description=None, friendly=False):
+        game.refresh_views()
+        print("Legal targets:")
+        for i, target in enumerate(valid_targets, 1):
+            if not hasattr(target, 'card_type'):
+                print(f"{i}. {target.name} (Player)")
+            else:
+                owner = "Your" if target.zone is player.battlezone or target.zone is player.environs else "Opponent's"
+                print(f"{i}. {owner} {target.name} (ID: {target.id[:8]})")
+        print(f"{len(valid_targets) + 1}. Enter custom card ID")
+        print(f"{len(valid_targets) + 2}. Cancel")
+
+        while True:
+            try:
+                choice = int(input(f"Enter your choice (1-{len(valid_targets) + 2}): "))
+                if choice == len(valid_targets) + 2:
+                    return None
+                if 1 <= choice <= len(valid_targets):
+                    return valid_targets[choice - 1]
+                if choice == len(valid_targets) + 1:
+                    id_prefix = input("Enter the first four digits of the target card ID: ").strip().lower()
+                    custom_targets = game.find_cards_by_id_prefix(id_prefix)
+                    custom_targets = [card for card in custom_targets if game.is_legal_target(card, card_type)]
+                    if custom_targets:
+                        return custom_targets[0]
+                    else:
+                        print(f"No valid {card_type if card_type else 'card'} found with that ID.")
+                print("Invalid choice. Please try again.")
+            except ValueError:
+                print("Invalid input. Please enter a number.")
+
+    def choose_discard(self, game, player):
+        game.display_game_state()
+        print(f"\nYou must discard down to 7 cards. Current hand size: {len(player.hand)}")
+        for i, card in enumerate(player.hand):
+            print(f"{i + 1}. {card.name} (Attack: {card.attack}, Defense: {card.defense}, Cost: {card.cost})")
+
+        while True:
+            try:
+                index = int(input("Enter the index of the card to discard: ").strip()) - 1
+                if 0 <= index < len(player.hand):
+                    return index
+                print("Invalid index. Please enter a number corresponding to a card in your hand.")
+            except ValueError:
+                print("Invalid input. Please enter a valid number.")
+
+    def acknowledge(self, message):
+        input(message)
+
+
+class AIController(Controller):
+    """The built-in AI: random card choice, attacks and blocks from the combat solver."""
+
+    def main_phase(self, game, player):
+        ai_main_phase(game, player)
+
+    def combat_phase(self, game, player):
+        ai_combat_phase(game, player)
+
+    def choose_card_to_play(self, game, player, playable_cards):
+        return game.rng.choice(playable_cards)
+
+    def declare_attackers(self, game, player, available_attackers):
+        return ai_choose_attackers(game, player, available_attackers)
+
+    def declare_blockers(self, game, player, attackers, available_blockers):
+        return ai_declare_blockers(game, player, attackers, available_blockers)
+
+    def select_target(self, game, player, valid_targets, card_type=None, effect_description=None, friendly=False):
+        return ai_select_target(game, player, valid_targets, friendly)
+
+
+class ScriptedController(Controller):
+    """Replays canned answers, falling back to another controller once a decision's script runs out.
+
+    `script` maps a decision name to a list of answers:
+      choose_set          -> set index
+      choose_card_to_play -> card name (or None to pass)
+      declare_attackers   -> list of indices into the available attackers
+      declare_blockers    -> list of indices into the available blockers (None for no block)
+      select_target       -> index into the valid targets (or None to cancel)
+      choose_discard      -> hand index
+    """
+
+    def __init__(self, script=None, fallback=None):
+        self.script = {decision: list(answers) for decision, answers in (script or {}).items()}
+        self.fallback = fallback if fallback is not None else AIController()
+
+    def _next(self, decision):
+        answers = self.script.get(decision)
+        if answers:
+            return True, answers.pop(0)
+        return False, None
+
+    def choose_set(self, available_sets):
+        scripted, answer = self._next("choose_set")
+        return answer if scripted else self.fallback.choose_set(available_sets)
+
+    def main_phase(self, game, player):
+        ai_main_phase(game, player)
+
+    def combat_phase(self, game, player):
+        ai_combat_phase(game, player)
+
+    def choose_card_to_play(self, game, player, playable_cards):
+        scripted, answer = self._next("choose_card_to_play")
+        if not scripted:
+            return self.fallback.choose_card_to_play(game, player, playable_cards)
+        return next((card for card in playable_cards if card.name == answer), None)
+
+    def declare_attackers(self, game, player, available_attackers):
+        scripted, answer = self._next("declare_attackers")
+        if not scripted:
+            return self.fallback.declare_attackers(game, player, available_attackers)
+        return [available_attackers[i] for i in answer if 0 <= i < len(available_attackers)]
+
+    def declare_blockers(self, game, player, attackers, available_blockers):
+        scripted, answer = self._next("declare_blockers")
+        if not scripted:
+            return self.fallback.declare_blockers(game, player, attackers, available_blockers)
+        blockers = [available_blockers[i] if i is not None and 0 <= i < len(available_blockers) else None for i in answer]
+        return (blockers + [None] * len(attackers))[:len(attackers)]
+
+    def select_target(self, game, player, valid_targets, card_type=None, effect_description=None, friendly=False):
+        scripted, answer = self._next("select_target")
+        if not scripted:
+            return self.fallback.select_target(game, player, valid_targets, card_type, effect_description, friendly)
+        if answer is None or not 0 <= answer < len(valid_targets):
+            return None
+        return valid_targets[answer]
+
+    def choose_discard(self, game, player):
+        scripted, answer = self._next("choose_discard")
+        return answer if scripted else self.fallback.choose_discard(game, player)
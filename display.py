@@ -1,34 +1,41 @@
-import os
+import re
+import shutil
+import sys
 from colorama import Fore, Back, Style
 import textwrap
 
-def display_game_state(game):
-    os.system('cls' if os.name == 'nt' else 'clear')
-    print("====================")
-    print(f"{Fore.CYAN}      TURN {game.turn_counter}      {Style.RESET_ALL}")
-    print("====================")
-    print(f"{Fore.RED}Opponent - Life: {game.opponent.life}, Energy: {game.opponent.energy}, Deck: {len(game.opponent.deck)} cards, Hand: {len(game.opponent.hand)} cards, Graveyard: {len(game.opponent.graveyard)} cards{Style.RESET_ALL}")
-    print("__________________________")
-    print("Opponent's Environs:")
-    print("__________________________")
-    display_environs(game.opponent.environs)
-    print("__________________________")
-    print("OPPONENT'S BATTLEZONE")
-    print("__________________________")
-    display_battlezone(game.opponent.battlezone)
-    print("__________________________")
-    print("PLAYER'S BATTLEZONE")
-    print("__________________________")
-    display_battlezone(game.player.battlezone)
-    print("__________________________")
-    print("Player's Environs:")
-    print("__________________________")
-    display_environs(game.player.environs)
-    print("__________________________")
-    print(f"{Fore.GREEN}Player - Life: {game.player.life}, Energy: {game.player.energy}, Deck: {len(game.player.deck)} cards, Hand: {len(game.player.hand)} cards, Graveyard: {len(game.player.graveyard)} cards{Style.RESET_ALL}")
-    print("CARDS IN HAND:")
-    print("Index Name                Type ERG ATK/DEF ID     Description")
-    print("-" * 75)
+CSI = "\x1b["
+_ANSI = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+
+# Rows kept free under the frame for menus and prompts
+MIN_PROMPT_ROWS = 8
+
+
+def game_state_lines(game):
+    """The game screen (board, hand and recent log) as a list of lines, without newlines."""
+    lines = [
+        "====================",
+        f"{Fore.CYAN}      TURN {game.turn_counter}      {Style.RESET_ALL}",
+        "====================",
+        f"{Fore.RED}Opponent - Life: {game.opponent.life}, Energy: {game.opponent.energy}, Deck: {len(game.opponent.deck)} cards, Hand: {len(game.opponent.hand)} cards, Graveyard: {len(game.opponent.graveyard)} cards{Style.RESET_ALL}",
+        "__________________________",
+        "Opponent's Environs:",
+        "__________________________",
+    ]
+    lines += environs_lines(game.opponent.environs)
+    lines += ["__________________________", "OPPONENT'S BATTLEZONE", "__________________________"]
+    lines += battlezone_lines(game.opponent.battlezone)
+    lines += ["__________________________", "PLAYER'S BATTLEZONE", "__________________________"]
+    lines += battlezone_lines(game.player.battlezone)
+    lines += ["__________________________", "Player's Environs:", "__________________________"]
+    lines += environs_lines(game.player.environs)
+    lines += [
+        "__________________________",
+        f"{Fore.GREEN}Player - Life: {game.player.life}, Energy: {game.player.energy}, Deck: {len(game.player.deck)} cards, Hand: {len(game.player.hand)} cards, Graveyard: {len(game.player.graveyard)} cards{Style.RESET_ALL}",
+        "CARDS IN HAND:",
+        "Index Name                Type ERG ATK/DEF ID     Description",
+        "-" * 75,
+    ]
     for i, card in enumerate(game.player.hand, 1):
         adjusted_cost = card.get_adjusted_cost(game.player)
         name = card.name.ljust(20)
@@ -36,14 +43,72 @@ def display_game_state(game):
         atk_def = f"{card.attack}/{card.defense}".ljust(5)
         id_short = card.id[:8]
         description = card.description[:50] + "..." if len(card.description) > 50 else card.description
-        print(f"{i:<5} {name} {card_type} {adjusted_cost:<3} {atk_def} {id_short} {description}")
-    print("__________________________")
-    print("Game Log:")
-    for entry, color in game.game_log[-5:]:
-        print(color + entry + Style.RESET_ALL)
-    print("__________________________")
+        lines.append(f"{i:<5} {name} {card_type} {adjusted_cost:<3} {atk_def} {id_short} {description}")
+    lines += ["__________________________", "Game Log:"]
+    for entry in game.game_log.recent(5):
+        lines.append(entry.color + entry.text + Style.RESET_ALL)
+    lines.append("__________________________")
+    return lines
 
-def display_battlezone(battlezone):
+
+def display_game_state(game):
+    print("\n".join(game_state_lines(game)))
+
+
+class Renderer:
+    """Draws the game screen in place, rewriting only the lines that changed since the last frame.
+
+    The frame is pinned to the top rows of the terminal and everything else (menus, prompts,
+    messages) scrolls in the region below it, so the rows on screen always match the previous
+    frame and a redraw is one write of cursor moves plus the changed lines. When the frame grows
+    or shrinks the prompt area moves with it and starts out empty. A frame that doesn't fit (too
+    tall, or lines wider than the terminal) is printed after a clear, like an ordinary redraw, and
+    output that isn't a terminal just gets each frame printed in full.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._lines = None  # Frame currently pinned on screen, if any
+        self._size = None  # Terminal size it was drawn for
+
+    def render(self, game):
+        lines = game_state_lines(game)
+        size = shutil.get_terminal_size()
+        columns, rows = size
+        if not self.stream.isatty():
+            out = ["\n".join(lines), "\n"]
+        elif len(lines) + MIN_PROMPT_ROWS > rows or any(len(_ANSI.sub("", line)) > columns for line in lines):
+            out = [CSI + "r" if self._lines is not None else "", CSI + "H", CSI + "2J", "\n".join(lines), "\n"]
+            self._lines = None
+        else:
+            if self._lines is None or size != self._size:
+                out, previous = [CSI + "r", CSI + "H", CSI + "2J"], []
+            else:
+                out, previous = [], self._lines
+            resized = len(lines) != len(previous)
+            if not resized:
+                out.append("\x1b7")  # The cursor is somewhere in the prompt area; come back to it
+            out += [f"{CSI}{row};1H{line}{CSI}K" for row, line in enumerate(lines, 1)
+                    if row > len(previous) or line != previous[row - 1]]
+            if resized:
+                # Scroll only the rows under the frame, starting from an empty prompt area
+                out.append(f"{CSI}{len(lines) + 1};{rows}r{CSI}{len(lines) + 1};1H{CSI}J")
+            else:
+                out.append("\x1b8")
+            self._lines = lines
+            self._size = size
+        self.stream.write("".join(out))
+        self.stream.flush()
+
+    def close(self):
+        """Give the whole terminal back to ordinary output."""
+        if self._lines is not None:
+            self.stream.write(f"{CSI}r{CSI}{self._size.lines};1H\n")
+            self.stream.flush()
+        self._lines = None
+
+
+def battlezone_lines(battlezone):
     max_width = 25
     card_lines = []
     for idx, card in enumerate(battlezone, 1):
@@ -59,12 +124,14 @@ def display_battlezone(battlezone):
         card_lines.append(card_info)
 
     # Transpose the card lines to display them side by side
-    for line_idx in range(5):
-        for card_info in card_lines:
-            print(f"{card_info[line_idx]:<{max_width}}", end=" ")
-        print()
+    return ["".join(f"{card_info[line_idx]:<{max_width}} " for card_info in card_lines) for line_idx in range(5)]
 
-def display_environs(environs):
+
+def display_battlezone(battlezone):
+    print("\n".join(battlezone_lines(battlezone)))
+
+
+def environs_lines(environs):
     max_width = 25
     card_lines = []
     for idx, card in enumerate(environs, 1):
@@ -92,10 +159,11 @@ def display_environs(environs):
         card_lines.append(card_info)
 
     # Transpose the card lines to display them side by side
-    for line_idx in range(5):
-        for card_info in card_lines:
-            print(f"{card_info[line_idx]:<{max_width}}", end=" ")
-        print()
+    return ["".join(f"{card_info[line_idx]:<{max_width}} " for card_info in card_lines) for line_idx in range(5)]
+
+
+def display_environs(environs):
+    print("\n".join(environs_lines(environs)))
 
 def display_hand(hand):
     print("Index  Name                 Type ERG ATK/DEF  ID        Description")
@@ -2,116 +2,199 @@ from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from game import Game
-    from player import Player
 
 
-from player import gain_energy
+from types import MappingProxyType
+from player import Player, gain_energy
+from log import get_logger
+from timing import timed
+
+log = get_logger('effects')
+
+
+def increase_energy_regen(game: 'Game', player: 'Player', value, source_id):
+    gain_energy(player, value)
+    game.log_action("%s gained %s energy from card ID %s", player.name, value, source_id)
+
+
+def draw_cards(game: 'Game', player: 'Player', value, source_id):
+    for _ in range(value):
+        card = player.draw_card()
+        if card:
+            game.log_action("%s drew card %s (ID: %s)", player.name, card.name, card.id)
+
+
+def deal_damage(game: 'Game', player: 'Player', value, source_id, target=None, source_name=None):
+    # Cards with their own targeting rules pass the `target` they picked (and deal with a creature
+    # the damage destroys themselves) and the `source_name` to log
+    log.debug("Attempting to deal %s damage", value)
+    chosen = target is not None
+    if not chosen:
+        target = game.select_target(card_type="creature_or_player", effect_description=f"Select a target to deal {value} damage:", player=player)
+    if target:
+        log.debug("Target selected: %s", target.name)
+        source_name = source_name or player.name
+        if isinstance(target, Player):
+            target.take_damage(value)
+            game.log_action("%s dealt %s damage to %s", source_name, value, target.name)
+            game.metrics.damage("effect", "player", value)
+        elif hasattr(target, 'receive_damage'):
+            destroyed = target.receive_damage(value)
+            game.log_action("%s dealt %s damage to %s (ID: %s)", source_name, value, target.name, target.id)
+            game.metrics.damage("effect", "creature", value)
+            if destroyed and not chosen:
+                target.destroy(game)
+    else:
+        game.log_action("%s tried to deal damage but no valid target was found.", player.name)
+        log.debug("No valid target found for deal_damage effect")
 
-def create_effect(effect_type, value, trigger, source_id):
-    print(f"Creating effect: {effect_type}, {value}, {trigger}, {source_id}")
-    return Effect(effect_type, value, trigger, source_id)
 
-class Effect:
-    def __init__(self, effect_type, value, trigger, source_id):
-        print(f"Initializing Effect: {effect_type}, {value}, {trigger}, {source_id}")
-        self.effect_type = effect_type
-        self.value = value
-        self.trigger = trigger
-        self.source_id = source_id
-        self.applied = False
-        
+def gain_defense(game: 'Game', player: 'Player', value, source_id):
+    target = game.select_target(card_type="creature", effect_description="Select a target to gain defense:", player=player, friendly=True)
+    if target:
+        target.defense += value
+        game.log_action("%s gained %s defense to %s", player.name, value, target.name)
+    else:
+        game.log_action("%s tried to gain defense but no valid target was found.", player.name)
 
-    def apply(self, game: 'Game', player: 'Player', card_played=None):
-        print(f"DEBUG: Applying effect: {self.effect_type}")
-        if self.applied and self.trigger not in ["constant", "on_equip"]:
-            return
-        effect_handlers = {
-            "increase_energy_regen": self.increase_energy_regen,
-            "draw_cards": self.draw_cards,
-            "deal_damage": self.deal_damage,
-            "destroy_equipment": self.destroy_equipment,
-            "destroy_enchantment": self.destroy_enchantment,
-            "equipment_cost_reduction": self.equipment_cost_reduction,
-            "gain_defense": self.gain_defense
-        }
-        handler = effect_handlers.get(self.effect_type)
-        if handler:
-            game.log_action(f"Effect triggered: {self.effect_type} from card ID {self.source_id}")
-            handler(game, player)
-            if self.trigger != "constant":
-                self.applied = True
-        else:
-            game.log_action(f"Unknown effect type: {self.effect_type}")
-
-    def increase_energy_regen(self, game: 'Game', player: 'Player'):
-        gain_energy(player, self.value)
-        game.log_action(f"{player.name} gained {self.value} energy from card ID {self.source_id}")
-
-    def draw_cards(self, game: 'Game', player: 'Player'):
-        for _ in range(self.value):
-            card = player.draw_card()
-            if card:
-                game.log_action(f"{player.name} drew card {card.name} (ID: {card.id})")
-
-    def deal_damage(self, game: 'Game', player: 'Player'):
-        print(f"DEBUG: Attempting to deal {self.value} damage")
-        target = game.select_target(card_type="creature_or_player", effect_description=f"Select a target to deal {self.value} damage:", player=player)
-        if target:
-            print(f"DEBUG: Target selected: {target.name} (ID: {target.id})")
-            if isinstance(target, Player):
-                target.take_damage(self.value)
-                game.log_action(f"{player.name} dealt {self.value} damage to {target.name}")
-            elif hasattr(target, 'receive_damage'):
-                destroyed = target.receive_damage(self.value)
-                game.log_action(f"{player.name} dealt {self.value} damage to {target.name} (ID: {target.id})")
-                if destroyed:
-                    target.destroy(game)
-        else:
-            game.log_action(f"{player.name} tried to deal damage but no valid target was found.")
-            print(f"DEBUG: No valid target found for deal_damage effect")
-
-    def gain_defense(self, game: 'Game', player: 'Player'):
-        target = game.select_target(card_type="creature", effect_description="Select a target to gain defense:", player=player)
-        if target:
-            target.defense += self.value
-            game.log_action(f"{player.name} gained {self.value} defense to {target.name}")
-        else:
-            game.log_action(f"{player.name} tried to gain defense but no valid target was found.")
-
-    def destroy_equipment(self, game: 'Game', player: 'Player'):
-        print(f"DEBUG: Attempting to destroy equipment")
+
+def destroy_equipment(game: 'Game', player: 'Player', value, source_id, target=None, source_name=None):
+    log.debug("Attempting to destroy equipment")
+    if target is None:
         target = game.select_target(card_type="equipment", effect_description="Select equipment to destroy:", player=player)
-        if target:
-            print(f"DEBUG: Target selected: {target.name} (ID: {target.id})")
-            target.destroy(game)
-        else:
-            game.log_action(f"{player.name} tried to destroy equipment but no valid target was found.")
-            print(f"DEBUG: No valid target found for destroy_equipment effect")
-
-    def destroy_enchantment(self, game: 'Game', player: 'Player'):
-        print(f"DEBUG: Attempting to destroy an enchantment")
+    if target:
+        log.debug("Target selected: %s (ID: %s)", target.name, target.id)
+        target.destroy(game)
+        if source_name:
+            game.log_action("%s destroyed %s (ID: %s)", source_name, target.name, target.id)
+    else:
+        game.log_action("%s tried to destroy equipment but no valid target was found.", player.name)
+        log.debug("No valid target found for destroy_equipment effect")
+
+
+def destroy_enchantment(game: 'Game', player: 'Player', value, source_id, target=None, source_name=None):
+    log.debug("Attempting to destroy an enchantment")
+    if target is None:
         target = game.select_target(card_type="enchantment", effect_description="Select an enchantment to destroy:", player=player)
-        if target:
-            print(f"DEBUG: Target selected: {target.name} (ID: {target.id})")
-            target.destroy(game)
-        else:
-            game.log_action(f"{player.name} tried to destroy an enchantment but no valid target was found.")
-            print(f"DEBUG: No valid target found for destroy_enchantment effect")
-
-    def handle_destruction(self, game: 'Game', player: 'Player', target, card_type: str):
-        if target:
-            if hasattr(target, 'destroy'):
-                target.destroy(game)
-                game.log_action(f"{player.name} destroyed {card_type} {target.name} (ID: {target.id}) owned by {target.owner.name}")
-            else:
-                game.log_action(f"{player.name} tried to destroy a {card_type} but the target was invalid.")
-        else:
-            game.log_action(f"{player.name} tried to destroy a {card_type} but no valid target was found.")
-
-    def equipment_cost_reduction(self, game: 'Game', player: 'Player'):
-        current_reduction = player.effect_modifiers.get('equipment_cost_reduction', 0)
-        player.effect_modifiers['equipment_cost_reduction'] = max(current_reduction, self.value)
-        game.log_action(f"{player.name}'s equipment cost reduction set to {player.effect_modifiers['equipment_cost_reduction']}")
+    if target:
+        log.debug("Target selected: %s (ID: %s)", target.name, target.id)
+        target.destroy(game)
+        if source_name:
+            game.log_action("%s destroyed %s (ID: %s)", source_name, target.name, target.id)
+    else:
+        game.log_action("%s tried to destroy an enchantment but no valid target was found.", player.name)
+        log.debug("No valid target found for destroy_enchantment effect")
+
+
+def equipment_cost_reduction(game: 'Game', player: 'Player', value, source_id):
+    current_reduction = player.effect_modifiers.get('equipment_cost_reduction', 0)
+    player.effect_modifiers['equipment_cost_reduction'] = max(current_reduction, value)
+    game.log_action("%s's equipment cost reduction set to %s", player.name, player.effect_modifiers['equipment_cost_reduction'])
+
+
+EFFECT_HANDLERS = {
+    "increase_energy_regen": increase_energy_regen,
+    "draw_cards": draw_cards,
+    "deal_damage": deal_damage,
+    "destroy_equipment": destroy_equipment,
+    "destroy_enchantment": destroy_enchantment,
+    "equipment_cost_reduction": equipment_cost_reduction,
+    "gain_defense": gain_defense,
+}
+
+# Handlers that read the effect's value, which must then be an integer
+VALUED_EFFECTS = {"increase_energy_regen", "draw_cards", "deal_damage", "equipment_cost_reduction", "gain_defense"}
+
+# Types with no handler that the engine still understands: Card.equip reads them as stat bonuses
+PASSIVE_EFFECTS = {"gain_attack"}
+
+# Triggers the engine fires (None: resolved when the card is played or equipped)
+KNOWN_TRIGGERS = {None, "constant", "upkeep", "on_cast", "on_summon", "on_play", "on_play_equipment"}
+
+
+class CompiledEffect:
+    """One effect of a card, validated and bound to its handler when its set is loaded.
+
+    Immutable and shared by every copy of the card. It still reads like the effect dict it came
+    from (effect['type'], effect.get('source_id'), 'value' in effect), so card code that inspects
+    effects is unchanged; apply() calls the handler directly. `handler` is None for types the
+    engine doesn't implement, which load_definitions reports.
+    """
+    __slots__ = ('type', 'value', 'trigger', 'handler', '_data')
+
+    def __init__(self, data):
+        set_field = object.__setattr__
+        set_field(self, '_data', MappingProxyType(dict(data)))
+        set_field(self, 'type', data['type'])
+        set_field(self, 'value', data.get('value'))
+        set_field(self, 'trigger', data.get('trigger'))
+        set_field(self, 'handler', EFFECT_HANDLERS.get(self.type))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("compiled effects are immutable")
+
+    def __reduce__(self):
+        return compile_effect, (dict(self._data),)
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __eq__(self, other):
+        if isinstance(other, CompiledEffect):
+            return self._data == other._data
+        return self._data == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(dict(self._data))
+
+    @property
+    def known(self):
+        return self.handler is not None or self.type in PASSIVE_EFFECTS
+
+    @timed("effect", key=lambda effect, *args, **kwargs: effect.type)
+    def apply(self, game: 'Game', player: 'Player', source_id, value=None, **options):
+        """Run the effect for the card with ID `source_id`; `value` overrides the effect's own.
+
+        Every effect that resolves goes through here, so it is counted and timed once. `options`
+        go to the handler: cards with their own targeting pass `target` and `source_name`.
+        """
+        log.debug("Applying effect: %s", self.type)
+        if self.handler is None:
+            game.log_action("Unknown effect type: %s", self.type)
+            return
+        game.log_action("Effect triggered: %s from card ID %s", self.type, source_id)
+        game.metrics.effect_triggered(self.type)
+        self.handler(game, player, self.value if value is None else value, source_id, **options)
+
+
+def compile_effect(data):
+    """CompiledEffect for an effect dict from a set file; raises ValueError if it is malformed."""
+    if isinstance(data, CompiledEffect):
+        return data
+    effect_type = data.get('type')
+    if not isinstance(effect_type, str) or not effect_type:
+        raise ValueError(f"effect {data!r} has no type")
+    trigger = data.get('trigger')
+    if trigger is not None and not isinstance(trigger, str):
+        raise ValueError(f"{effect_type} effect has a non-string trigger {trigger!r}")
+    if effect_type in VALUED_EFFECTS and not isinstance(data.get('value'), int):
+        raise ValueError(f"{effect_type} effect needs an integer value, got {data.get('value')!r}")
+    return CompiledEffect(data)
+
 
 class Trigger:
     def __init__(self, trigger_type):
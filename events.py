@@ -0,0 +1,66 @@
+# card_game/events.py
+from zone import play_order
+
+
+class EventBus:
+    """One player's cards in play, indexed by the triggers of their effects.
+
+    Zones that are in play (battlezone, environs) subscribe a card when it enters and unsubscribe
+    it when it leaves, and a card in play whose effects change is subscribed again (see
+    Card.effects), so firing a trigger only visits the cards that have an effect for it.
+    Effects without a trigger are indexed under None. Subscribers come back in cards_in_play()
+    order, which is the order the full board scans used to resolve them in.
+    """
+    __slots__ = ('_subscribers', '_triggers')
+
+    def __init__(self):
+        self._subscribers = {}  # trigger -> {card: None}
+        self._triggers = {}  # card -> frozenset of the triggers it is subscribed to
+
+    def __len__(self):
+        return len(self._triggers)
+
+    def subscribe(self, card):
+        triggers = frozenset(effect.get('trigger') for effect in card.effects)
+        previous = self._triggers.get(card, frozenset())
+        if triggers == previous:
+            return
+        for trigger in previous - triggers:
+            self._unindex(trigger, card)
+        for trigger in triggers - previous:
+            self._subscribers.setdefault(trigger, {})[card] = None
+        if triggers:
+            self._triggers[card] = triggers
+        else:
+            del self._triggers[card]
+
+    def unsubscribe(self, card):
+        for trigger in self._triggers.pop(card, ()):
+            self._unindex(trigger, card)
+
+    def _unindex(self, trigger, card):
+        subscribers = self._subscribers[trigger]
+        del subscribers[card]
+        if not subscribers:
+            del self._subscribers[trigger]
+
+    def subscribers(self, *triggers):
+        """Cards with an effect for any of `triggers`, in cards_in_play() order."""
+        if len(triggers) == 1:
+            cards = self._subscribers.get(triggers[0])
+            if not cards:
+                return ()
+            if len(cards) == 1:
+                return tuple(cards)
+        else:
+            cards = {card: None for trigger in triggers for card in self._subscribers.get(trigger, ())}
+        return sorted(cards, key=play_order)
+
+    def cards(self):
+        """Every subscribed card (every card in play that has effects), in cards_in_play() order."""
+        return sorted(self._triggers, key=play_order)
+
+    def publish(self, trigger):
+        """(card, effect) for every effect with `trigger` on a card in play, in resolution order."""
+        return [(card, effect) for card in self.subscribers(trigger)
+                for effect in card.effects if effect.get('trigger') == trigger]
@@ -3,210 +3,282 @@ from display import display_game_state, display_graveyard, display_card_info, di
 from board import Board  # Make sure you have a Board class defined
 from turns import upkeep_phase, end_phase, opponent_turn_structure
 from combat import combat_phase as execute_combat_phase  # Add this import at the top
-from card import Card
-import json
+from card import Card, load_definitions
+from cardsets import load_set
+import random
 from colorama import Fore, Back, Style
 from ai import ai_make_decisions, ai_upkeep, ai_main_phase, ai_combat_phase, ai_end_phase, ai_can_play_card
 import textwrap
 from combat import combat_phase as execute_combat_phase
-from effects import Effect, Trigger, create_effect
+from effects import Trigger
 from player import Player
+from registry import CardRegistry
+from controllers import HumanController, AIController
+from mcts import MCTSController
+from log import get_logger
+from gamelog import GameLog, OFF as LOG_OFF
+from metrics import METRICS, OFF as METRICS_OFF
+from view import TerminalView
+from timing import timed
 import os
+import time
+
+log = get_logger('game')
 
 class Game:
-    def __init__(self, player_name, opponent_name):
+    def __init__(self, player_name, opponent_name, player_set=None, opponent_set=None,
+                 player_controller=None, opponent_controller=None, headless=False, max_turns=None, seed=None,
+                 deck_size=30, game_log=None, metrics=None):
+        # All randomness in a game comes from this generator, so a seed replays the game exactly
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        self.registry = CardRegistry()  # Card IDs and lookups for this game
+        self.player = Player(player_name, self, player_controller or HumanController())
+        self.opponent = Player(opponent_name, self, opponent_controller or MCTSController())
+        self.headless = headless  # No terminal rendering at all
+        self.views = [] if headless else [TerminalView()]  # Observers of state changes (see view.py)
+        self.max_turns = max_turns  # Stop the game (no winner) after this many turns
+        self.deck_size = deck_size
         self.card_pool = []
-        self.load_card_pool()
-        self.player = Player(player_name, self)
-        self.opponent = Player(opponent_name, self)
+        self.load_card_pool(player_set, opponent_set)
         self.board = Board(self.player, self.opponent, self)  # Pass the Game instance to the Board
         self.turn_counter = 0
         self.current_player = self.player
         self.player_turn = True
-        self.game_log = []
+        self.game_log = game_log if game_log is not None else GameLog()  # See gamelog.py; gamelog.OFF records nothing
+        self.metrics = metrics if metrics is not None else METRICS  # See metrics.py
         self.game_over = False
+        self.winner = None
         self.turn_phase = ""
         self.last_played_card = None
         
-        self.log_action(f"Game initialized. Player energy: {self.player.energy}, Opponent energy: {self.opponent.energy}")
-        
-    def load_card_pool(self):
-        sets_dir = os.path.join(os.path.dirname(__file__), 'sets')
-        available_sets = [f for f in os.listdir(sets_dir) if f.endswith('.json')]
-        
-        print("Available sets:")
-        for i, set_file in enumerate(available_sets, 1):
-            print(f"{i}. {set_file}")
-        
-        player_choice = int(input("Select a set for your deck: ")) - 1
-        opponent_choice = (player_choice + 1) % len(available_sets)
-        
-        player_set = available_sets[player_choice]
-        opponent_set = available_sets[opponent_choice]
+        self.log_action("Game initialized. Player energy: %s, Opponent energy: %s", self.player.energy, self.opponent.energy)
+
+    @classmethod
+    def from_sets(cls, player_set, opponent_set=None, player_name="Player", opponent_name="AI Opponent",
+                  player_controller=None, opponent_controller=None, **kwargs):
+        """Headless game between two controllers (AI by default) using the given set files."""
+        return cls(player_name, opponent_name, player_set=player_set, opponent_set=opponent_set,
+                   player_controller=player_controller or AIController(),
+                   opponent_controller=opponent_controller or AIController(),
+                   headless=True, **kwargs)
         
-        print(f"Player selected set: {player_set}")
-        print(f"Opponent will use set: {opponent_set}")
+    def load_card_pool(self, player_set=None, opponent_set=None):
+        if player_set is None:
+            sets_dir = os.path.join(os.path.dirname(__file__), 'sets')
+            available_sets = [f for f in os.listdir(sets_dir) if f.endswith('.json')]
+            
+            player_choice = self.player.controller.choose_set(available_sets)
+            opponent_choice = (player_choice + 1) % len(available_sets)
+            
+            player_set = os.path.join(sets_dir, available_sets[player_choice])
+            if opponent_set is None:
+                opponent_set = os.path.join(sets_dir, available_sets[opponent_choice])
+            
+            print(f"Player selected set: {available_sets[player_choice]}")
+            print(f"Opponent will use set: {os.path.basename(opponent_set)}")
+        elif opponent_set is None:
+            opponent_set = player_set
         
-        self.card_pool = self.load_set(os.path.join(sets_dir, player_set))
-        self.opponent_card_pool = self.load_set(os.path.join(sets_dir, opponent_set))
+        # Already-loaded card lists are used as-is so callers can parse a set once and reuse it
+        self.card_pool = load_definitions(player_set) if isinstance(player_set, list) else self.load_set(player_set)
+        self.opponent_card_pool = (load_definitions(opponent_set) if isinstance(opponent_set, list)
+                                   else self.load_set(opponent_set))
         
-    def load_set(self, set_path):
-        with open(set_path, 'r') as file:
-            return json.load(file)
+    @staticmethod
+    def load_set(set_path):
+        return load_set(set_path)
         
     def start(self):
-        self.log_action(f"Starting game. Player energy: {self.player.energy}, Opponent energy: {self.opponent.energy}")
-        self.board.reset(self.card_pool, self.opponent_card_pool)
+        started = time.perf_counter()
+        self.log_action("Starting game. Player energy: %s, Opponent energy: %s", self.player.energy, self.opponent.energy)
+        self.board.reset(self.card_pool, self.opponent_card_pool, self.deck_size)
         self.initial_draw()
-        self.log_action(f"After setup. Player energy: {self.player.energy}, Opponent energy: {self.opponent.energy}")
+        self.log_action("After setup. Player energy: %s, Opponent energy: %s", self.player.energy, self.opponent.energy)
         
         while not self.game_over:
             self.turn_counter += 1
             self.turn_flow(self.current_player)
-            self.current_player = self.opponent if self.current_player == self.player else self.player
+            if self.check_game_over():
+                break
+            if self.max_turns is not None and self.turn_counter >= self.max_turns:
+                self.game_over = True
+                self.log_action("Turn limit of %s reached. The game is a draw.", self.max_turns)
+                break
+            self.current_player = self.opponent_of(self.current_player)
             self.player_turn = not self.player_turn
             
             # Add a small delay and prompt between turns
-            input("Press Enter to continue to the next turn...")
+            self.pause("Press Enter to continue to the next turn...")
             
             # Ensure the next turn starts properly
             if not self.player_turn:
-                self.log_action(f"Opponent's Turn {self.turn_counter + 1} is about to start.")
+                self.log_action("Opponent's Turn %s is about to start.", self.turn_counter + 1)
         
         self.log_action("Game Over!")
+        self.game_log.close()
+        if self.winner is None:
+            outcome = "draw"
+        else:
+            outcome = "player" if self.winner is self.player else "opponent"
+        self.metrics.game_finished(outcome, self.turn_counter, time.perf_counter() - started)
+        for view in self.views:
+            view.close(self)
+        return self.winner
+
+    def check_game_over(self):
+        player_dead = self.player.life <= 0
+        opponent_dead = self.opponent.life <= 0
+        if player_dead or opponent_dead:
+            self.game_over = True
+            if player_dead != opponent_dead:
+                self.winner = self.opponent if player_dead else self.player
+        return self.game_over
+
+    def clone(self):
+        """Independent copy of the game state for lookahead.
+
+        Players, zones, cards, equipment links and effect modifiers are copied; card definitions
+        (card pools, effect dicts) are shared. The copy is headless, starts with an empty game log
+        and carries on the same random sequence as the original.
+        """
+        copy = Game.__new__(Game)
+        copy.__dict__.update(self.__dict__)
+        cards = {}
+        copy.player = self.player.clone(copy, cards)
+        copy.opponent = self.opponent.clone(copy, cards)
+        players = {id(self.player): copy.player, id(self.opponent): copy.opponent}
+        for card_copy in cards.values():
+            if card_copy.owner is not None:
+                card_copy.owner = players[id(card_copy.owner)]
+            if card_copy.equipped_to is not None:
+                card_copy.equipped_to = cards[id(card_copy.equipped_to)]
+            if card_copy.equipment is not None:
+                card_copy.equipment = cards[id(card_copy.equipment)]
+        copy.registry = self.registry.clone(cards)
+        copy.board = Board(copy.player, copy.opponent, copy)
+        copy.rng = random.Random()
+        copy.rng.setstate(self.rng.getstate())
+        copy.current_player = players[id(self.current_player)]
+        copy.winner = players[id(self.winner)] if self.winner is not None else None
+        copy.last_played_card = cards.get(id(self.last_played_card)) if self.last_played_card is not None else None
+        copy.game_log = LOG_OFF
+        copy.metrics = METRICS_OFF
+        copy.views = []
+        copy.headless = True
+        return copy
+
+    snapshot = clone
+
+    def create_card(self, definition, owner):
+        """New card from `definition`, registered with this game."""
+        return self.registry.register(Card(definition, owner=owner))
+
+    def opponent_of(self, player):
+        return self.opponent if player is self.player else self.player
+
+    def pause(self, message):
+        # Only a human at the keyboard needs to acknowledge anything
+        for player in (self.player, self.opponent):
+            if player.controller.is_human:
+                self.refresh_views()
+                player.controller.acknowledge(message)
+                return
 
     def apply_constant_effects(self, player):
         player.effect_modifiers['equipment_cost_reduction'] = 0  # Reset the reduction
-        for card in player.battlezone + player.environs:
+        # Every card in play, not just the trigger subscribers: apply_effects also sets each card's
+        # effect_processed flag, which decides whether later calls this turn act at all
+        for card in player.cards_in_play():
             card.apply_effects(self, player)
-        print(f"DEBUG: After applying constant effects, equipment_cost_reduction = {player.effect_modifiers['equipment_cost_reduction']}")
+        log.debug("After applying constant effects, equipment_cost_reduction = %s", player.effect_modifiers['equipment_cost_reduction'])
 
+    @timed("Game.turn_flow")
     def turn_flow(self, current_player):
-        print(f"DEBUG: Starting turn for {current_player.name}")
+        log.debug("Starting turn for %s", current_player.name)
 
         # Apply constant effects at the start of each turn
         self.apply_constant_effects(current_player)
 
-        if current_player == self.player:
-            # Human player turn (keep existing logic)
+        if current_player.controller.is_human:
+            # Interactive turn
             # Upkeep Phase
             self.turn_phase = "upkeep"
-            upkeep_log, color = upkeep_phase(self.board, player=True)
-            self.log_action(upkeep_log, color)
-            self.update_display()
+            upkeep_log, color = upkeep_phase(self.board, player=current_player is self.player)
+            self.log_action(upkeep_log, color=color)
+            self.state_changed()
 
             # Main Phase 1
             self.turn_phase = "main_phase_1"
-            self.log_action(f"{current_player.name}'s First Main Phase")
+            self.log_action("%s's First Main Phase", current_player.name)
             self.main_phase(current_player)
-            self.update_display()
+            self.state_changed()
 
             # Combat Phase
             self.turn_phase = "combat"
-            self.log_action(f"{current_player.name}'s Combat Phase")
+            self.log_action("%s's Combat Phase", current_player.name)
             self.combat_phase(current_player)
-            self.update_display()
+            self.state_changed()
 
             # Main Phase 2
             self.turn_phase = "main_phase_2"
-            self.log_action(f"{current_player.name}'s Second Main Phase")
+            self.log_action("%s's Second Main Phase", current_player.name)
             self.main_phase(current_player)
-            self.update_display()
+            self.state_changed()
 
             # End Phase
             self.turn_phase = "end"
-            end_log_entries = end_phase(self, player=True)
+            end_log_entries = end_phase(self, player=current_player is self.player)
             for entry in end_log_entries:
-                self.log_action(entry[0], entry[1])
-            self.update_display()
+                self.log_action(entry[0], color=entry[1])
+            self.state_changed()
         else:
-            # AI player turn
-            print("DEBUG: Starting opponent turn structure")
+            # AI (or scripted) player turn
+            log.debug("Starting opponent turn structure")
             try:
-                opponent_turn_structure(self)
+                opponent_turn_structure(self, current_player)
             except Exception as e:
                 error_message = f"ERROR: An exception occurred during the opponent's turn: {str(e)}"
-                self.log_action(error_message, Fore.RED)
-                print(error_message)
-            self.update_display()
+                self.log_action(error_message, color=Fore.RED)
+                log.error("An exception occurred during the opponent's turn: %s", e, exc_info=True)
+            self.state_changed()
 
     def apply_effects(self, player):
         processed_effects = set()  # Add this line at the beginning of the function
-        for card in player.battlezone + player.environs:
+        for card in player.cards_in_play():
             if hasattr(card, 'equipment_damage') and card.equipment_damage > 0:
                 target = self.select_target(card_type="creature", effect_description=f"{card.equipment_damage_source} can deal {card.equipment_damage} damage to any target creature:", player=player)
                 if target:
+                    # Stored as a number rather than an effect (see Card.apply_equipment_effects), so counted here
                     target.receive_damage(card.equipment_damage)
-                    self.log_action(f"{card.equipment_damage_source} dealt {card.equipment_damage} damage to {target.name} (ID: {target.id})")
+                    self.log_action("%s dealt %s damage to %s (ID: %s)", card.equipment_damage_source, card.equipment_damage, target.name, target.id)
+                    self.metrics.effect_triggered("deal_damage")
+                    self.metrics.damage("effect", "creature", card.equipment_damage)
             
             for effect in card.effects:
                 effect_key = (card.id, effect['type'], effect.get('source_id'))
                 if effect_key in processed_effects:
-                    print(f"DEBUG: Skipping already processed effect: {effect}")
+                    log.debug("Skipping already processed effect: %s", effect)
                     continue
                 processed_effects.add(effect_key)
                 if 'trigger' not in effect:
                     continue
                 trigger = Trigger(effect['trigger'])
                 if trigger.check(self, player):
-                    effect_instance = Effect(effect['type'], effect['value'], effect['trigger'], card.id)
-                    effect_instance.apply(self, player)
+                    effect.apply(self, player, card.id)
 
     def check_triggers(self, player, trigger_type, card_played=None):
-        for card in player.battlezone + player.environs:
-            for effect in card.effects:
-                if 'trigger' not in effect:
-                    #print(f"DEBUG: Effect missing 'trigger' key in card {card.name} (ID: {card.id})")
-                    continue
-                if effect['trigger'] == trigger_type:
-                    if trigger_type == "on_play_equipment" and card_played and card_played.card_type == "equipment":
-                        effect_instance = Effect(effect['type'], effect['value'], effect['trigger'], card.id)
-                        effect_instance.apply(self, player, card_played=card_played)
-                        print(f"DEBUG: Triggered effect {effect['type']} from card {card.name} (ID: {card.id})")
-                    elif trigger_type != "on_play_equipment":
-                        effect_instance = Effect(effect['type'], effect['value'], effect['trigger'], card.id)
-                        effect_instance.apply(self, player)
-                        print(f"DEBUG: Triggered effect {effect['type']} from card {card.name} (ID: {card.id})")
+        for card, effect in player.events.publish(trigger_type):
+            if trigger_type == "on_play_equipment" and card_played and card_played.card_type == "equipment":
+                effect.apply(self, player, card.id)
+                log.debug("Triggered effect %s from card %s (ID: %s)", effect['type'], card.name, card.id)
+            elif trigger_type != "on_play_equipment":
+                effect.apply(self, player, card.id)
+                log.debug("Triggered effect %s from card %s (ID: %s)", effect['type'], card.name, card.id)
     
     
     def main_phase(self, current_player):
-        while True:
-            self.update_display()
-            options = [
-                "1. Play card", "2. Pass", "3. Game log",
-                "4. Graveyard", "5. Card info"
-            ]
-            
-            # Add equip and unequip options if there are valid targets
-            if self.has_equipment_to_equip(current_player):
-                options.append("6. Equip")
-            if self.has_equipment_to_unequip(current_player):
-                options.append("7. Unequip")
-            
-            print("\nMain Phase Options:")
-            print(" | ".join(options))
-            
-            if current_player == self.player:
-                choice = input("Enter your choice (1-7): ")
-                if choice == "1":
-                    self.play_card_from_hand()
-                elif choice == "2":
-                    break  # Pass and end the main phase
-                elif choice == "3":
-                    self.display_gamelog()  # Changed from display_game_log to display_gamelog
-                elif choice == "4":
-                    self.display_graveyard()
-                elif choice == "5":
-                    self.show_card_info()
-                elif choice == "6" and "6. Equip" in options:
-                    self.equip_card()
-                elif choice == "7" and "7. Unequip" in options:
-                    self.unequip_card()
-                else:
-                    print("Invalid choice. Please try again.")
-            else:
-                # AI logic for main phase
-                break
+        current_player.controller.main_phase(self, current_player)
 
     def has_equipment_to_equip(self, player):
         return any(card.card_type == "equipment" and not card.equipped_to for card in player.environs)
@@ -272,8 +344,8 @@ class Game:
 
         self.player.energy -= equip_cost
         if equipment.equip(creature):
-            self.log_action(f"{equipment.name} successfully equipped to {creature.name} for {equip_cost} energy.")
-            self.log_action(f"{creature.name}'s attack is now {creature.attack}")
+            self.log_action("%s successfully equipped to %s for %s energy.", equipment.name, creature.name, equip_cost)
+            self.log_action("%s's attack is now %s", creature.name, creature.attack)
         else:
             print("Failed to equip the card.")
             self.player.energy += equip_cost
@@ -340,32 +412,7 @@ class Game:
                 print("Invalid choice. Please try again.")
                 
     def combat_phase(self, current_player):
-        if current_player == self.player:
-            while True:
-                self.update_display()
-                options = [
-                    "1. Attack", "2. Pass", "3. Game log",
-                    "4. Graveyard", "5. Card info"
-                ]
-                print("\nCombat Phase Options:")
-                print(" | ".join(options))
-                
-                choice = input("Enter your choice (1-5): ")
-                if choice == "1":
-                    self.execute_combat_phase()
-                elif choice == "2":
-                    break
-                elif choice == "3":
-                    self.display_game_log()
-                elif choice == "4":
-                    self.display_graveyard()
-                elif choice == "5":
-                    self.show_card_info()
-                else:
-                    print("Invalid choice. Please try again.")
-        else:
-            # AI combat logic
-            self.execute_combat_phase()
+        current_player.controller.combat_phase(self, current_player)
 
     def execute_combat_phase(self):
         execute_combat_phase(self)
@@ -374,32 +421,27 @@ class Game:
         for _ in range(6):
             self.player.draw_card()
             self.opponent.draw_card()
-        display_game_state(self)
+        self.state_changed()
 
 
 
     def check_on_play_equipment_triggers(self, player):
-        for card in player.battlezone + player.environs:
-            for effect in card.effects:
-                if effect.get('trigger') == 'on_play_equipment':
-                    print(f"DEBUG: Triggering on_play_equipment effect for {card.name} (ID: {card.id})")
-                    effect_obj = create_effect(effect['type'], effect['value'], effect['trigger'], card.id)
-                    effect_obj.apply(self, player)
+        for card, effect in player.events.publish('on_play_equipment'):
+            log.debug("Triggering on_play_equipment effect for %s (ID: %s)", card.name, card.id)
+            effect.apply(self, player, card.id)
 
     def check_board_effects(self, player, card_played):
         for card in self.board.get_all_cards():
             for effect in card.effects:
-                effect_instance = Effect(effect['type'], effect.get('value'), effect.get('trigger'), card.id)
-                effect_instance.apply(self, player, card_played=card_played)
+                effect.apply(self, player, card.id)
                 
     def summon_effects(self, card, player):
-        print(f"DEBUG: Summoning effects for {card.name} (ID: {card.id})")
+        log.debug("Summoning effects for %s (ID: %s)", card.name, card.id)
         card.apply_effects(self, player)
         for effect in card.effects:
             if effect['trigger'] == 'on_summon':
-                effect_instance = Effect(effect['type'], effect.get('value'), effect['trigger'], card.id)
-                effect_instance.apply(self, player)
-                print(f"DEBUG: Applied summon effect {effect['type']} for {card.name} (ID: {card.id})")
+                effect.apply(self, player, card.id)
+                log.debug("Applied summon effect %s for %s (ID: %s)", effect['type'], card.name, card.id)
 
     def display_game_state(self):
         print("\nCurrent Game State:")
@@ -411,8 +453,8 @@ class Game:
 
     def display_gamelog(self):
         print(Fore.CYAN + "\nGame Log:" + Style.RESET_ALL)
-        for entry, color in self.game_log:  # Show last 10 entries
-            print(color + entry + Style.RESET_ALL)
+        for entry in self.game_log:
+            print(entry.color + entry.text + Style.RESET_ALL)
         input(Fore.MAGENTA + "\nPress Enter to return to the game." + Style.RESET_ALL)
 
     def display_graveyard(self):
@@ -442,18 +484,37 @@ class Game:
         for i, card in enumerate(player.hand, 1):
             print(f"{i}. {card.name} (Type: {card.card_type}, Cost: {card.cost}, ATK/DEF: {card.attack}/{card.defense})")
 
-    def log_action(self, action, color=Fore.WHITE):
-        timestamp = f"[Turn {self.turn_counter}]"
-        player = "Player" if self.player_turn else "Opponent"
-        log_entry = f"{timestamp} {player}: {action}"
-        self.game_log.append((log_entry, color))
-
-    def update_display(self):
-        display_game_state(self)
+    def log_action(self, action, *args, color=Fore.WHITE):
+        """Add `action` to the game log, %-formatted with `args` like a log.py message.
+
+        Formatting happens only when the log is on, so headless games and lookahead clones (whose
+        log is off) pay for the call and nothing else.
+        """
+        if self.game_log.enabled:
+            self.game_log.record(self.turn_counter, "Player" if self.player_turn else "Opponent",
+                                 action % args if args else action, color)
+
+    def attach(self, view):
+        """Add an observer with state_changed(game), refresh(game) and close(game) (e.g. a TerminalView)."""
+        self.views.append(view)
+
+    def state_changed(self):
+        # Views decide when to draw; with none attached this costs an empty loop
+        for view in self.views:
+            view.state_changed(self)
+
+    def human_deciding(self, player, situation, attackers=None):
+        """Let the other side think ahead while `player` makes a decision at the keyboard."""
+        self.opponent_of(player).controller.ponder(self, player, situation, attackers)
+
+    def refresh_views(self):
+        """Bring every view up to date, before asking a human for input."""
+        for view in self.views:
+            view.refresh(self)
         # Print the last 5 log entries
         #print("\nGame Log (last 5 entries):")
-        #for message, color in self.game_log[-5:]:
-        #    print(f"{color}{message}{Style.RESET_ALL}")
+        #for entry in self.game_log.recent(5):
+        #    print(f"{entry.color}{entry.text}{Style.RESET_ALL}")
 
     def handle_command(self, command):
         parts = command.split()
@@ -465,64 +526,30 @@ class Game:
             print("Unknown command")
 
     def find_cards_by_id_prefix(self, id_prefix):
-        cards = []
-        # Search in player        for card in self.player.deck + self.player.hand + self.player.battlezone + self.player.graveyard + self.player.environs:
-        for card in self.player.deck + self.player.hand + self.player.battlezone + self.player.graveyard + self.player.environs:
-            if card.id.startswith(id_prefix):
-                cards.append(card)
-        # Search in opponent's zones
-        for card in self.opponent.deck + self.opponent.hand + self.opponent.battlezone + self.opponent.graveyard + self.opponent.environs:
-            if card.id.startswith(id_prefix):
-                cards.append(card)
-        return cards
-
-    def select_target(self, card_type=None, effect_description=None, player=None):
-        print(f"DEBUG: Selecting target for {effect_description}")
+        return self.registry.find_by_prefix(id_prefix)
+
+    def select_target(self, card_type=None, effect_description=None, player=None, friendly=False):
+        log.debug("Selecting target for %s", effect_description)
         valid_targets = self.get_valid_targets(card_type)
         if not valid_targets:
-            print(f"DEBUG: No valid targets found for {card_type}")
+            log.debug("No valid targets found for %s", card_type)
             return None
 
-        print("Legal targets:")
-        for i, target in enumerate(valid_targets, 1):
-            if isinstance(target, Player):
-                print(f"{i}. {target.name} (Player)")
-            else:
-                owner = "Your" if target in player.battlezone + player.environs else "Opponent's"
-                print(f"{i}. {owner} {target.name} (ID: {target.id[:8]})")
-        print(f"{len(valid_targets) + 1}. Enter custom card ID")
-        print(f"{len(valid_targets) + 2}. Cancel")
-
-        while True:
-            try:
-                choice = int(input(f"Enter your choice (1-{len(valid_targets) + 2}): "))
-                if choice == len(valid_targets) + 2:
-                    return None
-                if 1 <= choice <= len(valid_targets):
-                    return valid_targets[choice - 1]
-                if choice == len(valid_targets) + 1:
-                    id_prefix = input("Enter the first four digits of the target card ID: ").strip().lower()
-                    custom_targets = self.find_cards_by_id_prefix(id_prefix)
-                    custom_targets = [card for card in custom_targets if self.is_legal_target(card, card_type)]
-                    if custom_targets:
-                        return custom_targets[0]
-                    else:
-                        print(f"No valid {card_type if card_type else 'card'} found with that ID.")
-                print("Invalid choice. Please try again.")
-            except ValueError:
-                print("Invalid input. Please enter a number.")
+        chooser = player or self.current_player
+        return chooser.controller.select_target(self, chooser, valid_targets, card_type, effect_description, friendly)
 
     def get_valid_targets(self, card_type):
         valid_targets = []
         if card_type == "creature_or_player":
             valid_targets.extend([self.player, self.opponent])
-            valid_targets.extend(self.player.battlezone + self.opponent.battlezone)
+            valid_targets.extend(self.player.battlezone)
+            valid_targets.extend(self.opponent.battlezone)
         elif card_type == "creature":
-            valid_targets.extend(self.player.battlezone + self.opponent.battlezone)
-        elif card_type == "enchantment":
-            valid_targets.extend([card for card in self.player.environs + self.opponent.environs if card.card_type == "enchantment"])
-        elif card_type == "equipment":
-            valid_targets.extend([card for card in self.player.environs + self.opponent.environs if card.card_type == "equipment"])
+            valid_targets.extend(self.player.battlezone)
+            valid_targets.extend(self.opponent.battlezone)
+        elif card_type in ("enchantment", "equipment"):
+            for environs in (self.player.environs, self.opponent.environs):
+                valid_targets.extend(card for card in environs if card.card_type == card_type)
         # Add other card type checks here if needed
         return valid_targets
 
@@ -530,7 +557,7 @@ class Game:
         legal_targets = []
         if card_type in ["creature", "enchantment", "equipment"]:
             for p in [self.player, self.opponent]:
-                legal_targets.extend([card for card in p.battlezone + p.environs if self.is_legal_target(card, card_type)])
+                legal_targets.extend(card for card in p.cards_in_play() if self.is_legal_target(card, card_type))
         elif card_type == "creature_or_player":
             for p in [self.player, self.opponent]:
                 legal_targets.extend([card for card in p.battlezone if card.card_type == "creature"])
@@ -539,7 +566,7 @@ class Game:
             legal_targets = [self.player, self.opponent]
         elif card_type is None:
             for p in [self.player, self.opponent]:
-                legal_targets.extend(p.battlezone + p.environs)
+                legal_targets.extend(p.cards_in_play())
             legal_targets.extend([self.player, self.opponent])
         return legal_targets
 
@@ -0,0 +1,68 @@
+# card_game/gamelog.py
+import gzip
+import json
+from collections import deque
+from typing import NamedTuple
+from colorama import Fore
+
+# Entries kept in memory; older ones are dropped (or only survive in the spill file)
+DEFAULT_CAPACITY = 200
+
+
+class LogEntry(NamedTuple):
+    turn: int
+    actor: str  # "Player" or "Opponent": whose turn it was
+    message: str
+    color: str = Fore.WHITE
+
+    @property
+    def text(self):
+        return f"[Turn {self.turn}] {self.actor}: {self.message}"
+
+
+class GameLog:
+    """What happened in a game: the last `capacity` entries in memory, optionally everything on disk.
+
+    With `spill_path`, every entry is also streamed to a gzip file of JSON lines as it is recorded
+    (call close() when the game is over). A log with no capacity and no spill file is off: record()
+    returns at once, which is what simulations and lookahead clones use.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, spill_path=None):
+        self.entries = deque(maxlen=capacity)
+        self.enabled = capacity > 0 or spill_path is not None
+        self.recorded = 0  # Entries ever recorded, including those no longer in memory
+        self._spill = gzip.open(spill_path, 'wt', encoding='utf-8') if spill_path is not None else None
+
+    def record(self, turn, actor, message, color=Fore.WHITE):
+        if not self.enabled:
+            return
+        self.recorded += 1
+        self.entries.append(LogEntry(turn, actor, message, color))
+        if self._spill is not None:
+            self._spill.write(json.dumps({"turn": turn, "actor": actor, "message": message}) + "\n")
+
+    def recent(self, count):
+        """The last `count` entries still in memory, oldest first."""
+        return list(self.entries)[-count:] if count > 0 else []
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def close(self):
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+
+def read_spill(path):
+    """LogEntry for each line of a spill file written by GameLog."""
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        return [LogEntry(**json.loads(line)) for line in file]
+
+
+# Shared log that records nothing
+OFF = GameLog(capacity=0)
@@ -0,0 +1,83 @@
+# card_game/log.py
+import logging
+import os
+import sys
+import threading
+from contextlib import contextmanager
+
+# Engine debug output goes to the "blockcards.<category>" loggers. Calls use %-style arguments,
+# so a disabled message costs a level check and nothing is formatted.
+ROOT = "blockcards"
+CATEGORIES = ("game", "turns", "player", "card", "effects", "combat", "ai")
+
+# Comma-separated categories (or "all") to debug when configure() isn't told which
+DEBUG_ENV = "BLOCKCARDS_DEBUG"
+
+
+def get_logger(category):
+    logger = logging.getLogger(f"{ROOT}.{category}")
+    logger.addFilter(_thread_filter)  # A no-op if it is already there
+    return logger
+
+
+def parse_categories(debug):
+    """Category names from "turns,effects", "all" or an iterable of names; raises ValueError on unknown names."""
+    if isinstance(debug, str):
+        debug = [name.strip() for name in debug.split(",") if name.strip()]
+    debug = set(debug)
+    if "all" in debug:
+        return set(CATEGORIES)
+    unknown = debug - set(CATEGORIES)
+    if unknown:
+        raise ValueError(f"unknown log categories: {', '.join(sorted(unknown))} "
+                         f"(choose from {', '.join(CATEGORIES)} or all)")
+    return debug
+
+
+def configure(debug=None, level=logging.WARNING, stream=None):
+    """Print engine messages at `level` and above to `stream` (stderr), and everything from the `debug` categories.
+
+    `debug` defaults to the BLOCKCARDS_DEBUG environment variable. Calling again replaces the
+    previous configuration.
+    """
+    if debug is None:
+        debug = os.environ.get(DEBUG_ENV, "")
+    debug = parse_categories(debug)
+    root = logging.getLogger(ROOT)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(logging.Formatter("%(levelname)s %(name)s: %(message)s"))
+    root.addHandler(handler)
+    root.propagate = False
+    root.setLevel(level)
+    for category in CATEGORIES:
+        get_logger(category).setLevel(logging.DEBUG if category in debug else logging.NOTSET)
+
+
+# Nesting depth of silenced() on each thread
+_silenced = threading.local()
+
+
+class _ThreadFilter(logging.Filter):
+    """Drops the engine's messages on threads inside silenced(); every engine logger has it."""
+
+    def filter(self, record):
+        return not getattr(_silenced, 'depth', 0)
+
+
+_thread_filter = _ThreadFilter()
+
+
+@contextmanager
+def silenced():
+    """Drop every engine log message (errors too) from this thread for the duration, e.g. during lookahead rollouts.
+
+    Safe to nest. Other threads keep logging, so a background search (mcts pondering) or a match
+    hosted by server.py never mutes the rest of the process.
+    """
+    _silenced.depth = getattr(_silenced, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _silenced.depth -= 1
@@ -1,5 +1,6 @@
 # card_game/main.py
 from game import Game
+from log import configure
 from colorama import init, Fore, Back, Style
 import os
 
@@ -11,6 +12,7 @@ os.system('color')  # Enable ANSI escape sequences on Windows
 init(autoreset=True)
 
 def main():
+    configure()  # Debug output only for the categories in $BLOCKCARDS_DEBUG
     player_name = "Player"  # Default player name
     opponent_name = "AI Opponent"
     game = Game(player_name, opponent_name)
@@ -0,0 +1,272 @@
+# card_game/mcts.py
+import math
+import random
+import threading
+import time
+from combat import ai_declare_blockers, resolve_combat_phase, cleanup_phase, declare_attackers, declare_blockers
+from controllers import AIController
+from turns import AI_TURN_PHASES, end_phase, opponent_turn_structure
+from log import get_logger, silenced
+
+log = get_logger('ai')
+
+# Set on a pondering thread: the Event that cancels its search
+_pondering = threading.local()
+
+
+class StopPondering(BaseException):
+    """Ends a background search. Not an Exception, so the engine's per-turn error handling lets it through."""
+
+
+def evaluate(game, player):
+    """Score a position for `player` between 0 (lost) and 1 (won)."""
+    if game.game_over and game.winner is not None:
+        return 1.0 if game.winner is player else 0.0
+    opponent = game.opponent_of(player)
+    board = sum(card.attack + card.defense for card in player.battlezone)
+    opponent_board = sum(card.attack + card.defense for card in opponent.battlezone)
+    score = (player.life - opponent.life) + 0.5 * (board - opponent_board)
+    return 0.5 + 0.5 * math.tanh(score / 10)
+
+
+def _card_key(card):
+    equipped_to = card.equipped_to.uid if card.equipped_to is not None else None
+    return (card.uid, card.attack, card.defense, card.tapped, card.summoning_sickness, equipped_to,
+            len(card.effects), card.equipment_damage)
+
+
+def _player_key(player):
+    return (player.life, player.energy, tuple(effect.value for effect in player.energy_regen_effects),
+            tuple(sorted(player.effect_modifiers.items())), tuple(card.uid for card in player.hand),
+            tuple(_card_key(card) for card in player.battlezone), tuple(_card_key(card) for card in player.environs),
+            len(player.graveyard), len(player.deck))
+
+
+def fingerprint(game):
+    """Everything a search's result depends on, hashable; equal for a game and a clone in the same state.
+
+    Cards are identified by uid, which clones share, and the random state is included because
+    each search seeds itself from it.
+    """
+    return (game.turn_counter, game.turn_phase, game.current_player is game.player,
+            _player_key(game.player), _player_key(game.opponent), game.rng.getstate())
+
+
+def _action_key(action):
+    if action is None:
+        return None
+    if isinstance(action, list):
+        return tuple(_action_key(card) for card in action)
+    return action.uid
+
+
+class MCTSController(AIController):
+    """AI that picks plays and blocks by Monte Carlo search over random playouts of cloned games.
+
+    Each decision runs UCB1 over the candidate moves: every iteration clones the game, applies a
+    move, finishes the turn and plays on with the built-in AI for `rollout_turns` turns, then scores
+    the result. Search stops at `time_budget` seconds, or after exactly `iterations` playouts if that
+    is given (reproducible for a seeded game). The most visited move is played.
+
+    With `ponder`, the search also runs while a human opponent is deciding (see ponder()): the
+    likely next decision is searched in the background on a clone, and used as is if the game
+    reaches exactly that state. It is the same search with the same seed, so a pondered move is
+    the move the AI would have made.
+    """
+
+    def __init__(self, time_budget=0.05, iterations=None, exploration=1.4, rollout_turns=4, max_block_candidates=16,
+                 ponder=True):
+        self.time_budget = time_budget
+        self.iterations = iterations
+        self.exploration = exploration
+        self.rollout_turns = rollout_turns
+        self.max_block_candidates = max_block_candidates
+        self.rollout_controller = AIController()
+        self.ponder_enabled = ponder
+        self.pondered_hits = 0  # Decisions answered from a background search
+        self._pondered = {}  # (fingerprint, next phase, actions) -> index of the chosen action
+        self._ponder_thread = None
+        self._ponder_cancel = None
+        self._ponder_source = None  # What the current background search started from
+        self._ponder_key = None  # The decision it is searching, once it gets there
+
+    def ponder(self, game, player, situation, attackers=None):
+        """Search ahead on a background thread while the human `player` decides.
+
+        The AI's next decision is predicted by assuming the human makes the built-in AI's choice:
+        "turn" (main or combat phase) passes the rest of the turn and searches the AI's first
+        decision of its next turn; "attack" attacks with the solver's attackers and searches the
+        AI's blocks; "block" blocks `attackers` like the solver and searches the AI's next play.
+        Only the background thread's logging is silenced, so the game's own debug output and
+        errors keep coming while the human is at a prompt.
+        """
+        if not self.ponder_enabled:
+            return
+        source = (situation, fingerprint(game))
+        if source == self._ponder_source:
+            return  # Already thinking about this (e.g. the human only looked at the game log)
+        self.stop_pondering(cancel=True)
+        self._pondered.clear()
+        self._ponder_source = source
+        self._ponder_key = None
+
+        clone = game.clone()  # Taken here, on the game's thread; the background only touches the clone
+        human = clone.player if player is game.player else clone.opponent
+        ai = clone.opponent_of(human)
+        human.controller = self.rollout_controller
+        ai.controller = self
+        clone_attackers = [clone.registry.get(attacker.uid) for attacker in attackers or ()]
+        if None in clone_attackers:
+            return
+        self._ponder_cancel = threading.Event()
+        self._ponder_thread = threading.Thread(target=self._ponder, name="ponder", daemon=True,
+                                               args=(clone, human, ai, situation, clone_attackers,
+                                                     self._ponder_cancel))
+        self._ponder_thread.start()
+
+    def _ponder(self, clone, human, ai, situation, attackers, cancel):
+        # Plays the clone forward until the AI's next search, which records its result and stops
+        _pondering.cancel = cancel
+        try:
+            with silenced():  # This thread only; see log.silenced
+                if situation == "turn":
+                    clone.turn_phase = "end"
+                    end_phase(clone, player=human is clone.player)
+                    if clone.check_game_over() or (clone.max_turns is not None
+                                                   and clone.turn_counter >= clone.max_turns):
+                        return
+                    clone.current_player = ai
+                    clone.player_turn = ai is clone.player
+                    clone.turn_counter += 1
+                    clone.turn_flow(ai)
+                elif situation == "attack":
+                    attackers = declare_attackers(clone, human)
+                    if attackers:
+                        declare_blockers(clone, ai, attackers)
+                elif situation == "block":
+                    blockers = declare_blockers(clone, human, attackers)
+                    resolve_combat_phase(clone, attackers, blockers)
+                    cleanup_phase(clone, ai, human)
+                    opponent_turn_structure(clone, ai, "main_phase_2")
+        except StopPondering:
+            pass
+        except Exception as e:
+            log.debug("Pondering stopped by an error: %s", e)
+        finally:
+            _pondering.cancel = None
+
+    def stop_pondering(self, cancel=False):
+        """Wait for the background search to finish, or with `cancel` stop it first."""
+        thread = self._ponder_thread
+        if thread is None:
+            return
+        if cancel:
+            self._ponder_cancel.set()
+        thread.join()
+        self._ponder_thread = None
+
+    def choose_card_to_play(self, game, player, playable_cards):
+        actions = list(playable_cards) + [None]  # None passes the main phase
+
+        def play(clone, clone_player, card):
+            if card is not None:
+                clone_player.play_card(clone.registry.get(card.uid))
+
+        phase = game.turn_phase if game.turn_phase in AI_TURN_PHASES else "main_phase_1"
+        next_phase = AI_TURN_PHASES[min(AI_TURN_PHASES.index(phase) + 1, len(AI_TURN_PHASES) - 1)]
+        return self.search(game, player, actions, play, next_phase)
+
+    def declare_blockers(self, game, player, attackers, available_blockers):
+        candidates = self.blocking_candidates(game, player, attackers, available_blockers)
+
+        def block(clone, clone_player, blockers):
+            attacking_player = clone.opponent_of(clone_player)
+            clone_attackers = [clone.registry.get(attacker.uid) for attacker in attackers]
+            clone_blockers = [clone.registry.get(blocker.uid) if blocker else None for blocker in blockers]
+            pairs = [(a, b) for a, b in zip(clone_attackers, clone_blockers) if a is not None]
+            resolve_combat_phase(clone, [a for a, _ in pairs], [b for _, b in pairs])
+            cleanup_phase(clone, attacking_player, clone_player)
+
+        return self.search(game, player, candidates, block, "main_phase_2")
+
+    def blocking_candidates(self, game, player, attackers, available_blockers):
+        # No blocks, the solver's blocks, then every single block; duplicates dropped
+        candidates = [[None] * len(attackers), ai_declare_blockers(game, player, attackers, available_blockers)]
+        for i in range(len(attackers)):
+            for blocker in available_blockers:
+                blockers = [None] * len(attackers)
+                blockers[i] = blocker
+                candidates.append(blockers)
+        unique = {}
+        for blockers in candidates:
+            unique.setdefault(tuple(id(blocker) for blocker in blockers), blockers)
+        return list(unique.values())[:self.max_block_candidates]
+
+    def search(self, game, player, actions, apply_action, next_phase):
+        if len(actions) == 1:
+            return actions[0]
+        cancel = getattr(_pondering, 'cancel', None)
+        key = None
+        if cancel is not None or self._ponder_thread is not None or self._pondered:
+            key = (fingerprint(game), next_phase, tuple(_action_key(action) for action in actions))
+        if cancel is None and key is not None:
+            # A search of this very decision has the same budget, so it is worth waiting for
+            self.stop_pondering(cancel=self._ponder_key is not None and self._ponder_key != key)
+            self._ponder_source = self._ponder_key = None
+            index = self._pondered.pop(key, None)
+            self._pondered.clear()
+            if index is not None:
+                game.rng.getrandbits(64)  # The draw the search would have made
+                self.pondered_hits += 1
+                return actions[index]
+        # One draw from the game's generator per decision keeps the game's own sequence aligned
+        search_rng = random.Random(game.rng.getrandbits(64))
+        if cancel is not None:
+            self._ponder_key = key
+        visits = [0] * len(actions)
+        rewards = [0.0] * len(actions)
+        deadline = time.perf_counter() + self.time_budget
+        iteration = 0
+        with silenced():
+            while True:
+                if self.iterations is not None:
+                    if iteration >= self.iterations:
+                        break
+                elif iteration >= len(actions) and time.perf_counter() >= deadline:
+                    break
+                if cancel is not None and cancel.is_set():
+                    raise StopPondering
+                index = self.select(visits, rewards, iteration)
+                clone = game.clone()
+                clone.rng.seed(search_rng.getrandbits(64))
+                clone.player.controller = clone.opponent.controller = self.rollout_controller
+                clone_player = clone.player if player is game.player else clone.opponent
+                apply_action(clone, clone_player, actions[index])
+                visits[index] += 1
+                rewards[index] += self.rollout(clone, clone_player, next_phase)
+                iteration += 1
+        best = max(range(len(actions)), key=lambda i: visits[i])
+        if cancel is not None:
+            self._pondered[key] = best
+            raise StopPondering
+        return actions[best]
+
+    def select(self, visits, rewards, iteration):
+        for i, count in enumerate(visits):
+            if count == 0:
+                return i
+        log_total = math.log(iteration)
+        return max(range(len(visits)),
+                   key=lambda i: rewards[i] / visits[i] + self.exploration * math.sqrt(log_total / visits[i]))
+
+    def rollout(self, game, player, next_phase):
+        if not game.check_game_over():
+            opponent_turn_structure(game, game.current_player, next_phase)
+        turns = 0
+        while not game.check_game_over() and turns < self.rollout_turns:
+            game.current_player = game.opponent_of(game.current_player)
+            game.player_turn = game.current_player is game.player
+            game.turn_counter += 1
+            game.turn_flow(game.current_player)
+            turns += 1
+        return evaluate(game, player)
@@ -0,0 +1,197 @@
+# card_game/metrics.py
+import bisect
+import os
+import threading
+import time
+
+PREFIX = "blockcards_"
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = PREFIX + name
+        self.help = help
+        self.labels = labels
+        self.samples = {}  # tuple of label values -> count
+
+    def inc(self, *values, amount=1):
+        self.samples[values] = self.samples.get(values, 0) + amount
+
+    def snapshot(self):
+        return {"type": "counter", "help": self.help, "labels": self.labels, "samples": dict(self.samples)}
+
+    def reset(self):
+        self.samples.clear()
+
+    def merge(self, snapshot):
+        for values, count in snapshot["samples"].items():
+            self.inc(*values, amount=count)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for values, count in sorted(self.samples.items()):
+            lines.append(f"{self.name}{_label_text(self.labels, values)} {count}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, buckets):
+        self.name = PREFIX + name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # Per bucket, not cumulative; the last one is +Inf
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self):
+        return {"type": "histogram", "help": self.help, "buckets": self.buckets, "counts": list(self.counts),
+                "sum": self.sum, "count": self.count}
+
+    def reset(self):
+        self.counts = [0] * len(self.counts)
+        self.sum = 0
+        self.count = 0
+
+    def merge(self, snapshot):
+        if tuple(snapshot["buckets"]) != self.buckets:
+            raise ValueError(f"{self.name}: can't merge histograms with different buckets")
+        self.counts = [mine + theirs for mine, theirs in zip(self.counts, snapshot["counts"])]
+        self.sum += snapshot["sum"]
+        self.count += snapshot["count"]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        cumulative = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {self.sum}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+
+def _label_text(labels, values):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{label}="{_escape(value)}"' for label, value in zip(labels, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Metrics:
+    """Counters and histograms about the games a process plays, for monitoring.
+
+    The engine reports events through the methods below (card_played, effect_triggered, ...). A
+    disabled Metrics ignores them, which is what lookahead clones use so searched-but-unplayed
+    moves aren't counted. snapshot() is a picklable copy of every metric that merge() adds back
+    in (e.g. from worker processes); render() is the Prometheus text exposition format.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()  # Games on several threads (server.py) report to the same Metrics
+        self.cards_played = Counter("cards_played_total", "Cards played, by card type.", ("card_type",))
+        self.effects_triggered = Counter("effects_triggered_total", "Card effects resolved, by effect type.",
+                                         ("effect_type",))
+        self.combat_exchanges = Counter("combat_exchanges_total", "Attacking creatures resolved in combat.",
+                                        ("blocked",))
+        self.damage_dealt = Counter("damage_dealt_total", "Damage dealt, by source (combat or effect) and target.",
+                                    ("source", "target"))
+        self.games = Counter("games_total", "Finished games, by winner (player, opponent or draw).", ("winner",))
+        self.game_turns = Histogram("game_turns", "Turns per finished game.", (5, 10, 15, 20, 30, 50, 100, 200))
+        self.game_seconds = Histogram("game_duration_seconds", "Wall time per finished game.",
+                                      (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1, 5, 30, 300))
+        self._textfile = None
+        self._interval = None
+        self._saved_at = 0.0
+
+    def __getstate__(self):
+        # Game clones carry OFF, and server.py pickles them for its search processes
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def collectors(self):
+        return (self.cards_played, self.effects_triggered, self.combat_exchanges, self.damage_dealt, self.games,
+                self.game_turns, self.game_seconds)
+
+    def card_played(self, card_type):
+        if self.enabled:
+            with self._lock:
+                self.cards_played.inc(card_type)
+
+    def effect_triggered(self, effect_type):
+        if self.enabled:
+            with self._lock:
+                self.effects_triggered.inc(effect_type)
+
+    def combat_exchange(self, blocked):
+        if self.enabled:
+            with self._lock:
+                self.combat_exchanges.inc("true" if blocked else "false")
+
+    def damage(self, source, target, amount):
+        if self.enabled and amount > 0:
+            with self._lock:
+                self.damage_dealt.inc(source, target, amount=amount)
+
+    def game_finished(self, winner, turns, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.games.inc(winner)
+            self.game_turns.observe(turns)
+            self.game_seconds.observe(seconds)
+        if self._textfile is not None and time.monotonic() - self._saved_at >= self._interval:
+            self.write_textfile(self._textfile)
+
+    def snapshot(self):
+        with self._lock:
+            return {metric.name: metric.snapshot() for metric in self.collectors()}
+
+    def merge(self, snapshot):
+        with self._lock:
+            for metric in self.collectors():
+                if metric.name in snapshot:
+                    metric.merge(snapshot[metric.name])
+
+    def reset(self):
+        with self._lock:
+            for metric in self.collectors():
+                metric.reset()
+
+    def render(self):
+        with self._lock:
+            return "\n".join(line for metric in self.collectors() for line in metric.render()) + "\n"
+
+    def write_textfile(self, path):
+        """Write render() to `path` atomically, for node_exporter's textfile collector or any scraper."""
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, 'w') as file:
+            file.write(self.render())
+        os.replace(temporary, path)
+        self._saved_at = time.monotonic()
+
+    def autosave(self, path, interval=10.0):
+        """Also write the textfile whenever a game finishes at least `interval` seconds after the last write."""
+        self._textfile = path
+        self._interval = interval
+
+
+# What this process's games report to
+METRICS = Metrics()
+
+# Ignores everything; for lookahead clones
+OFF = Metrics(enabled=False)
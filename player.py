@@ -1,46 +1,74 @@
+import logging
 from typing import TYPE_CHECKING
+from events import EventBus
+from zone import Deck, Zone, move
+from log import get_logger
+from timing import timed
 
 if TYPE_CHECKING:
     from card import Card
 
+log = get_logger('player')
+
 
 def gain_energy(player, energy):
     player.energy += energy
-    player.game_log.append(f"{player.name} gained {energy} energy.")
 
 
 
 class Player:
-    def __init__(self, name, game):
+    def __init__(self, name, game, controller=None):
         self.name = name
         self.game = game
-        self.deck = []
-        self.hand = []
-        self.battlezone = []
-        self.environs = []
-        self.graveyard = []
+        self.controller = controller  # Makes this player's decisions (see controllers.py)
+        self.deck = Deck(self)  # Card definitions; cards are created as they are drawn
+        self.events = EventBus()  # This player's cards in play by trigger
+        self.hand = Zone('hand', self)
+        self.battlezone = Zone('battlezone', self, events=self.events)
+        self.environs = Zone('environs', self, events=self.events)
+        self.graveyard = Zone('graveyard', self)
         self._energy = 0
         self.base_energy_regen = 1  # Fixed and immutable natural energy gain rate
         self.energy_regen_effects = []  # Track individual energy regeneration effects
         self.life = 20
         self.applied_effects = {}
-        self.game_log = []
         self.equipment_cost_reduction = 0
         self.effect_modifiers = {
             'equipment_cost_reduction': 0
         }
 
+    def clone(self, game, cards):
+        """Copy of this player for `game`. Every copied card is recorded in `cards` (id(original) -> copy)."""
+        copy = Player.__new__(Player)
+        copy.__dict__.update(self.__dict__)
+        copy.game = game
+        copy.deck = self.deck.copy(copy)
+        copy.events = EventBus()
+        for zone in ('hand', 'battlezone', 'environs', 'graveyard'):
+            in_play = getattr(self, zone).events is not None
+            copied_zone = Zone(zone, copy, events=copy.events if in_play else None)
+            for card in getattr(self, zone):
+                card_copy = cards.get(id(card))
+                if card_copy is None:
+                    card_copy = cards[id(card)] = card.clone()
+                move(card_copy, copied_zone)
+            setattr(copy, zone, copied_zone)
+        copy.energy_regen_effects = list(self.energy_regen_effects)
+        copy.applied_effects = dict(self.applied_effects)
+        copy.effect_modifiers = dict(self.effect_modifiers)
+        return copy
+
     def draw_card(self):
         if self.deck:
-            card = self.deck.pop(0)
+            card = self.game.create_card(self.deck.popleft(), self)
             self.hand.append(card)
-            print(f"DEBUG: Drew card {card.name} with ID {card.id}")
+            log.debug("Drew card %s with ID %s", card.name, card.id)
             return card
         return None
 
     def take_damage(self, amount):
         self.life -= amount
-        print(f"DEBUG: {self.name} took {amount} damage. Remaining life: {self.life}")
+        log.debug("%s took %s damage. Remaining life: %s", self.name, amount, self.life)
 
     @property
     def energy(self):
@@ -53,14 +81,14 @@ class Player:
     def increase_energy(self):
         # Always add the fixed natural energy gain rate
         gain_energy(self, self.base_energy_regen)
-        print(f"{self.name}'s energy increased to {self.energy} (natural gain)")
+        log.debug("%s's energy increased to %s (natural gain)", self.name, self.energy)
 
     def apply_energy_regen_effects(self):
         # Apply additional energy from effects separately
         additional_energy = sum(effect.value for effect in self.energy_regen_effects)
         if additional_energy > 0:
             gain_energy(self, additional_energy)
-            print(f"{self.name}'s energy increased by {additional_energy} from effects, now at {self.energy}")
+            log.debug("%s's energy increased by %s from effects, now at %s", self.name, additional_energy, self.energy)
 
     def remove_energy_regen_effect(self, effect):
         if 'value' in effect:
@@ -70,34 +98,33 @@ class Player:
     def recalculate_energy_regen(self):
         self.energy_regen = self.base_energy_regen + sum(effect['value'] for effect in self.energy_regen_effects)
 
+    @timed("Player.play_card", key=lambda player, card, **kwargs: card.card_type)
     def play_card(self, card: 'Card', **kwargs):
-        print(f"DEBUG: Attempting to play {card.name} (Type: {card.card_type})")
+        log.debug("Attempting to play %s (Type: %s)", card.name, card.card_type)
         if hasattr(card, 'get_numeric_adjusted_cost') and hasattr(card, 'card_type'):
             adjusted_cost = card.get_numeric_adjusted_cost(self)
             if self.energy >= adjusted_cost:
-                self.energy -= adjusted_cost
-                
-                # Check if the card is in hand
-                card_in_hand = next((c for c in self.hand if c.name == card.name), None)
-                if card_in_hand:
-                    self.hand.remove(card_in_hand)
-                else:
-                    print(f"DEBUG: Card {card.name} not found in hand. Current hand: {[c.name for c in self.hand]}")
+                # Check if the card is in hand (this exact copy, not just one with the same name)
+                if card.zone is not self.hand:
+                    if log.isEnabledFor(logging.DEBUG):
+                        log.debug("Card %s not found in hand. Current hand: %s", card.name, [c.name for c in self.hand])
                     return False
+                self.energy -= adjusted_cost
+                self.hand.remove(card)
                 
                 card.owner = self  # Set the card's owner
                 
                 if card.card_type == "spell":
-                    print(f"DEBUG: Playing spell card {card.name}")
-                    print(f"DEBUG: Card effects: {card.effects}")
-                    self.game.log_action(f"{self.name} cast {card.name}.")
+                    log.debug("Playing spell card %s", card.name)
+                    log.debug("Card effects: %s", card.effects)
+                    self.game.log_action("%s cast %s.", self.name, card.name)
                     card.apply_effects(self.game, self)
-                    print(f"DEBUG: After applying effects")
+                    log.debug("After applying effects")
                     self.graveyard.append(card)
-                    self.game.log_action(f"{card.name} was moved to {self.name}'s graveyard.")
+                    self.game.log_action("%s was moved to %s's graveyard.", card.name, self.name)
                 elif card.card_type in ["environ", "enchantment", "equipment"]:
                     self.environs.append(card)
-                    self.game.log_action(f"{self.name} played {card.name} to the environs.")
+                    self.game.log_action("%s played %s to the environs.", self.name, card.name)
                     if card.card_type == "equipment":
                         self.game.last_played_card = card
                         self.game.check_triggers(self, "on_play_equipment", card)
@@ -105,26 +132,30 @@ class Player:
                     self.battlezone.append(card)
                     card.summoning_sickness = True
                     card.tapped = True
-                    self.game.log_action(f"{self.name} played {card.name} to the battlezone.")
+                    self.game.log_action("%s played %s to the battlezone.", self.name, card.name)
                     card.apply_effects(self.game, self)  # Apply effects immediately for creatures
                     self.game.summon_effects(card, self)
                 else:
                     self.graveyard.append(card)
-                    self.game.log_action(f"Unhandled card type {card.card_type}. {card.name} moved to graveyard.")
+                    self.game.log_action("Unhandled card type %s. %s moved to graveyard.", card.card_type, card.name)
                 
                 if card.card_type != "spell":
                     card.apply_effects(self.game, self)
                 
                 self.game.check_triggers(self, "on_play", card)
-                self.game.update_display()  # Update display after playing a card
+                self.game.metrics.card_played(card.card_type)
+                self.game.state_changed()  # Update display after playing a card
                 
-                print(f"DEBUG: Successfully played card {card.name} with ID {card.id}")
+                log.debug("Successfully played card %s with ID %s", card.name, card.id)
                 return True
             else:
-                print(f"Not enough energy to play {card.name}. It costs {adjusted_cost}, but you only have {self.energy} energy.")
+                if self.controller.is_human:
+                    print(f"Not enough energy to play {card.name}. It costs {adjusted_cost}, but you only have {self.energy} energy.")
+                else:
+                    log.debug("%s can't afford %s (costs %s, has %s energy)", self.name, card.name, adjusted_cost, self.energy)
                 return False
         else:
-            print("Error: Invalid card object passed to play_card method.")
+            log.error("Invalid card object passed to play_card: %r", card)
             return False
 
     def sort_card_to_zone(self, card):
@@ -134,17 +165,15 @@ class Player:
             self.environs.append(card)
         elif card.card_type == "spell":
             self.move_card_to_graveyard(card)
-        print(f"DEBUG: Moved card {card.name} with ID {card.id} to {card.card_type} zone")
+        log.debug("Moved card %s with ID %s to %s zone", card.name, card.id, card.card_type)
+
+    def cards_in_play(self):
+        # One snapshot of battlezone + environs, safe to iterate while effects move cards around
+        return (*self.battlezone, *self.environs)
 
     def move_card_to_graveyard(self, card):
-        if card in self.battlezone:
-            self.battlezone.remove(card)
-        elif card in self.hand:
-            self.hand.remove(card)
-        elif card in self.environs:
-            self.environs.remove(card)
-        card.owner.graveyard.append(card)  # Always move to the owner's graveyard
-        print(f"DEBUG: Moved card {card.name} with ID {card.id} to graveyard")
+        move(card, card.owner.graveyard)  # Always move to the owner's graveyard
+        log.debug("Moved card %s with ID %s to graveyard", card.name, card.id)
 
     def display_hand(self):
         for idx, card in enumerate(self.hand, 1):
@@ -170,7 +199,7 @@ class Player:
 
     def calculate_equipment_cost_reduction(self):
         reduction = self.effect_modifiers['equipment_cost_reduction']
-        print(f"DEBUG: Current equipment cost reduction: {reduction}")
+        log.debug("Current equipment cost reduction: %s", reduction)
         return reduction
 
     def equip_card(self, equipment_index, target_index):
@@ -181,8 +210,8 @@ class Player:
                 if target.equipment:
                     self.unequip_card(target_index)
                 equipment.equip(target)
-                self.game.log_action(f"{self.name} equipped {equipment.name} to {target.name}")
-                self.game.log_action(f"{target.name}'s attack is now {target.attack}")
+                self.game.log_action("%s equipped %s to %s", self.name, equipment.name, target.name)
+                self.game.log_action("%s's attack is now %s", target.name, target.attack)
                 return True
         return False
 
@@ -192,14 +221,14 @@ class Player:
             if creature.equipment:
                 equipment = creature.equipment
                 equipment.unequip()
-                self.game.log_action(f"{self.name} unequipped {equipment.name} from {creature.name}")
-                self.game.log_action(f"{creature.name}'s attack is now {creature.attack}")
+                self.game.log_action("%s unequipped %s from %s", self.name, equipment.name, creature.name)
+                self.game.log_action("%s's attack is now %s", creature.name, creature.attack)
                 return True
         return False
 
     def update_effect_modifier(self, effect_type, value):
         self.effect_modifiers[effect_type] = value
-        print(f"DEBUG: Updated {effect_type} for {self.name}. New value: {self.effect_modifiers[effect_type]}")
+        log.debug("Updated %s for %s. New value: %s", effect_type, self.name, self.effect_modifiers[effect_type])
 
     def remove_effect_modifier(self, effect_type, value):
         if effect_type in self.effect_modifiers:
@@ -0,0 +1,64 @@
+# card_game/registry.py
+from bisect import bisect_left, insort
+from itertools import islice
+
+
+class CardRegistry:
+    """Every card in one game by integer ID, plus a prefix index over the hex IDs shown to players.
+
+    IDs come from a per-game counter starting at 1, so they are unique, short and replay with the
+    seed. `card.uid` is the integer and `card.id` its hex form, at least four digits ("002a").
+    """
+
+    def __init__(self):
+        self.next_uid = 1
+        self.cards = {}
+        self._hex_ids = []  # Sorted card.id strings; None until find_by_prefix needs it (clones)
+
+    def register(self, card):
+        card.uid = self.next_uid
+        card.id = f"{card.uid:04x}"
+        self.next_uid += 1
+        self.cards[card.uid] = card
+        if self._hex_ids is not None:
+            insort(self._hex_ids, card.id)
+        return card
+
+    def clear(self):
+        self.next_uid = 1
+        self.cards.clear()
+        self._hex_ids = []
+
+    def get(self, uid):
+        return self.cards.get(uid)
+
+    def locate(self, uid):
+        """(card, Zone) for `uid`; the zone is None for a card that is in none."""
+        card = self.cards.get(uid)
+        return card, card.zone if card is not None else None
+
+    def find_by_prefix(self, id_prefix):
+        """Cards whose hex ID starts with `id_prefix`, in ID order."""
+        if self._hex_ids is None:
+            self._hex_ids = sorted(card.id for card in self.cards.values())
+        start = bisect_left(self._hex_ids, id_prefix)
+        cards = []
+        for hex_id in islice(self._hex_ids, start, None):
+            if not hex_id.startswith(id_prefix):
+                break
+            card = self.cards.get(int(hex_id, 16))
+            if card is not None:
+                cards.append(card)
+        return cards
+
+    def clone(self, cards):
+        """Copy for a cloned game; `cards` maps id(original card) to its copy.
+
+        The copy has no prefix index: lookahead clones never search by ID, so it is only built
+        if find_by_prefix is called.
+        """
+        copy = CardRegistry.__new__(CardRegistry)
+        copy.next_uid = self.next_uid
+        copy.cards = {uid: cards[id(card)] for uid, card in self.cards.items() if id(card) in cards}
+        copy._hex_ids = None
+        return copy
@@ -0,0 +1,474 @@
+# card_game/server.py
+import argparse
+import asyncio
+import glob
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from combat import declare_attackers, declare_blockers, resolve_combat_phase, cleanup_phase
+from controllers import Controller
+from game import Game
+from gamelog import GameLog
+from log import configure, get_logger
+from mcts import MCTSController
+from simulate import SETS_DIR, load_card_pools, make_controller, set_name
+from view import View
+
+log = get_logger('game')
+
+DEFAULT_PORT = 7878
+DEFAULT_MAX_MATCHES = 256
+
+# Seconds a client gets to answer a decision before its match is abandoned
+DEFAULT_DECISION_TIMEOUT = 600.0
+
+# Log lines sent with every state update
+STATE_LOG_LINES = 10
+
+# Energy it costs to equip, as in Game.equip_card
+EQUIP_COST = 1
+
+
+class Disconnected(BaseException):
+    """The client went away (or stopped answering); ends its match.
+
+    Not an Exception, so the engine's per-turn error handling doesn't swallow it.
+    """
+
+
+def card_state(card):
+    return {
+        "id": card.id,
+        "name": card.name,
+        "type": card.card_type,
+        "cost": card.cost,
+        "attack": card.attack,
+        "defense": card.defense,
+        "tapped": card.tapped,
+        "equipped_to": card.equipped_to.id if card.equipped_to is not None else None,
+        "description": card.description,
+    }
+
+
+def game_state(game, player):
+    """What `player` can see of the game, as JSON-ready data."""
+    opponent = game.opponent_of(player)
+    return {
+        "turn": game.turn_counter,
+        "phase": game.turn_phase,
+        "your_turn": game.current_player is player,
+        "you": {
+            "life": player.life,
+            "energy": player.energy,
+            "deck": len(player.deck),
+            "hand": [card_state(card) for card in player.hand],
+            "battlezone": [card_state(card) for card in player.battlezone],
+            "environs": [card_state(card) for card in player.environs],
+            "graveyard": [card.name for card in player.graveyard],
+        },
+        "opponent": {
+            "life": opponent.life,
+            "energy": opponent.energy,
+            "deck": len(opponent.deck),
+            "hand": len(opponent.hand),
+            "battlezone": [card_state(card) for card in opponent.battlezone],
+            "environs": [card_state(card) for card in opponent.environs],
+            "graveyard": [card.name for card in opponent.graveyard],
+        },
+        "log": [entry.text for entry in game.game_log.recent(STATE_LOG_LINES)],
+    }
+
+
+class Session:
+    """One client connection, used from both sides: the event loop reads and writes the socket,
+    and the match's worker thread sends messages and blocks in ask() for answers.
+    """
+
+    def __init__(self, loop, writer, timeout=DEFAULT_DECISION_TIMEOUT):
+        self.loop = loop
+        self.writer = writer
+        self.timeout = timeout
+        self.replies = asyncio.Queue()
+        self._next_id = 0
+
+    def send(self, message):
+        # From the match thread: the write itself happens on the event loop, in order
+        self.loop.call_soon_threadsafe(self.write, message)
+
+    def write(self, message):
+        # On the event loop
+        if not self.writer.is_closing():
+            self.writer.write((json.dumps(message) + "\n").encode())
+
+    def ask(self, decision, **details):
+        """Send a decision request and block (on the match thread) until the client answers it."""
+        self._next_id += 1
+        request_id = self._next_id
+        self.send({"type": "decide", "id": request_id, "decision": decision, **details})
+        while True:
+            future = asyncio.run_coroutine_threadsafe(self.replies.get(), self.loop)
+            try:
+                reply = future.result(self.timeout)
+            except TimeoutError:  # concurrent.futures.TimeoutError is this builtin from Python 3.11 on
+                future.cancel()
+                raise Disconnected(f"no answer to {decision} within {self.timeout}s") from None
+            if reply is None:
+                raise Disconnected("client closed the connection")
+            if reply.get("id") == request_id:
+                return reply
+            self.send({"type": "error", "message": f"expected an answer to request {request_id}"})
+
+    def error(self, message):
+        self.send({"type": "error", "message": message})
+
+
+class RemoteView(View):
+    """Pushes the game state to a connected client, coalesced like a TerminalView redraw."""
+
+    def __init__(self, session, player, interval=0.1):
+        super().__init__(interval)
+        self.session = session
+        self.player = player
+
+    def draw(self, game):
+        self.session.send({"type": "state", "state": game_state(game, self.player)})
+
+
+class RemoteController(Controller):
+    """A player on the other end of a Session: every decision is a "decide" request to the client.
+
+    Answers refer to cards by their "id" from the state messages. Invalid answers get an
+    "error" message and the same question again.
+    """
+    is_human = True  # Plays the interactive turn structure and gets prompted by Game.pause
+
+    def __init__(self, session):
+        self.session = session
+
+    def _ask(self, game, decision, **details):
+        game.refresh_views()
+        return self.session.ask(decision, **details)
+
+    @staticmethod
+    def _card(cards, card_id):
+        return next((card for card in cards if card.id == card_id), None)
+
+    def main_phase(self, game, player):
+        while True:
+            actions = ["play", "pass"]
+            if game.has_equipment_to_equip(player):
+                actions.append("equip")
+            if game.has_equipment_to_unequip(player):
+                actions.append("unequip")
+            reply = self._ask(game, "main_phase", actions=actions)
+            action = reply.get("action")
+            if action == "pass":
+                return
+            if action == "play":
+                self._play(game, player, reply)
+            elif action == "equip" and "equip" in actions:
+                self._equip(game, player, reply)
+            elif action == "unequip" and "unequip" in actions:
+                creature = self._card(player.battlezone, reply.get("creature"))
+                if creature is None or creature.equipment is None:
+                    self.session.error("no equipped creature with that id")
+                else:
+                    creature.equipment.unequip()
+                    game.state_changed()
+            else:
+                self.session.error(f"action must be one of {', '.join(actions)}")
+
+    def _play(self, game, player, reply):
+        card = self._card(player.hand, reply.get("card"))
+        if card is None:
+            self.session.error("no card with that id in your hand")
+        elif card.get_numeric_adjusted_cost(player) > player.energy:
+            self.session.error(f"not enough energy to play {card.name}")
+        elif not player.play_card(card):
+            self.session.error(f"{card.name} can't be played now")
+
+    def _equip(self, game, player, reply):
+        equipment = self._card(player.environs, reply.get("equipment"))
+        creature = self._card(player.battlezone, reply.get("creature"))
+        if equipment is None or equipment.card_type != "equipment" or equipment.equipped_to is not None:
+            self.session.error("no unattached equipment with that id")
+        elif creature is None:
+            self.session.error("no creature with that id in your battlezone")
+        elif player.energy < EQUIP_COST:
+            self.session.error(f"equipping costs {EQUIP_COST} energy")
+        else:
+            player.energy -= EQUIP_COST
+            if equipment.equip(creature):
+                game.log_action("%s successfully equipped to %s for %s energy.", equipment.name, creature.name, EQUIP_COST)
+                game.state_changed()
+            else:
+                player.energy += EQUIP_COST
+
+    def combat_phase(self, game, player):
+        # Same steps as the AI's combat phase, with the attack declared by the client
+        if not any(creature.can_attack() for creature in player.battlezone):
+            game.log_action("No available attackers.")
+            return
+        defending_player = game.opponent_of(player)
+        attackers = declare_attackers(game, player)
+        if attackers:
+            game.state_changed()
+            blockers = declare_blockers(game, defending_player, attackers)
+            resolve_combat_phase(game, attackers, blockers)
+        cleanup_phase(game, player, defending_player)
+        game.state_changed()
+
+    def declare_attackers(self, game, player, available_attackers):
+        while True:
+            reply = self._ask(game, "attackers", available=[card.id for card in available_attackers])
+            attackers = [self._card(available_attackers, card_id) for card_id in reply.get("attackers") or []]
+            if None not in attackers and len(set(attackers)) == len(attackers):
+                return attackers
+            self.session.error("attackers must be distinct ids from the available list (or empty to pass)")
+
+    def declare_blockers(self, game, player, attackers, available_blockers):
+        while True:
+            reply = self._ask(game, "blockers", attackers=[card.id for card in attackers],
+                              available=[card.id for card in available_blockers])
+            choice = reply.get("blockers") or []
+            choice = list(choice) + [None] * (len(attackers) - len(choice))
+            blockers = [None if card_id is None else self._card(available_blockers, card_id)
+                        for card_id in choice[:len(attackers)]]
+            chosen = [blocker for blocker in blockers if blocker is not None]
+            if (sum(card_id is not None for card_id in choice[:len(attackers)]) == len(chosen)
+                    and len(set(chosen)) == len(chosen)):
+                return blockers
+            self.session.error("blockers must list one available id (or null) per attacker, each blocker once")
+
+    def select_target(self, game, player, valid_targets, card_type=None, effect_description=None, friendly=False):
+        # Cards are named by id, players "you" and "opponent"
+        options = {(target.id if hasattr(target, 'card_type') else "you" if target is player else "opponent"): target
+                   for target in valid_targets}
+        while True:
+            reply = self._ask(game, "target", description=effect_description, friendly=friendly,
+                              options=list(options))
+            target = reply.get("target")
+            if target is None:
+                return None
+            if target in options:
+                return options[target]
+            self.session.error("target must be one of the options (or null to cancel)")
+
+    def choose_discard(self, game, player):
+        while True:
+            reply = self._ask(game, "discard", hand=[card.id for card in player.hand])
+            card = self._card(player.hand, reply.get("card"))
+            if card is not None:
+                return player.hand.index(card)
+            self.session.error("card must be the id of a card in your hand")
+
+    def acknowledge(self, message):
+        pass  # Nobody needs to press Enter; state updates are pushed by the RemoteView
+
+
+# The AI of a search process, made by _init_search_worker
+_search_ai = None
+
+
+def _init_search_worker(time_budget):
+    global _search_ai
+    _search_ai = MCTSController(time_budget=time_budget, ponder=False)
+
+
+def _search(game, is_player, decision, *card_uids):
+    # In a search process: one decision on a pickled clone, cards in and out as uids. The clone's
+    # random state goes back too, since the search draws from it
+    player = game.player if is_player else game.opponent
+    cards = [[game.registry.get(uid) for uid in uids] for uids in card_uids]
+    if decision == "play":
+        card = _search_ai.choose_card_to_play(game, player, *cards)
+        choice = None if card is None else card.uid
+    else:
+        choice = [None if blocker is None else blocker.uid
+                  for blocker in _search_ai.declare_blockers(game, player, *cards)]
+    return choice, game.rng.getstate()
+
+
+class PooledMCTSController(MCTSController):
+    """MCTS AI whose searches run in a process pool shared by every match.
+
+    A search holds the GIL for its whole time budget, so searches on the match threads would
+    share one core, hold up the other matches and get weaker as more run at once. Here the match
+    thread sends a clone of the game and waits; each search has a core to itself, and when all
+    are busy decisions queue instead of getting less search. The choice and the game's random
+    state come back as if the search had run here.
+
+    It doesn't ponder: the pool's cores are kept for decisions a match is waiting on.
+    """
+
+    def __init__(self, pool, time_budget=0.05):
+        super().__init__(time_budget=time_budget, ponder=False)
+        self.pool = pool
+
+    def _search_in_pool(self, game, player, decision, *card_lists):
+        clone = game.clone()
+        clone.player.controller = clone.opponent.controller = self.rollout_controller  # Picklable, unlike a session
+        card_uids = [[card.uid for card in cards] for cards in card_lists]
+        choice, rng_state = self.pool.submit(_search, clone, player is game.player, decision, *card_uids).result()
+        game.rng.setstate(rng_state)
+        return choice
+
+    def choose_card_to_play(self, game, player, playable_cards):
+        uid = self._search_in_pool(game, player, "play", playable_cards)
+        return None if uid is None else game.registry.get(uid)
+
+    def declare_blockers(self, game, player, attackers, available_blockers):
+        uids = self._search_in_pool(game, player, "block", attackers, available_blockers)
+        return [None if uid is None else game.registry.get(uid) for uid in uids]
+
+
+class GameServer:
+    """Hosts human-vs-AI matches for clients speaking JSON lines over TCP.
+
+    The event loop only moves messages. Each match runs on a thread of a shared pool, because the
+    engine is synchronous: the thread plays the game and waits for the client's answers, so a
+    slow human only holds up their own match. The MCTS AI's searches go to a pool of
+    `search_workers` processes (one per core by default; see PooledMCTSController), so the
+    match threads only do the quick work between decisions.
+
+    Protocol (one JSON object per line): the server sends {"type": "welcome", "sets": [...]},
+    the client answers {"set": name} (optional "seed"). Then the server sends "state" updates and
+    "decide" requests ({"id", "decision", ...}), each answered by an object with the same "id"
+    and the decision's fields (see RemoteController), and finally {"type": "game_over"}.
+    """
+
+    def __init__(self, set_paths, max_matches=DEFAULT_MAX_MATCHES, ai="mcts", time_budget=0.05,
+                 decision_timeout=DEFAULT_DECISION_TIMEOUT, search_workers=None):
+        self.card_pools = {set_name(path): pool for path, pool in load_card_pools(set_paths).items()}
+        self.max_matches = max_matches
+        self.ai = ai
+        self.time_budget = time_budget
+        self.decision_timeout = decision_timeout
+        self.matches = 0
+        self.executor = ThreadPoolExecutor(max_workers=max_matches, thread_name_prefix="match")
+        self.search_pool = None
+        if ai == "mcts":
+            # Spawned, not forked: a fork could copy a lock some match thread is holding
+            self.search_pool = ProcessPoolExecutor(max_workers=search_workers or os.cpu_count() or 1,
+                                                   mp_context=multiprocessing.get_context("spawn"),
+                                                   initializer=_init_search_worker, initargs=(time_budget,))
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.search_pool is not None:
+            self.search_pool.shutdown(cancel_futures=True)
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle, host, port)
+        log.info("Serving on %s", ", ".join(str(sock.getsockname()) for sock in server.sockets))
+        async with server:
+            await server.serve_forever()
+
+    async def handle(self, reader, writer):
+        session = Session(asyncio.get_running_loop(), writer, self.decision_timeout)
+        if self.matches >= self.max_matches:
+            session.write({"type": "error", "message": "server is full"})
+            await self._close(writer)
+            return
+        self.matches += 1
+        try:
+            session.write({"type": "welcome", "sets": sorted(self.card_pools)})
+            hello = await self._read(reader)
+            if hello is None:
+                return
+            chosen = hello.get("set", min(self.card_pools))
+            if chosen not in self.card_pools:
+                session.write({"type": "error", "message": f"unknown set {chosen!r}"})
+                return
+            reading = asyncio.create_task(self._read_replies(reader, session))
+            try:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, self.play_match, session, chosen, hello.get("seed"))
+                session.write({"type": "game_over", **result})
+            finally:
+                reading.cancel()
+        finally:
+            self.matches -= 1
+            await self._close(writer)
+
+    def play_match(self, session, chosen_set, seed=None):
+        """Play one match on a worker thread; returns the result for the game_over message."""
+        sets = sorted(self.card_pools)
+        opponent_set = sets[(sets.index(chosen_set) + 1) % len(sets)]
+        if self.search_pool is not None:
+            ai = PooledMCTSController(self.search_pool, self.time_budget)
+        else:
+            ai = make_controller(self.ai, self.time_budget)
+        game = Game("Player", "AI Opponent", player_set=self.card_pools[chosen_set],
+                    opponent_set=self.card_pools[opponent_set], player_controller=RemoteController(session),
+                    opponent_controller=ai, headless=True, seed=seed, game_log=GameLog(capacity=STATE_LOG_LINES))
+        game.attach(RemoteView(session, game.player))
+        try:
+            winner = game.start()
+        except Disconnected as e:
+            log.info("Match abandoned: %s", e)
+            return {"winner": None, "abandoned": True}
+        except Exception as e:
+            log.error("Match failed: %s", e, exc_info=True)
+            return {"winner": None, "error": str(e)}
+        return {"winner": "you" if winner is game.player else "opponent" if winner is game.opponent else "draw",
+                "turns": game.turn_counter}
+
+    @staticmethod
+    async def _read(reader):
+        while True:
+            line = await reader.readline()
+            if not line:
+                return None
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(message, dict):
+                return message
+
+    async def _read_replies(self, reader, session):
+        try:
+            while (message := await self._read(reader)) is not None:
+                session.replies.put_nowait(message)
+        finally:
+            session.replies.put_nowait(None)  # Wakes up a match waiting in ask()
+
+    @staticmethod
+    async def _close(writer):
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host human-vs-AI matches over TCP (JSON lines).")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port to listen on")
+    parser.add_argument("--sets", nargs="+", help="set files to offer (default: sets/*.json)")
+    parser.add_argument("--max-matches", type=int, default=DEFAULT_MAX_MATCHES, help="simultaneous matches")
+    parser.add_argument("--ai", choices=("mcts", "random"), default="mcts", help="controller for the AI side")
+    parser.add_argument("--time-budget", type=float, default=0.05, help="MCTS search time per decision in seconds")
+    parser.add_argument("--search-workers", type=int, help="processes running MCTS searches (default: one per core)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_DECISION_TIMEOUT,
+                        help="seconds a client may take to answer before its match is abandoned")
+    args = parser.parse_args()
+    configure()
+
+    set_paths = args.sets or sorted(glob.glob(os.path.join(SETS_DIR, '*.json')))
+    if not set_paths:
+        parser.error(f"no set files found in {SETS_DIR}")
+    server = GameServer(set_paths, args.max_matches, args.ai, args.time_budget, args.timeout, args.search_workers)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+# card_game/simulate.py
+import argparse
+import glob
+import os
+import sys
+import time
+from collections import defaultdict
+from controllers import AIController
+from game import Game
+from gamelog import GameLog, OFF as LOG_OFF
+from log import CATEGORIES, DEBUG_ENV, configure
+from mcts import MCTSController
+from metrics import METRICS
+from timing import profiling
+
+SETS_DIR = os.path.join(os.path.dirname(__file__), 'sets')
+
+# MCTS playouts per decision for seeded runs (about what the default time budget buys). A time
+# budget gives a load-dependent number of playouts, so the same seed would give different games.
+SEEDED_ITERATIONS = 8
+
+
+def set_name(set_path):
+    return os.path.splitext(os.path.basename(set_path))[0]
+
+
+def matchups(set_paths):
+    # Every ordered pairing, mirrors included, so each set plays both seats
+    return [(player_set, opponent_set) for player_set in set_paths for opponent_set in set_paths]
+
+
+def load_card_pools(set_paths):
+    return {set_path: Game.load_set(set_path) for set_path in set_paths}
+
+
+def make_controller(ai="mcts", time_budget=0.005, iterations=None):
+    if ai == "mcts":
+        return MCTSController(time_budget=time_budget, iterations=iterations)
+    return AIController()
+
+
+def search_iterations(iterations, seeded):
+    # Fixed playouts whenever games must be reproducible from their seed
+    return SEEDED_ITERATIONS if iterations is None and seeded else iterations
+
+
+def play_game(player_set, opponent_set, max_turns=200, seed=None, card_pools=None, ai="mcts", time_budget=0.005,
+              deck_size=30, log_dir=None, iterations=None):
+    """Play one game; its log is off unless `log_dir` is given, which gets the whole log as <sets>-<seed>.jsonl.gz."""
+    card_pools = card_pools or {}
+    game = Game.from_sets(card_pools.get(player_set, player_set), card_pools.get(opponent_set, opponent_set),
+                          player_controller=make_controller(ai, time_budget, iterations),
+                          opponent_controller=make_controller(ai, time_budget, iterations),
+                          max_turns=max_turns, seed=seed, deck_size=deck_size, game_log=LOG_OFF)
+    if log_dir is not None:
+        name = f"{set_name(player_set)}-vs-{set_name(opponent_set)}-{game.seed}.jsonl.gz"
+        game.game_log = GameLog(capacity=0, spill_path=os.path.join(log_dir, name))
+    winner = game.start()
+    if winner is game.player:
+        result = "player"
+    elif winner is game.opponent:
+        result = "opponent"
+    else:
+        result = "draw"
+    return {
+        "player_set": set_name(player_set),
+        "opponent_set": set_name(opponent_set),
+        "winner": result,
+        "turns": game.turn_counter,
+        "seed": game.seed,
+    }
+
+
+def play_games(set_paths, first_game, count, max_turns=200, base_seed=None, card_pools=None, ai="mcts", time_budget=0.005,
+               deck_size=30, log_dir=None, iterations=None):
+    # Game i always gets the same matchup and seed, however the range is split up
+    pairs = matchups(set_paths)
+    results = []
+    for i in range(first_game, first_game + count):
+        player_set, opponent_set = pairs[i % len(pairs)]
+        seed = None if base_seed is None else base_seed + i
+        result = play_game(player_set, opponent_set, max_turns, seed, card_pools, ai, time_budget, deck_size, log_dir,
+                           iterations)
+        result["game"] = i
+        results.append(result)
+    return results
+
+
+def play_compact_games(set_paths, games, max_turns=200, base_seed=None, card_pools=None, deck_size=30):
+    """Deal every game with the object engine, then play them all out at once on a CompactState."""
+    # Imported here so numpy is only needed for --engine compact
+    import numpy as np
+    from compact_state import CompactState, PLAYER, OPPONENT, playout
+
+    pairs = matchups(set_paths)
+    card_pools = card_pools or {}
+    setups = []
+    for i in range(games):
+        player_set, opponent_set = pairs[i % len(pairs)]
+        game = Game.from_sets(card_pools.get(player_set, player_set), card_pools.get(opponent_set, opponent_set),
+                              seed=None if base_seed is None else base_seed + i, deck_size=deck_size, game_log=LOG_OFF)
+        game.board.reset(game.card_pool, game.opponent_card_pool, deck_size)
+        game.initial_draw()
+        setups.append((player_set, opponent_set, game))
+
+    state = CompactState.from_games([game for _, _, game in setups], deck_slots=max(64, deck_size))
+    winners = playout(state, np.random.default_rng(base_seed), max_turns)
+    labels = {PLAYER: "player", OPPONENT: "opponent"}
+    return [{
+        "player_set": set_name(player_set),
+        "opponent_set": set_name(opponent_set),
+        "winner": labels.get(int(winner), "draw"),
+        "turns": int(turns),
+        "seed": game.seed,
+        "game": i,
+    } for i, ((player_set, opponent_set, game), winner, turns) in enumerate(zip(setups, winners, state.turn))]
+
+
+def run_batch(set_paths, games, max_turns=200, base_seed=None, ai="mcts", time_budget=0.005,
+              engine="objects", deck_size=30, log_dir=None, iterations=None):
+    start = time.perf_counter()
+    card_pools = load_card_pools(set_paths)
+    if engine == "compact":
+        results = play_compact_games(set_paths, games, max_turns, base_seed, card_pools, deck_size)
+    else:
+        results = play_games(set_paths, 0, games, max_turns, base_seed, card_pools, ai, time_budget, deck_size, log_dir,
+                             iterations)
+    return results, time.perf_counter() - start
+
+
+def summarize(results, elapsed):
+    by_matchup = defaultdict(lambda: {"games": 0, "player": 0, "opponent": 0, "draw": 0, "turns": 0})
+    for result in results:
+        stats = by_matchup[(result["player_set"], result["opponent_set"])]
+        stats["games"] += 1
+        stats[result["winner"]] += 1
+        stats["turns"] += result["turns"]
+
+    total_games = len(results)
+    total_turns = sum(result["turns"] for result in results)
+    print(f"Games: {total_games}  Time: {elapsed:.2f}s  Games/sec: {total_games / elapsed if elapsed else 0:.1f}")
+    print(f"Average turns per game: {total_turns / total_games if total_games else 0:.1f}")
+    print()
+    print(f"{'Player set':<16} {'Opponent set':<16} {'Games':>6} {'P win%':>7} {'O win%':>7} {'Draw%':>6} {'Turns':>6}")
+    print("-" * 70)
+    for (player_set, opponent_set), stats in sorted(by_matchup.items()):
+        games = stats["games"]
+        print(f"{player_set:<16} {opponent_set:<16} {games:>6} "
+              f"{100 * stats['player'] / games:>6.1f}% {100 * stats['opponent'] / games:>6.1f}% "
+              f"{100 * stats['draw'] / games:>5.1f}% {stats['turns'] / games:>6.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play AI-vs-AI games without rendering and report balance stats.")
+    parser.add_argument("--games", type=int, default=100, help="number of games to play")
+    parser.add_argument("--sets", nargs="+", help="set files to use (default: sets/*.json)")
+    parser.add_argument("--max-turns", type=int, default=200, help="turn limit after which a game is a draw")
+    parser.add_argument("--seed", type=int, help="base seed; game i is played with seed + i")
+    parser.add_argument("--ai", choices=("mcts", "random"), default="mcts", help="controller for both sides")
+    parser.add_argument("--time-budget", type=float, default=0.005,
+                        help="MCTS search time per decision in seconds, for unseeded runs without --iterations")
+    parser.add_argument("--iterations", type=int,
+                        help=f"MCTS playouts per decision (default: {SEEDED_ITERATIONS} with --seed or --replay, "
+                             f"else --time-budget)")
+    parser.add_argument("--engine", choices=("objects", "compact"), default="objects",
+                        help="compact plays all games in lock-step on NumPy arrays (vanilla creatures only, ignores --ai)")
+    parser.add_argument("--deck-size", type=int, default=30,
+                        help="cards per deck; decks bigger than two copies of each card allow more copies (stress testing)")
+    parser.add_argument("--log-dir", help="write each game's full log to a gzipped JSON-lines file in this directory "
+                                          "(game logs are off otherwise)")
+    parser.add_argument("--profile", action="store_true",
+                        help="time the engine's phases and effects and print where the time went")
+    parser.add_argument("--profile-json", metavar="PATH", help="also write the timings to this JSON file")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="keep game metrics in this file in Prometheus text format (e.g. for node_exporter)")
+    parser.add_argument("--metrics-interval", type=float, default=10.0,
+                        help="seconds between --metrics-file updates during the batch")
+    parser.add_argument("--replay", type=int, metavar="SEED",
+                        help="play a single game with this seed (first --sets entry vs the last) with debug output")
+    parser.add_argument("--verbose", action="store_true", help="print the engine's debug output (same as --debug all)")
+    parser.add_argument("--debug", metavar="CATEGORIES",
+                        help=f"comma-separated log categories to debug ({', '.join(CATEGORIES)} or all; "
+                             f"default: ${DEBUG_ENV})")
+    args = parser.parse_args()
+
+    debug = args.debug
+    if debug is None and (args.verbose or args.replay is not None):
+        debug = "all"
+    try:
+        # Debug output goes with the results on stdout; warnings alone go to stderr
+        configure(debug, stream=sys.stdout if debug else None)
+    except ValueError as e:
+        parser.error(str(e))
+
+    set_paths = args.sets or sorted(glob.glob(os.path.join(SETS_DIR, '*.json')))
+    if not set_paths:
+        parser.error(f"no set files found in {SETS_DIR}")
+
+    if args.log_dir:
+        os.makedirs(args.log_dir, exist_ok=True)
+    if args.metrics_file:
+        METRICS.autosave(args.metrics_file, args.metrics_interval)
+
+    if args.replay is not None:
+        result = play_game(set_paths[0], set_paths[-1], args.max_turns, args.replay, None, args.ai, args.time_budget,
+                           args.deck_size, args.log_dir, search_iterations(args.iterations, seeded=True))
+        print(result)
+        return
+
+    iterations = search_iterations(args.iterations, seeded=args.seed is not None)
+    if not (args.profile or args.profile_json):
+        results, elapsed = run_batch(set_paths, args.games, args.max_turns, args.seed, args.ai, args.time_budget,
+                                     args.engine, args.deck_size, args.log_dir, iterations)
+        summarize(results, elapsed)
+    else:
+        with profiling() as profiler:
+            results, elapsed = run_batch(set_paths, args.games, args.max_turns, args.seed, args.ai, args.time_budget,
+                                         args.engine, args.deck_size, args.log_dir, iterations)
+        summarize(results, elapsed)
+        print()
+        print("\n".join(profiler.report()))
+        if args.profile_json:
+            profiler.export(args.profile_json)
+    if args.metrics_file:
+        METRICS.write_textfile(args.metrics_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# card_game/timing.py
+import functools
+import json
+import time
+from contextlib import contextmanager
+
+# The Profiler collecting timings, or None. Hooks read this once per call, so a disabled hook
+# costs one extra function call and a global lookup.
+active = None
+
+
+class Profiler:
+    """Wall time and call counts for the engine's phases (see timed).
+
+    A phase's total includes the phases it calls; its own time doesn't, so own times add up to
+    the time spent inside instrumented code. Lookahead search plays turns on clones, so their
+    phases are counted too.
+    """
+
+    def __init__(self):
+        self.stats = {}  # phase -> [calls, total seconds, own seconds]
+        self._children = []  # Time spent in nested phases, one entry per phase in progress
+        self.elapsed = 0.0  # Wall time while enabled
+
+    def start(self):
+        self._children.append(0.0)
+        return time.perf_counter()
+
+    def record(self, phase, start):
+        elapsed = time.perf_counter() - start
+        children = self._children.pop()
+        if self._children:
+            self._children[-1] += elapsed
+        stat = self.stats.get(phase)
+        if stat is None:
+            stat = self.stats[phase] = [0, 0.0, 0.0]
+        stat[0] += 1
+        stat[1] += elapsed
+        stat[2] += elapsed - children
+
+    def merge(self, stats):
+        """Add the stats of another profiler (e.g. from a worker process, via as_dict)."""
+        for phase, stat in stats.items():
+            mine = self.stats.setdefault(phase, [0, 0.0, 0.0])
+            mine[0] += stat["calls"]
+            mine[1] += stat["total"]
+            mine[2] += stat["own"]
+
+    def as_dict(self):
+        return {phase: {"calls": calls, "total": total, "own": own}
+                for phase, (calls, total, own) in sorted(self.stats.items())}
+
+    def export(self, path):
+        with open(path, 'w') as file:
+            json.dump({"elapsed": self.elapsed, "phases": self.as_dict()}, file, indent=2)
+
+    def report(self):
+        """The timing table as lines, the phases that used the most of their own time first."""
+        own_total = sum(stat[2] for stat in self.stats.values()) or 1.0
+        lines = [f"{'Phase':<40} {'Calls':>9} {'Total ms':>10} {'Own ms':>10} {'Own%':>6} {'us/call':>9}",
+                 "-" * 89]
+        for phase, (calls, total, own) in sorted(self.stats.items(), key=lambda item: -item[1][2]):
+            lines.append(f"{phase:<40} {calls:>9} {1000 * total:>10.1f} {1000 * own:>10.1f} "
+                         f"{100 * own / own_total:>5.1f}% {1e6 * total / calls:>9.1f}")
+        lines.append(f"Instrumented: {1000 * own_total:.1f} ms of {1000 * self.elapsed:.1f} ms wall time")
+        return lines
+
+
+def timed(phase, key=None):
+    """Decorator timing each call under `phase`, or under "phase:<key(*args)>" when `key` is given."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = active
+            if profiler is None:
+                return func(*args, **kwargs)
+            name = phase if key is None else f"{phase}:{key(*args, **kwargs)}"
+            start = profiler.start()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.record(name, start)
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def profiling(profiler=None):
+    """Time instrumented phases for the duration; yields the Profiler."""
+    global active
+    profiler = profiler or Profiler()
+    previous, active = active, profiler
+    start = time.perf_counter()
+    try:
+        yield profiler
+    finally:
+        profiler.elapsed += time.perf_counter() - start
+        active = previous
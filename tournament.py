@@ -0,0 +1,137 @@
+# card_game/tournament.py
+import argparse
+import glob
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from log import configure
+from simulate import SEEDED_ITERATIONS, SETS_DIR, load_card_pools, play_games, summarize
+from timing import Profiler, profiling
+from metrics import METRICS
+
+# Loaded once per worker process by _init_worker
+_worker_card_pools = None
+
+
+def _init_worker(set_paths):
+    global _worker_card_pools
+    _worker_card_pools = load_card_pools(set_paths)
+
+
+def _play_shard(set_paths, first_game, count, max_turns, base_seed, ai, time_budget, iterations, profile=False):
+    # Returns the shard's results, its timings when profiling (Profiler.as_dict) and its metrics
+    # (Metrics.snapshot, which the worker then forgets so no shard is counted twice)
+    if not profile:
+        results = play_games(set_paths, first_game, count, max_turns, base_seed, _worker_card_pools, ai, time_budget,
+                             iterations=iterations)
+        timings = None
+    else:
+        with profiling() as profiler:
+            results = play_games(set_paths, first_game, count, max_turns, base_seed, _worker_card_pools, ai,
+                                 time_budget, iterations=iterations)
+        timings = profiler.as_dict()
+    metrics = METRICS.snapshot()
+    METRICS.reset()
+    return results, timings, metrics
+
+
+def shard_ranges(games, shards):
+    # Split game indices 0..games-1 into contiguous (first_game, count) ranges
+    size, extra = divmod(games, shards)
+    ranges = []
+    first_game = 0
+    for shard in range(shards):
+        count = size + (1 if shard < extra else 0)
+        if count:
+            ranges.append((first_game, count))
+        first_game += count
+    return ranges
+
+
+def run_tournament(set_paths, games, workers=None, max_turns=200, base_seed=0, shards_per_worker=4,
+                   ai="mcts", time_budget=0.005, profiler=None, metrics_file=None, iterations=SEEDED_ITERATIONS):
+    """Results of every game in order and the wall time.
+
+    MCTS runs a fixed number of `iterations` per decision, so every game depends only on its seed
+    and the results are the same for any number of workers (iterations=None searches for
+    `time_budget` seconds instead, which isn't reproducible).
+
+    Worker timings are merged into `profiler` if given, and worker metrics into this process's
+    METRICS, which are written to `metrics_file` (if given) as each shard comes in.
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = shard_ranges(games, workers * shards_per_worker)
+    results = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(set_paths,)) as executor:
+        futures = [executor.submit(_play_shard, set_paths, first_game, count, max_turns, base_seed, ai, time_budget,
+                                   iterations, profiler is not None)
+                   for first_game, count in ranges]
+        for future in as_completed(futures):
+            shard_results, timings, metrics = future.result()
+            results.extend(shard_results)
+            if timings is not None:
+                profiler.merge(timings)
+            METRICS.merge(metrics)
+            if metrics_file is not None:
+                METRICS.write_textfile(metrics_file)
+    results.sort(key=lambda result: result["game"])
+    elapsed = time.perf_counter() - start
+    if profiler is not None:
+        profiler.elapsed += elapsed * workers  # Worker time available, to compare with the instrumented time
+    return results, elapsed
+
+
+def print_length_histogram(results, bucket_size=5, width=50):
+    buckets = Counter(result["turns"] // bucket_size for result in results)
+    if not buckets:
+        return
+    peak = max(buckets.values())
+    print()
+    print("Game length (turns):")
+    for bucket in range(min(buckets), max(buckets) + 1):
+        count = buckets.get(bucket, 0)
+        low = bucket * bucket_size
+        label = f"{low}-{low + bucket_size - 1}"
+        print(f"{label:>9} {count:>6} {'#' * round(width * count / peak)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play AI-vs-AI games across a process pool and merge the results.")
+    parser.add_argument("--games", type=int, default=1000, help="total number of games to play")
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--sets", nargs="+", help="set files to use (default: sets/*.json)")
+    parser.add_argument("--max-turns", type=int, default=200, help="turn limit after which a game is a draw")
+    parser.add_argument("--seed", type=int, default=0, help="base seed; game i is played with seed + i")
+    parser.add_argument("--ai", choices=("mcts", "random"), default="mcts", help="controller for both sides")
+    parser.add_argument("--iterations", type=int, default=SEEDED_ITERATIONS,
+                        help="MCTS playouts per decision; fixed, so results don't depend on machine load")
+    parser.add_argument("--bucket", type=int, default=5, help="histogram bucket size in turns")
+    parser.add_argument("--profile", action="store_true",
+                        help="time the engine's phases and effects in every worker and print the merged table")
+    parser.add_argument("--profile-json", metavar="PATH", help="also write the merged timings to this JSON file")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="keep merged game metrics in this file in Prometheus text format, updated per shard")
+    args = parser.parse_args()
+    configure()
+
+    set_paths = args.sets or sorted(glob.glob(os.path.join(SETS_DIR, '*.json')))
+    if not set_paths:
+        parser.error(f"no set files found in {SETS_DIR}")
+
+    profiler = Profiler() if args.profile or args.profile_json else None
+    results, elapsed = run_tournament(set_paths, args.games, args.workers, args.max_turns, args.seed,
+                                      ai=args.ai, iterations=args.iterations, profiler=profiler,
+                                      metrics_file=args.metrics_file)
+    summarize(results, elapsed)
+    print_length_histogram(results, args.bucket)
+    if profiler is not None:
+        print()
+        print("\n".join(profiler.report()))
+        if args.profile_json:
+            profiler.export(args.profile_json)
+
+
+if __name__ == "__main__":
+    main()
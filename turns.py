@@ -1,25 +1,31 @@
 # card_game/turns.py
+import logging
 from colorama import Fore, Back, Style
-from effects import Effect
 from player import gain_energy
-from ai import ai_main_phase, ai_combat_phase, ai_end_phase
+from ai import ai_end_phase
 from utils import check_and_destroy
+from log import get_logger
+from timing import timed
 
+log = get_logger('turns')
 
+
+@timed("turns.upkeep_phase")
 def upkeep_phase(board, player=True):
     current_player = board.player if player else board.opponent
     
-    print(f"\nDEBUG: ===== STARTING UPKEEP PHASE FOR {current_player.name} =====")
+    log.debug("===== STARTING UPKEEP PHASE FOR %s =====", current_player.name)
     
     initial_energy = current_player.energy
 
-    print(f"DEBUG: {current_player.name}'s Upkeep Phase - Initial Energy: {initial_energy}, Hand: {[card.name for card in current_player.hand]}")
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("%s's Upkeep Phase - Initial Energy: %s, Hand: %s", current_player.name, initial_energy, [card.name for card in current_player.hand])
 
     # First, apply the natural energy gain
     current_player.increase_energy()
 
     # Reset the effect_processed flag for all cards
-    for card in current_player.battlezone + current_player.environs:
+    for card in current_player.cards_in_play():
         card.reset_effect_processed()
 
     # Keep track of triggered effects
@@ -28,38 +34,36 @@ def upkeep_phase(board, player=True):
     processed_effects = set()
 
     # Then, apply effects
-    for card in current_player.battlezone + current_player.environs:
-        print(f"DEBUG: Processing effects for {card.name} (ID: {card.id})")
+    for card in current_player.events.subscribers('upkeep'):
+        log.debug("Processing effects for %s (ID: %s)", card.name, card.id)
         for effect in card.effects:
             effect_key = (card.id, effect['type'], effect.get('source_id'))
             if effect_key in processed_effects:
-                print(f"DEBUG: Skipping already processed effect: {effect}")
+                log.debug("Skipping already processed effect: %s", effect)
                 continue
             processed_effects.add(effect_key)
-            print(f"DEBUG: Effect: {effect}")
+            log.debug("Effect: %s", effect)
             if 'trigger' not in effect:
-                print(f"DEBUG: Effect missing 'trigger' key in card {card.name} (ID: {card.id})")
+                log.debug("Effect missing 'trigger' key in card %s (ID: %s)", card.name, card.id)
                 continue
             if effect['trigger'] == 'upkeep':
                 if card.card_type == "equipment" and not card.equipped_to:
                     continue  # Skip effects for unequipped equipment
                 effect_key = (card.id, effect['type'])
                 if effect_key in triggered_effects:
-                    print(f"DEBUG: Skipping duplicate effect for {card.name} (ID: {card.id})")
+                    log.debug("Skipping duplicate effect for %s (ID: %s)", card.name, card.id)
                     continue  # Skip if this effect has already been triggered this turn
                 triggered_effects.add(effect_key)
                 
-                print(f"DEBUG: Triggering upkeep effect for {card.name} (ID: {card.id}): {effect}")
+                log.debug("Triggering upkeep effect for %s (ID: %s): %s", card.name, card.id, effect)
                 
                 if effect['type'] == 'increase_energy_regen':
-                    effect_instance = Effect(effect['type'], effect['value'], effect['trigger'], card.id)
-                    effect_instance.apply(board.game, current_player)
+                    effect.apply(board.game, current_player, card.id)
                 elif effect['type'] == 'deal_damage':
-                    print(f"DEBUG: Triggering upkeep deal_damage effect for {card.name} (ID: {card.id})")
+                    log.debug("Triggering upkeep deal_damage effect for %s (ID: %s)", card.name, card.id)
                     target = board.game.select_target(card_type="creature", effect_description=f"{card.name} can deal {effect['value']} damage to any target creature:", player=current_player)
                     if target:
-                        target.receive_damage(effect['value'])
-                        board.game.log_action(f"{card.name} dealt {effect['value']} damage to {target.name} (ID: {target.id})")
+                        effect.apply(board.game, current_player, card.id, target=target, source_name=card.name)
                         check_and_destroy(board, target)  # Changed to use board instead of board.game
 
     # Apply the energy regeneration effects
@@ -75,9 +79,10 @@ def upkeep_phase(board, player=True):
     log_entry = f"{current_player.name}'s Upkeep: Energy increased from {initial_energy} to {current_player.energy} (gained {energy_gained}). All creatures untapped and summoning sickness removed. "
     if drawn_card:
         log_entry += f"Drew Card: {drawn_card.name} (Attack: {drawn_card.attack}, Defense: {drawn_card.defense}, Cost: {drawn_card.cost})"
-    print(f"DEBUG: {current_player.name}'s Upkeep Phase - Final Energy: {current_player.energy}, Hand: {[card.name for card in current_player.hand]}")
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("%s's Upkeep Phase - Final Energy: %s, Hand: %s", current_player.name, current_player.energy, [card.name for card in current_player.hand])
     
-    print(f"DEBUG: ===== ENDING UPKEEP PHASE FOR {current_player.name} =====\n")
+    log.debug("===== ENDING UPKEEP PHASE FOR %s =====", current_player.name)
     
     return log_entry, Fore.YELLOW
 
@@ -89,66 +94,51 @@ def end_phase(game, player=True):
     log_entries = []
     
     while len(current_player.hand) > 7:
-        if player:
-            game.display_game_state()  # This should now work
-            print(f"\nYou must discard down to 7 cards. Current hand size: {len(current_player.hand)}")
-            for i, card in enumerate(current_player.hand):
-                print(f"{i + 1}. {card.name} (Attack: {card.attack}, Defense: {card.defense}, Cost: {card.cost})")
-            
-            while True:
-                try:
-                    index = int(input("Enter the index of the card to discard: ").strip()) - 1
-                    if 0 <= index < len(current_player.hand):
-                        discarded_card = current_player.hand.pop(index)
-                        current_player.graveyard.append(discarded_card)
-                        log_entries.append((f"Discarded Card: {discarded_card.name} (Attack: {discarded_card.attack}, Defense: {discarded_card.defense}, Cost: {discarded_card.cost})", Fore.YELLOW))
-                        break
-                    else:
-                        print("Invalid index. Please enter a number corresponding to a card in your hand.")
-                except ValueError:
-                    print("Invalid input. Please enter a valid number.")
-        else:
-            # AI discard logic (for simplicity, just discard the last card)
-            discarded_card = current_player.hand.pop()
-            current_player.graveyard.append(discarded_card)
-            log_entries.append((f"AI Discarded Card: {discarded_card.name} (Attack: {discarded_card.attack}, Defense: {discarded_card.defense}, Cost: {discarded_card.cost})", Fore.YELLOW))
+        index = current_player.controller.choose_discard(game, current_player)
+        discarded_card = current_player.hand.pop(index)
+        current_player.graveyard.append(discarded_card)
+        prefix = "" if current_player.controller.is_human else "AI "
+        log_entries.append((f"{prefix}Discarded Card: {discarded_card.name} (Attack: {discarded_card.attack}, Defense: {discarded_card.defense}, Cost: {discarded_card.cost})", Fore.YELLOW))
     
     return log_entries
 
-def opponent_turn_structure(game):
+AI_TURN_PHASES = ("upkeep", "main_phase_1", "combat", "main_phase_2", "end")
+
+@timed("turns.opponent_turn_structure")
+def opponent_turn_structure(game, ai_player=None, from_phase="upkeep"):
+    ai_player = ai_player or game.opponent
+    is_player = ai_player is game.player
     try:
-        print("DEBUG: Opponent turn started")
+        log.debug("Opponent turn started")
         
-        # Upkeep Phase
-        log_entry, color = upkeep_phase(game.board, player=False)
-        if log_entry:
-            game.log_action(log_entry, color)
-        print("DEBUG: Opponent upkeep phase completed")
-
-        # First Main Phase
-        game.log_action("Opponent's First Main Phase", Fore.YELLOW)
-        print("DEBUG: Opponent first main phase started")
-        ai_main_phase(game)
-        print("DEBUG: Opponent first main phase completed")
-
-        # Combat Phase
-        game.log_action("Opponent's Combat Phase", Fore.YELLOW)
-        print("DEBUG: Opponent combat phase started")
-        ai_combat_phase(game)
-        print("DEBUG: Opponent combat phase completed")
-
-        # Second Main Phase
-        game.log_action("Opponent's Second Main Phase", Fore.YELLOW)
-        print("DEBUG: Opponent second main phase started")
-        ai_main_phase(game)
-        print("DEBUG: Opponent second main phase completed")
-
-        # End Phase
-        log_entries = end_phase(game, player=False)
-        for entry in log_entries:
-            game.log_action(entry[0], entry[1])
-        ai_end_phase(game)
-        print("DEBUG: Opponent end phase completed")
+        for phase in AI_TURN_PHASES[AI_TURN_PHASES.index(from_phase):]:
+            game.turn_phase = phase
+            if phase == "upkeep":
+                log_entry, color = upkeep_phase(game.board, player=is_player)
+                if log_entry:
+                    game.log_action(log_entry, color=color)
+                log.debug("Opponent upkeep phase completed")
+            elif phase == "main_phase_1":
+                game.log_action("%s's First Main Phase", ai_player.name, color=Fore.YELLOW)
+                log.debug("Opponent first main phase started")
+                ai_player.controller.main_phase(game, ai_player)
+                log.debug("Opponent first main phase completed")
+            elif phase == "combat":
+                game.log_action("%s's Combat Phase", ai_player.name, color=Fore.YELLOW)
+                log.debug("Opponent combat phase started")
+                ai_player.controller.combat_phase(game, ai_player)
+                log.debug("Opponent combat phase completed")
+            elif phase == "main_phase_2":
+                game.log_action("%s's Second Main Phase", ai_player.name, color=Fore.YELLOW)
+                log.debug("Opponent second main phase started")
+                ai_player.controller.main_phase(game, ai_player)
+                log.debug("Opponent second main phase completed")
+            elif phase == "end":
+                log_entries = end_phase(game, player=is_player)
+                for entry in log_entries:
+                    game.log_action(entry[0], color=entry[1])
+                ai_end_phase(game, ai_player)
+                log.debug("Opponent end phase completed")
     except Exception as e:
-        print(f"ERROR: An exception occurred during the opponent's turn: {str(e)}")
-        game.log_action(f"ERROR: An exception occurred during the opponent's turn: {str(e)}", Fore.RED)
\ No newline at end of file
+        log.error("An exception occurred during the opponent's turn: %s", e, exc_info=True)
+        game.log_action("ERROR: An exception occurred during the opponent's turn: %s", str(e), color=Fore.RED)
@@ -1,9 +1,11 @@
+from zone import move
+
+
 def check_and_destroy(self, card):
-    if card.defense <= 0:
-        owner = self.player if card in self.player.battlezone else self.opponent
-        if card in owner.battlezone:
-            owner.battlezone.remove(card)
+    # Only a creature still on the battlefield can be destroyed (a second check is a no-op)
+    if card.defense <= 0 and card.zone is not None and card.zone.name == "battlezone":
+        owner = card.zone.player
         if card.equipment:
             card.equipment.unequip()
-        owner.graveyard.append(card)
-        self.game.log_action(f"{card.name} was destroyed and moved to {owner.name}'s graveyard.")
\ No newline at end of file
+        move(card, owner.graveyard)
+        self.game.log_action("%s was destroyed and moved to %s's graveyard.", card.name, owner.name)
\ No newline at end of file
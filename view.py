@@ -0,0 +1,54 @@
+# card_game/view.py
+import time
+from display import Renderer
+
+# While the engine runs on its own (AI turns) the screen is redrawn at most this often, in seconds;
+# a human prompt always gets an up-to-date frame
+REDRAW_INTERVAL = 0.1
+
+
+class View:
+    """Something that shows a game and redraws on demand; subclasses implement draw(game).
+
+    Attached with Game.attach. The engine only reports that the state changed (state_changed);
+    the view draws when a prompt needs the screen (refresh) or, while nobody is being asked
+    anything, at most once per `interval` seconds. `interval=None` draws only on refresh.
+    A game without views (headless) never renders at all.
+    """
+
+    def __init__(self, interval=REDRAW_INTERVAL):
+        self.interval = interval
+        self.stale = True
+        self._drawn_at = float('-inf')
+
+    def draw(self, game):
+        raise NotImplementedError
+
+    def state_changed(self, game):
+        self.stale = True
+        if self.interval is not None and time.monotonic() - self._drawn_at >= self.interval:
+            self.refresh(game)
+
+    def refresh(self, game):
+        if self.stale:
+            self.draw(game)
+            self.stale = False
+            self._drawn_at = time.monotonic()
+
+    def close(self, game):
+        self.refresh(game)
+
+
+class TerminalView(View):
+    """Shows a game on this process's terminal (see display.Renderer)."""
+
+    def __init__(self, renderer=None, interval=REDRAW_INTERVAL):
+        super().__init__(interval)
+        self.renderer = renderer or Renderer()
+
+    def draw(self, game):
+        self.renderer.render(game)
+
+    def close(self, game):
+        super().close(game)
+        self.renderer.close()
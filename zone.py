@@ -0,0 +1,175 @@
+# card_game/zone.py
+from itertools import count, islice
+
+# Stamp for each placement of a card in a zone; a zone's cards are in increasing stamp order
+_placements = count()
+
+
+class Zone:
+    """Ordered cards of one player's zone, with constant-time membership, append and removal.
+
+    A card is in at most one zone at a time and `card.zone` says which; adding a card to a zone
+    takes it out of its previous one. The cards are kept as the keys of a private insertion-ordered
+    dict, so iteration, len() and `in` run at dict speed, and only the list-like methods below
+    change it, keeping `card.zone` and the EventBus in step. Indexing (numbered menus) uses a list
+    of the cards built on first use after a change, so it is O(1) while the zone is unchanged.
+    Zones compare by identity. Zones in play carry their player's EventBus in `events`, which
+    hears about every card that enters or leaves.
+    """
+    __slots__ = ('name', 'player', 'events', '_cards', '_listed')
+
+    def __init__(self, name, player=None, cards=(), events=None):
+        self.name = name
+        self.player = player
+        self.events = events
+        self._cards = {}  # card -> placement stamp
+        self._listed = None  # The cards as a list, for indexing; None after a change
+        self.extend(cards)
+
+    def __iter__(self):
+        return iter(self._cards)
+
+    def __reversed__(self):
+        return reversed(self._cards)
+
+    def __len__(self):
+        return len(self._cards)
+
+    def __contains__(self, card):
+        return card in self._cards
+
+    def __getitem__(self, index):
+        if self._listed is None:
+            self._listed = list(self._cards)
+        if isinstance(index, slice):
+            return self._listed[index]
+        try:
+            return self._listed[index]
+        except IndexError:
+            raise IndexError("zone index out of range") from None
+
+    def __add__(self, other):
+        return [*self, *other]
+
+    def __radd__(self, other):
+        return [*other, *self]
+
+    def __repr__(self):
+        owner = f"{self.player.name}'s " if self.player is not None else ""
+        return f"<Zone {owner}{self.name}: {len(self)} cards>"
+
+    def append(self, card):
+        move(card, self)
+
+    def extend(self, cards):
+        for card in cards:
+            move(card, self)
+
+    def remove(self, card):
+        if card not in self._cards:
+            raise ValueError(f"{card.name} is not in {self.name}")
+        self._take(card)
+
+    def pop(self, index=-1):
+        if not self._cards:
+            raise IndexError("pop from empty zone")
+        if index in (-1, len(self._cards) - 1):
+            card = next(reversed(self._cards))
+        elif index == 0:
+            card = next(iter(self._cards))
+        else:
+            card = self[index]
+        self._take(card)
+        return card
+
+    def clear(self):
+        for card in self._cards:
+            card.zone = None
+            if self.events is not None:
+                self.events.unsubscribe(card)
+        self._cards.clear()
+        self._listed = None
+
+    def index(self, card):
+        for i, other in enumerate(self._cards):
+            if other is card:
+                return i
+        raise ValueError(f"{card.name} is not in {self.name}")
+
+    def _take(self, card):
+        del self._cards[card]
+        self._listed = None
+        card.zone = None
+        if self.events is not None:
+            self.events.unsubscribe(card)
+
+
+class Deck:
+    """A player's library: CardDefinitions drawn from the front.
+
+    Cards are only created when drawn (see Player.draw_card), so building a deck costs one
+    reference per card and games that end early never create most of theirs. Drawing advances a
+    cursor over the definition list instead of shifting it, and clones share that list (nothing
+    writes to it after extend() builds a new one), so both are O(1) whatever the deck size.
+    """
+    __slots__ = ('name', 'player', '_definitions', '_next')
+
+    def __init__(self, player=None, definitions=()):
+        self.name = 'deck'
+        self.player = player
+        self._definitions = list(definitions)
+        self._next = 0
+
+    def __len__(self):
+        return len(self._definitions) - self._next
+
+    def __iter__(self):
+        return islice(self._definitions, self._next, None)
+
+    def __repr__(self):
+        owner = f"{self.player.name}'s " if self.player is not None else ""
+        return f"<Deck {owner}deck: {len(self)} cards>"
+
+    def extend(self, definitions):
+        self._definitions = self._definitions[self._next:] + list(definitions)
+        self._next = 0
+
+    def clear(self):
+        self._definitions = []
+        self._next = 0
+
+    def popleft(self):
+        if self._next >= len(self._definitions):
+            raise IndexError("draw from empty deck")
+        definition = self._definitions[self._next]
+        self._next += 1
+        return definition
+
+    def copy(self, player):
+        copy = Deck.__new__(Deck)
+        copy.name = self.name
+        copy.player = player
+        copy._definitions = self._definitions
+        copy._next = self._next
+        return copy
+
+
+def move(card, to_zone):
+    """Put `card` at the end of `to_zone`, taking it out of whichever zone held it."""
+    from_zone = card.zone
+    if from_zone is not None:
+        del from_zone._cards[card]
+        from_zone._listed = None
+        if from_zone.events is not None:
+            from_zone.events.unsubscribe(card)
+    to_zone._cards[card] = next(_placements)
+    to_zone._listed = None
+    card.zone = to_zone
+    if to_zone.events is not None:
+        to_zone.events.subscribe(card)
+    return card
+
+
+def play_order(card):
+    """Sort key for cards in play: battlezone before environs, then the order they arrived in."""
+    return card.zone.name != 'battlezone', card.zone._cards[card]